@@ -1,1211 +1,2648 @@
-"""
-Life Sciences & Biotech Due Diligence Analysis System
-Complete, ready-to-run analyzer for medical, pharmaceutical, and biotech IP
-Includes domain-specific citations from credible medical/scientific sources
-"""
-from dotenv import load_dotenv
-load_dotenv()
-import json
-import os
-from datetime import datetime
-from typing import Dict, Any, Optional
-from openai import OpenAI
-from pathlib import Path
-import argparse
-import re
-
-# ============================================================================
-# CONFIGURATION
-# ============================================================================
-
-class Config:
-    """Configuration for Life Sciences DD Analysis"""
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-    # Use GPT-5 family by default; override via --model
-    # Available sizes include: "gpt-5", "gpt-5-mini", "gpt-5-nano"
-    MODEL = "gpt-5"
-    OUTPUT_DIR = "biotech_dd_reports"
-    MAX_TOKENS = 25000  # increased for detailed medical analysis
-    TEMPERATURE = 0.2  # lower for more consistent medical/scientific analysis
-    ENABLE_DOMAIN_VALIDATION = True
-# ============================================================================
-# SCORING WEIGHTS
-# ============================================================================
-
-SCORE_WEIGHTS = {
-    "clinical_evidence": 0.20,
-    "regulatory_clarity": 0.15,
-    "ip_strength": 0.15,
-    "market_attractiveness": 0.15,
-    "manufacturing_cmc_readiness": 0.10,
-    "competitive_moat": 0.10,
-    "team_inventor_quality": 0.10,
-    "source_quality": 0.05
-}
-
-# ============================================================================
-# LIFE SCIENCES CITATION SOURCES (reference cues only; not enforced)
-# ============================================================================
-
-LIFE_SCIENCES_SOURCES = {
-    "medical_journals": [
-        "New England Journal of Medicine (NEJM)",
-        "The Lancet",
-        "Journal of the American Medical Association (JAMA)",
-        "Nature Medicine",
-        "Nature Biotechnology",
-        "Science Translational Medicine",
-        "Cell",
-        "Nature Reviews Drug Discovery",
-        "British Medical Journal (BMJ)",
-        "Annals of Internal Medicine",
-        "Clinical Cancer Research",
-        "Journal of Clinical Oncology",
-        "Circulation",
-        "Gastroenterology",
-        "Hepatology"
-    ],
-    "pharma_databases": [
-        "ClinicalTrials.gov",
-        "FDA Orange Book",
-        "FDA Purple Book",
-        "EMA Clinical Data",
-        "WHO International Clinical Trials Registry",
-        "PubMed/MEDLINE",
-        "Cochrane Database",
-        "DrugBank",
-        "PharmGKB"
-    ],
-    "regulatory_sources": [
-        "FDA Guidance Documents",
-        "EMA Guidelines",
-        "ICH Guidelines",
-        "PMDA (Japan)",
-        "NMPA (China)",
-        "Health Canada",
-        "TGA (Australia)",
-        "MHRA (UK)",
-        "SwissMedic"
-    ],
-    "market_research": [
-        "GlobalData Healthcare",
-        "Evaluate Pharma",
-        "IQVIA",
-        "Frost & Sullivan Healthcare",
-        "Grand View Research - Healthcare",
-        "BioMedTracker",
-        "Cortellis",
-        "Citeline",
-        "BioCentury"
-    ],
-    "agricultural_veterinary": [
-        "Journal of Animal Science",
-        "Veterinary Microbiology",
-        "Aquaculture",
-        "Fish & Shellfish Immunology",
-        "Vaccine",
-        "Preventive Veterinary Medicine",
-        "Journal of Agricultural and Food Chemistry",
-        "Crop Protection",
-        "Plant Biotechnology Journal"
-    ],
-    "medical_device_sources": [
-        "Journal of Medical Devices",
-        "Medical Device and Diagnostic Industry (MD+DI)",
-        "Biomedical Engineering Online",
-        "IEEE Transactions on Biomedical Engineering",
-        "Journal of Biomedical Materials Research",
-        "FDA MAUDE Database",
-        "FDA 510(k) Database"
-    ]
-}
-
-# ============================================================================
-# LIFE SCIENCES SPECIFIC PROMPTS
-# ============================================================================
-
-class LifeSciencesPrompts:
-    """Specialized prompts for biotech/pharma/medical analysis"""
-
-    BASE_SYSTEM_PROMPT = """You are a senior life sciences due diligence analyst.
-
-NON-NEGOTIABLES
-- No source, no claim: every factual/clinical/regulatory/market statement must have a credible citation.
-- Acceptable sources: PubMed/DOI/PMID; ClinicalTrials.gov (NCT); FDA/EMA/ICH/WHO; CMS; national HTAs; SEC 10-K/8-K/20-F; FDA Orange/Purple; EMA EPAR; reputable healthcare market research (IQVIA/Evaluate/GlobalData/Citeline/etc); USDA-APHIS CVB (vet vaccines), FDA-CVM (vet drugs), NOAA Fisheries, FAO, ICES, OIE/WOAH, national fish health agencies; reputable aquaculture journals (Aquaculture, Journal of Fish Diseases, Reviews in Aquaculture, Veterinary Parasitology).
-
-- Not acceptable: Wikipedia, blogs, generic news, social posts. If you cannot find a valid citation, set the field’s value to null (the native JSON null). 
-- Do not return "NA", "N/A", or an empty string. 
-- Set its "citation" to "", and add a precise entry to data_gaps like: "Not enough valid cited information: <json_path>".
-- Use the web_search tool for any fact you don’t know with high confidence; every non-obvious fact must include at least one URL citation.
-
-SOURCE HIERARCHY
-- Prefer Tier 1: FDA/EMA/ICH/WHO; PubMed/PMID/DOI; NEJM/Lancet/JAMA/Nature/Science/Cell; EPAR; FDA labels/PMAs.
-- If Tier 1 is not available, Tier 2 is acceptable: ClinicalTrials.gov/NCI SEER/CDC/EudraCT.
-- If still unavailable, Tier 3 is acceptable: SEC/company reports; IQVIA/Evaluate/GlobalData/Citeline/…
-- Never use hard-blocked sources (Wikipedia/blogs/Medium/social/forums).
-- Always include an inline citation. If using Tier 2/3, still provide the value with that citation (do NOT omit or set NA). Keep the JSON shape unchanged.
-
-SCORING VS CAS
-- Keep pillar scores separate from any CAS/novelty/IP risk. CAS/novelty belongs only in the IP section notes; do not mix into `scores`.
-
-STYLE
-- Investor-ready, concise, no speculation. Prefer human clinical > preprint > animal > in vitro; prefer regulator/registry > company press.
-
-Return ONLY valid JSON for the requested schema, in the exact order specified."""
-
-    # ===================== GLOBAL (origin_country + global + US) =====================
-    GLOBAL_LIFE_SCIENCES_PROMPT = """You are a senior life sciences due diligence analyst. Produce a CITED JSON diligence packet for GLOBAL commercialization.
-
-STRICT RULES
-- Every claim must carry a credible citation (see system prompt). No Wikipedia/blogs.
-- Provide ≥5 close comparators spanning same and adjacent modalities.
-- For any uncitable field: value null, "citation": "", and add a `data_gaps` item "Not enough valid cited information: <json_path>".
-- Multi-geo scope is fixed: (1) origin_country (where the IP is published/assigned), (2) global, (3) US. Infer origin_country from assignee/inventor/patent priority data; if unclear, set origin_country.name = null and add a data gap.
-
-STAGE-BREADTH MODE: GLOBAL_EARLY
-
-TECHNOLOGY DATA (verbatim):
-{technology_data}
-
-REQUIRED OUTPUT JSON (exact order and shape):
-{{
-  "meta": {{"analysis_date":"YYYY-MM-DD","stage_breadth_mode":"GLOBAL_EARLY","analysis_type":"global_life_sciences"}},
-  "executive_summary": {{
-    "summary_bullets": ["",""],
-    "key_takeaway": "",
-    "citation": ""
-  }},
-  "unmet_need_and_market_overview": {{
-    "market_size": {{
-      "global": {{"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}},
-      "us":     {{"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}}
-    }},
-    "epidemiology": {{
-      "prevalence": {{"global":"","us":"","citation":""}},
-      "incidence":  {{"global":"","us":"","citation":""}}
-    }}
-  }},
-  "technological_differentiation": {{
-    "mechanism_of_action": {{"description":"","citation":""}},
-    "indication": "",
-    "therapeutic_area": "",
-    "modality": "",
-    "route_of_administration": ""
-  }},
-  "current_treatment_paradigm": {{
-    "if_indication_listed": {{
-      "first_line":  [""],
-      "second_line": [""],
-      "third_line":  [""] ,
-      "citation": ""
-    }},
-    "if_indication_not_listed": {{
-      "recommended_indications_based_on_moa": [""] ,
-      "gold_standard_treatments_for_recommended_indications": [""] ,
-      "citation": ""
-    }}
-  }},
-  "competitive_landscape": {{
-    "clinical_stage_assets_global": [{{"product":"","company":"","modality":"","moa":"","stage":"","key_ref_or_nct":"","citation":""}}] ,
-    "on_market_drugs":             [{{"product":"","company":"","modality":"","moa":"","year_of_approval":"","sales_or_share_ref":"","citation":""}}] ,
-    "drugs_in_clinical_trials":    [{{"product":"","company":"","phase":"","pivotal_endpoint":"","pdufa_or_milestone":"","citation":""}}] ,
-    "preclinical_stage_assets_global": [{{"program":"","company_or_institution":"","modality":"","moa":"","citation":""}}] ,
-    "internal_ip_db_similar": [{{"reference_id":"","title_or_handle":"","note":"(leave empty if not accessible)","citation":""}}]
-  }},
-  "intellectual_property": {{
-    "patent_portfolio_and_strength": {{
-      "composition_of_matter": {{"patents":[""],"expiry":"","jurisdictions":[""],"citation":""}},
-      "method_of_use":         {{"patents":[""],"expiry":"","citation":""}},
-      "formulation_or_process":{{"patents":[""],"expiry":"","citation":""}},
-      "overall_strength_commentary": ""
-    }},
-    "cas_novelty_and_ip_risk_notes": {{"commentary":"","citation":""}}
-  }},
-  "research_plan_and_milestones": [
-    {{"milestone":"","timeline_quarter_year":"","success_criteria":"","citation":""}}
-  ],
-  "market_scope": {{
-    "origin_country": {{
-      "name": "",
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }},
-    "global": {{
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }},
-    "us": {{
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }}
-  }},
-  "partnership_recommendations_and_exit_strategy": {{
-    "partnerships": [{{"company":"","rationale":"","precedent_deals_refs":[""],"citation":""}}] ,
-    "exit_strategy": {{"options":["licensing","acquisition","ipo"],"potential_acquirers":[""],"valuation_range":{{"low":"","high":"","citation":""}}}}
-  }},
-  "commercialization_strategy": {{
-    "go_to_market": "",
-    "access_and_pricing": {{"benchmark_products":[""],"expected_price_range":"","citation":""}},
-    "medical_affairs_and_kol": "",
-    "launch_phasing": ""
-  }},
-  "scores": {{
-    "pillars": {{
-      "clinical_evidence":           {{"score":0,"rationale":"","citation":""}},
-      "regulatory_clarity":          {{"score":0,"rationale":"","citation":""}},
-      "ip_strength":                 {{"score":0,"rationale":"","citation":""}},
-      "market_attractiveness":       {{"score":0,"rationale":"","citation":""}},
-      "manufacturing_cmc_readiness": {{"score":0,"rationale":"","citation":""}},
-      "competitive_moat":            {{"score":0,"rationale":"","citation":""}},
-      "team_inventor_quality":       {{"score":0,"rationale":"","citation":""}},
-      "source_quality":              {{"score":0,"rationale":"","citation":""}}
-    }},
-    "methodology": {{
-      "weights": {{"clinical_evidence":0.20,"regulatory_clarity":0.15,"ip_strength":0.15,"market_attractiveness":0.15,"manufacturing_cmc_readiness":0.10,"competitive_moat":0.10,"team_inventor_quality":0.10,"source_quality":0.05}},
-      "scoring_notes": "",
-      "limitations": ""
-    }}
-  }},
-  "citations_summary": {{"total_citations":0,"peer_reviewed_papers":0,"regulatory_documents":0,"clinical_trial_refs":0,"primary_sources":[""]}},
-  "data_gaps": [],
-  "bibliography": [{{"category":"peer_reviewed/regulatory/market/patent","citation":""}}]
-}}
-Return ONLY valid JSON.
-"""
-
-    # ===================== US (same packet order, US emphasis) =====================
-    US_LIFE_SCIENCES_PROMPT = """You are a senior life sciences due diligence analyst. Produce a CITED JSON diligence packet for the US market. Use the same packet order and fields as the GLOBAL prompt.
-
-STRICT RULES
-- Cite every claim with FDA/CMS/ClinicalTrials.gov, peer-reviewed journals, SEC filings, and reputable US market sources.
-- Provide ≥5 US-relevant close comparators with formulary/coverage or pricing/market refs where applicable.
-- For any uncitable field: value null, empty "citation", and add "Not enough valid cited information: <json_path>" to data_gaps.
-- Keep pillar scores separate from CAS novelty.
-
-STAGE-BREADTH MODE: US_LATE
-
-TECHNOLOGY DATA (verbatim):
-{technology_data}
-
-REQUIRED OUTPUT JSON (exact order and shape — identical keys as GLOBAL; US-specific facts should be emphasized where relevant):
-{{
-  "meta": {{"analysis_date":"YYYY-MM-DD","stage_breadth_mode":"US_LATE","analysis_type":"us_life_sciences"}},
-  "executive_summary": {{
-    "summary_bullets": ["",""],
-    "key_takeaway": "",
-    "citation": ""
-  }},
-  "unmet_need_and_market_overview": {{
-    "market_size": {{
-      "global": {{"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}},
-      "us":     {{"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}}
-    }},
-    "epidemiology": {{
-      "prevalence": {{"global":"","us":"","citation":""}},
-      "incidence":  {{"global":"","us":"","citation":""}}
-    }}
-  }},
-  "technological_differentiation": {{
-    "mechanism_of_action": {{"description":"","citation":""}},
-    "indication": "",
-    "therapeutic_area": "",
-    "modality": "",
-    "route_of_administration": ""
-  }},
-  "current_treatment_paradigm": {{
-    "if_indication_listed": {{
-      "first_line":  [""],
-      "second_line": [""],
-      "third_line":  [""] ,
-      "citation": ""
-    }},
-    "if_indication_not_listed": {{
-      "recommended_indications_based_on_moa": [""] ,
-      "gold_standard_treatments_for_recommended_indications": [""] ,
-      "citation": ""
-    }}
-  }},
-  "competitive_landscape": {{
-    "clinical_stage_assets_global": [{{"product":"","company":"","modality":"","moa":"","stage":"","key_ref_or_nct":"","citation":""}}] ,
-    "on_market_drugs":             [{{"product":"","company":"","modality":"","moa":"","year_of_approval":"","sales_or_share_ref":"","citation":""}}] ,
-    "drugs_in_clinical_trials":    [{{"product":"","company":"","phase":"","pivotal_endpoint":"","pdufa_or_milestone":"","citation":""}}] ,
-    "preclinical_stage_assets_global": [{{"program":"","company_or_institution":"","modality":"","moa":"","citation":""}}] ,
-    "internal_ip_db_similar": [{{"reference_id":"","title_or_handle":"","note":"(leave empty if not accessible)","citation":""}}]
-  }},
-  "intellectual_property": {{
-    "patent_portfolio_and_strength": {{
-      "composition_of_matter": {{"patents":[""],"expiry":"","jurisdictions":[""],"citation":""}},
-      "method_of_use":         {{"patents":[""],"expiry":"","citation":""}},
-      "formulation_or_process":{{"patents":[""],"expiry":"","citation":""}},
-      "overall_strength_commentary": ""
-    }},
-    "cas_novelty_and_ip_risk_notes": {{"commentary":"","citation":""}}
-  }},
-  "research_plan_and_milestones": [
-    {{"milestone":"","timeline_quarter_year":"","success_criteria":"","citation":""}}
-  ],
-  "market_scope": {{
-    "origin_country": {{
-      "name": "",
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }},
-    "global": {{
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }},
-    "us": {{
-      "market_size_usd": "",
-      "cagr_percent": "",
-      "five_year_usd_out": "",
-      "citation": ""
-    }}
-  }},
-  "partnership_recommendations_and_exit_strategy": {{
-    "partnerships": [{{"company":"","rationale":"","precedent_deals_refs":[""],"citation":""}}] ,
-    "exit_strategy": {{"options":["licensing","acquisition","ipo"],"potential_acquirers":[""],"valuation_range":{{"low":"","high":"","citation":""}}}}
-  }},
-  "commercialization_strategy": {{
-    "go_to_market": "",
-    "access_and_pricing": {{"benchmark_products":[""],"expected_price_range":"","citation":""}},
-    "medical_affairs_and_kol": "",
-    "launch_phasing": ""
-  }},
-  "scores": {{
-    "pillars": {{
-      "clinical_evidence":           {{"score":0,"rationale":"","citation":""}},
-      "regulatory_clarity":          {{"score":0,"rationale":"","citation":""}},
-      "ip_strength":                 {{"score":0,"rationale":"","citation":""}},
-      "market_attractiveness":       {{"score":0,"rationale":"","citation":""}},
-      "manufacturing_cmc_readiness": {{"score":0,"rationale":"","citation":""}},
-      "competitive_moat":            {{"score":0,"rationale":"","citation":""}},
-      "team_inventor_quality":       {{"score":0,"rationale":"","citation":""}},
-      "source_quality":              {{"score":0,"rationale":"","citation":""}}
-    }},
-    "methodology": {{
-      "weights": {{"clinical_evidence":0.20,"regulatory_clarity":0.15,"ip_strength":0.15,"market_attractiveness":0.15,"manufacturing_cmc_readiness":0.10,"competitive_moat":0.10,"team_inventor_quality":0.10,"source_quality":0.05}},
-      "scoring_notes": "",
-      "limitations": ""
-    }}
-  }},
-  "citations_summary": {{"total_citations":0,"peer_reviewed_papers":0,"regulatory_documents":0,"clinical_trial_refs":0,"primary_sources":[""]}},
-  "data_gaps": [],
-  "bibliography": [{{"category":"peer_reviewed/regulatory/market/patent","citation":""}}]
-}}
-Return ONLY valid JSON.
-"""
-
-# ============================================================================
-# CITATION VALIDATOR FOR LIFE SCIENCES
-# ============================================================================
-
-class LifeSciencesCitationValidator:
-    """Validates citations for medical/scientific credibility with tiers."""
-
-    # Hard blocklist stays
-    FORBIDDEN = ['wikipedia', 'webmd', 'healthline', 'blog', 'medium.com',
-                 'reddit', 'quora', 'facebook', 'twitter']
-
-    # Regex groups for tiers (highest preference first)
-    TIER_PATTERNS = [
-        # Tier 1: regulators, PubMed/DOI/PMID, top journals
-        (1, [
-            r'\b(fda|ema|ich|who|pmda|tga|mhra|swissmedic)\b',
-            r'\bepar\b',
-            r'\bpubmed\b|\bpmid:\s*\d+\b',
-            r'\bdoi:\s*10\.\d{4,9}/\S+',
-            r'\bnejm\b|\blancet\b|\bjama\b|\bnature\b|\bscience\b|\bcell\b',
-            r'drugsatfda|accessdata\.fda\.gov|cfpma|pma\.cfm'
-        ]),
-        # Tier 2: clinical registries and public health/statistics
-        (2, [
-            r'clinicaltrials\.gov|\bnct\d{8}\b',
-            r'\bseer\.cancer\.gov\b',
-            r'\bcdc\.gov\b',
-            r'\beudract\b'
-        ]),
-        # Tier 3: company and market research (acceptable if needed)
-        (3, [
-            r'\bsec\.gov\b|\b10-k\b|\bannual report\b',
-            r'iqvia|evaluate|globaldata|citeline|biomedtracker|cortellis|frost\s*&\s*sullivan|grand\s*view\s*research'
-        ])
-    ]
-
-    @staticmethod
-    def _matches_any(text: str, patterns) -> bool:
-        return any(re.search(p, text, flags=re.IGNORECASE) for p in patterns)
-
-    def assess(self, citation: str):
-        """
-        Returns (allowed: bool, tier: int|None, reason: str)
-        """
-        if not isinstance(citation, str) or not citation.strip():
-            return (False, None, 'empty')
-
-        c = citation.lower()
-        if any(b in c for b in self.FORBIDDEN):
-            return (False, None, 'forbidden')
-
-        for tier, pats in self.TIER_PATTERNS:
-            if self._matches_any(citation, pats):
-                return (True, tier, 'matched')
-
-        # If it doesn't match any pattern, allow it but treat as Tier 3 fallback
-        return (True, 3, 'fallback')
-
-    # Backwards-compatible shim (so the rest of your code keeps calling the same name if needed)
-    def validate_medical_citation(self, citation: str) -> bool:
-        """
-        Treat Tier 1, 2, and 3 as valid (allowed). Only forbidden/empty are invalid.
-        """
-        allowed, tier, _ = self.assess(citation)
-        return bool(allowed and tier in (1, 2, 3))
-
-
-
-    @staticmethod
-    def format_medical_citation(citation_data: Dict) -> str:
-        """Format medical/scientific citations properly"""
-        cit_type = citation_data.get('type', '')
-
-        if cit_type == 'journal':
-            authors = citation_data.get('authors', 'Unknown')
-            year = citation_data.get('year', 'n.d.')
-            title = citation_data.get('title', 'Untitled')
-            journal = citation_data.get('journal', 'Unknown Journal')
-            volume = citation_data.get('volume', '')
-            pages = citation_data.get('pages', '')
-            doi = citation_data.get('doi', '')
-            pmid = citation_data.get('pmid', '')
-
-            citation = f"{authors}. ({year}). {title}. {journal}"
-            if volume:
-                citation += f", {volume}"
-            if pages:
-                citation += f":{pages}"
-            if doi:
-                citation += f". DOI: {doi}"
-            elif pmid:
-                citation += f". PMID: {pmid}"
-            return citation
-
-        elif cit_type == 'clinical_trial':
-            nct = citation_data.get('nct_number', '')
-            title = citation_data.get('title', 'Untitled')
-            sponsor = citation_data.get('sponsor', 'Unknown')
-            status = citation_data.get('status', '')
-            return f"ClinicalTrials.gov {nct}. {title}. Sponsor: {sponsor}. Status: {status}"
-
-        elif cit_type == 'regulatory':
-            agency = citation_data.get('agency', 'FDA')
-            doc_type = citation_data.get('doc_type', 'Guidance')
-            title = citation_data.get('title', 'Untitled')
-            year = citation_data.get('year', 'n.d.')
-            doc_number = citation_data.get('doc_number', '')
-            return f"{agency}. ({year}). {doc_type}: {title}. {doc_number}"
-
-        else:
-            source = citation_data.get('source', 'Unknown')
-            year = citation_data.get('year', 'n.d.')
-            title = citation_data.get('title', '')
-            return f"{source}. ({year}). {title}"
-
-# ============================================================================
-# MAIN ANALYZER CLASS
-# ============================================================================
-
-class LifeSciencesDueDiligenceAnalyzer:
-    """Complete analyzer for life sciences and biotech IP"""
-
-    def __init__(self, api_key: str = None):
-        """Initialize with OpenAI client and validators"""
-        self.api_key = api_key or Config.OPENAI_API_KEY
-        self.client = OpenAI(api_key=self.api_key)
-        self.citation_validator = LifeSciencesCitationValidator()
-        self.ensure_output_dir()
-
-    
-    def _responses_generate_json(self, system_prompt: str, user_prompt: str, max_output_tokens: int):
-        """
-        Call Responses API with hosted web_search enabled.
-        Force JSON via instruction (no response_format arg).
-        """
-        # Strong, explicit JSON-only nudge
-        json_only_nudge = (
-            "Return ONLY a valid JSON object matching the requested schema. "
-            "No markdown, no prose, no preamble."
-        )
-
-        resp = self.client.responses.create(
-            model=Config.MODEL,
-            input=[
-                {
-                    "role": "system",
-                    "content": [
-                        {"type": "input_text", "text": system_prompt}
-                    ],
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": f"{user_prompt}\n\n{json_only_nudge}"}
-                    ],
-                },
-            ],
-            tools=[{"type": "web_search"}],
-            # tool_choice is optional; default is auto. If you keep it:
-            tool_choice="auto",
-            max_output_tokens=max_output_tokens,
-            #temperature=Config.TEMPERATURE,
-        )
-
-
-
-        # Prefer the convenience property if present
-        raw_json = getattr(resp, "output_text", None)
-
-        # Fallback: walk the structured output for the first text part
-        if not raw_json:
-            msg = next((x for x in getattr(resp, "output", []) if getattr(x, "type", "") == "message"), None)
-            if msg and getattr(msg, "content", None):
-                part = msg.content[0]
-                raw_json = getattr(part, "text", None) or str(part)
-
-        if not raw_json:
-            raise RuntimeError("Responses API returned no text; cannot parse JSON.")
-
-        # Strict parse, then fallback to largest-JSON-block extraction if needed
-        try:
-            data = json.loads(raw_json)
-        except Exception:
-            data = json.loads(self._extract_json_block(raw_json))
-
-        # Optional: collect a few URL citations for debug
-        sample_urls = []
-        try:
-            msg = next((x for x in getattr(resp, "output", []) if getattr(x, "type", "") == "message"), None)
-            parts = getattr(msg, "content", []) if msg else []
-            anns = []
-            for p in parts:
-                anns.extend(getattr(p, "annotations", []) or [])
-            sample_urls = [a.url for a in anns if getattr(a, "type", "") == "url_citation" and getattr(a, "url", None)]
-        except Exception:
-            pass
-
-        # Light usage capture if available
-        usage = getattr(resp, "usage", None)
-        self.last_token_usage = {
-            "prompt_tokens": getattr(usage, "input_tokens", None),
-            "completion_tokens": getattr(usage, "output_tokens", None),
-            "total_tokens": ((getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)),
-        }
-
-        return data, {"url_citations_found": len(sample_urls), "sample_citations": sample_urls[:5]}
-
-    def _generate_json(self, system_prompt: str, user_prompt: str) -> dict:
-        """
-        Now uses Responses API + web_search. Same return contract.
-        """
-        data, dbg = self._responses_generate_json(system_prompt, user_prompt, Config.MAX_TOKENS)
-        self.last_debug = dbg
-        return data
-
-
-    def ensure_output_dir(self):
-        """Create output directory if it doesn't exist"""
-        Path(Config.OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
-
-    def _compute_composite_score(self, scores_pillars: Dict[str, Any]) -> Dict[str, Any]:
-        """Compute weighted composite score 0-100 and band."""
-        total = 0.0
-        weight_sum = 0.0
-        for pillar, w in SCORE_WEIGHTS.items():
-            try:
-                s = float(scores_pillars.get(pillar, {}).get("score", 0))
-                s = max(0.0, min(5.0, s))
-            except (TypeError, ValueError):
-                s = 0.0
-            total += (s / 5.0) * w
-            weight_sum += w
-        pct = round(((total / weight_sum) * 100.0), 1) if weight_sum else 0.0
-        band = "Green" if pct >= 75 else ("Amber" if pct >= 55 else "Red")
-        return {"score_0_100": pct, "band": band}
-
-    def detect_life_sciences_category(self, technology_data: Dict) -> tuple:
-        """Detect specific life sciences category from data"""
-        data_str = str(technology_data).lower()
-
-        categories = {
-            'SMALL_MOLECULE_DRUG': ['small molecule', 'compound', 'nce', 'new chemical entity', 'oral drug'],
-            'BIOLOGIC': ['antibody', 'protein', 'peptide', 'biologic', 'mab', 'biosimilar', 'fusion protein'],
-            'GENE_THERAPY': ['gene therapy', 'gene editing', 'crispr', 'aav', 'lentivirus', 'car-t'],
-            'VACCINE': ['vaccine', 'immunization', 'prophylactic', 'adjuvant', 'antigen'],
-            'DIAGNOSTIC': ['diagnostic', 'biomarker', 'assay', 'pcr', 'elisa', 'sequencing', 'liquid biopsy'],
-            'MEDICAL_DEVICE': ['device','implant','surgical','catheter','stent','510k','510(k)','pma'],
-            'DIGITAL_HEALTH': ['digital therapeutic', 'dtx', 'samd', 'ai diagnostic', 'telehealth', 'mhealth'],
-            'AGRICULTURAL_BIOTECH': ['crop', 'seed', 'pesticide', 'herbicide', 'gmo', 'plant', 'soil', 'yield', 'trait'],
-            'VETERINARY': ['veterinary', 'animal health', 'livestock', 'aquaculture', 'fish', 'cattle', 'poultry', 'companion animal', 'salmon', 'louse', 'parasite'],
-        }
-
-        scores = {}
-        for category, keywords in categories.items():
-            score = sum(2 if keyword in data_str and len(keyword) > 5 else 1 for keyword in keywords if keyword in data_str)
-            if score > 0:
-                scores[category] = score
-        
-        if scores:
-            # Get top category but also check for multi-category technologies
-            detected = max(scores, key=scores.get)
-            
-            # Special handling for combination categories
-            if 'DIAGNOSTIC' in scores and 'DIGITAL_HEALTH' in scores:
-                detected = 'DIGITAL_DIAGNOSTIC'
-            elif 'MEDICAL_DEVICE' in scores and 'DIGITAL_HEALTH' in scores:
-                detected = 'CONNECTED_MEDICAL_DEVICE'
-            
-            return detected, scores
-        
-        return 'GENERAL_LIFE_SCIENCES', {}
-
-    def _guess_origin_country(self, technology_data: Dict[str, Any]) -> str:
-        """Best-effort origin-country hint from fields or text (non-authoritative)"""
-        # direct fields first
-        for key in ("assignee_country","inventor_country","priority_country",
-                    "jurisdiction","applicant_country","origin_country"):
-            v = technology_data.get(key)
-            if isinstance(v, str) and v.strip():
-                return v.strip()
-        # heuristic scan
-        txt = json.dumps(technology_data, ensure_ascii=False).lower()
-        candidates = [
-            "united states","usa","us","china","cn","europe","eu","japan","jp",
-            "korea","kr","india","in","united kingdom","uk","germany","de",
-            "france","fr","italy","it","canada","ca","australia","au","brazil","br"
-        ]
-        for c in candidates:
-            if c in txt:
-                return c
-        return ""
-
-    def enhance_prompt_with_sources(self, category: str) -> str:
-        """Add relevant citation source hints based on category"""
-        source_recommendations = []
-
-        if 'DRUG' in category or 'BIOLOGIC' in category:
-            source_recommendations.extend([
-                "Search PubMed for mechanism of action studies",
-                "Check ClinicalTrials.gov (NCT) for ongoing trials / endpoints",
-                "Review FDA Orange/Purple Book for patent & exclusivity",
-                "Use IQVIA/Evaluate/GlobalData for market size and share"
-            ])
-        elif 'VACCINE' in category:
-            source_recommendations.extend([
-                "NEJM/Lancet vaccine trials",
-                "WHO vaccine pipeline / SAGE/ACIP",
-                "EMA EPAR, FDA BLA precedents"
-            ])
-        elif 'DIAGNOSTIC' in category:
-            source_recommendations.extend([
-                "Diagnostic accuracy studies (sensitivity/specificity)",
-                "FDA 510(k)/PMA predicates",
-                "CMS coverage decisions (NCD/LCD)"
-            ])
-        elif 'DEVICE' in category:
-            source_recommendations.extend([
-                "FDA MAUDE adverse events",
-                "510(k)/PMA database for predicates",
-                "Peer-reviewed device outcomes"
-            ])
-        elif 'AGRICULTURAL' in category or 'VETERINARY' in category:
-            source_recommendations.extend([
-                "USDA/EPA registrations",
-                "Veterinary/agri peer-reviewed journals",
-                "FAO market/epidemiology reports"
-            ])
-
-        return "\n".join(source_recommendations)
-    
-    def _merge_corrections(self, original: Dict, corrections: Dict) -> Dict:
-        """Merge targeted corrections into original report"""
-        import copy
-        merged = copy.deepcopy(original)
-        
-        def update_nested(target, source, path=""):
-            for key, value in source.items():
-                if key in target:
-                    if isinstance(value, dict) and isinstance(target[key], dict):
-                        update_nested(target[key], value, f"{path}.{key}" if path else key)
-                    elif value is not None and value != "":
-                        # Only update if correction has valid data
-                        target[key] = value
-                        print(f"      Updated: {path}.{key}")
-                else:
-                    target[key] = value
-        
-        update_nested(merged, corrections)
-        return merged
-
-    def load_technology_data(self, file_path: str, record_index: Optional[int] = None) -> Dict[str, Any]:
-        """Load technology data from JSON file; optionally select one record in a list."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                data = json.load(f)
-
-        if isinstance(data, list) and record_index is not None:
-            if record_index < 0 or record_index >= len(data):
-                raise IndexError(f"record_index {record_index} out of range (0..{len(data)-1})")
-            item = data[record_index]
-            if isinstance(item, dict) and "details" in item and isinstance(item["details"], dict):
-                return item["details"]
-            return item
-        return data
-
-    @staticmethod
-    def _extract_json_block(text: str) -> str:
-        """Best-effort: pull the largest JSON object from a text block."""
-        if not text:
-            return ""
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return text[start:end+1].strip()
-        return text.strip()
-
-
-    def analyze_life_sciences_ip(self, technology_data: Dict[str, Any], analysis_type: str = "global") -> Dict[str, Any]:
-        # Detect category early (you already do this later; do it once here)
-        category, _ = self.detect_life_sciences_category(technology_data)
-        print(f"   Detected Category: {category}")
-
-        # Prompt enhancers (optional module)
-        domain_requirements = ""
-        if Config.ENABLE_DOMAIN_VALIDATION:
-            try:
-                from domain_validation import DomainSpecificPrompter
-                prompter = DomainSpecificPrompter()
-                domain_requirements = prompter.get_enhancement(category)
-            except ImportError:
-                print("   (domain_validation not installed; skipping domain prompt enhancements)")
-            except Exception as e:
-                print(f"   (domain_validation prompt enhancer warning: {e})")
-
-        source_guidance = self.enhance_prompt_with_sources(category)
-        origin_hint = self._guess_origin_country(technology_data)
-        origin_hint_line = f"ORIGIN COUNTRY HINT (best-effort): {origin_hint or 'NA'}"
-
-        base_prompt = (
-            LifeSciencesPrompts.GLOBAL_LIFE_SCIENCES_PROMPT
-            if analysis_type == "global"
-            else LifeSciencesPrompts.US_LIFE_SCIENCES_PROMPT
-        ).format(technology_data=json.dumps(technology_data, indent=2))
-
-        enhanced_prompt = f"""
-    {origin_hint_line}
-    DETECTED TECHNOLOGY CATEGORY: {category}
-
-    {domain_requirements}
-
-    RECOMMENDED CITATION SOURCES FOR THIS CATEGORY:
-    {source_guidance}
-
-    SPECIFIC CREDIBLE SOURCES TO PRIORITIZE:
-    - Medical Journals: {', '.join(LIFE_SCIENCES_SOURCES['medical_journals'][:5])}
-    - Databases: {', '.join(LIFE_SCIENCES_SOURCES['pharma_databases'][:5])}
-    - Regulatory: {', '.join(LIFE_SCIENCES_SOURCES['regulatory_sources'][:5])}
-    - Market Research: {', '.join(LIFE_SCIENCES_SOURCES['market_research'][:5])}
-
-    {base_prompt}
-    """
-
-        try:
-            print("   Generating analysis report...")
-            result = self._generate_json(LifeSciencesPrompts.BASE_SYSTEM_PROMPT, enhanced_prompt)
-            dbg = getattr(self, "last_debug", {}) or {}
-            print("🔎 web citations found:", dbg.get("url_citations_found", 0))
-            print("🔗 sample URLs:", dbg.get("sample_citations", []))
-
-            if hasattr(self, "last_token_usage"):
-                result.setdefault("meta", {})["token_usage"] = self.last_token_usage
-
-            result = self.validate_report_citations(result)
-
-            # Domain-specific validation and review (optional)
-            if Config.ENABLE_DOMAIN_VALIDATION:
-                try:
-                    from domain_validation import DomainValidator, AnalysisReviewer
-                    validator = DomainValidator()
-                    issues = validator.validate_market_data(result, category)  # result & category now exist
-
-                    if issues:
-                        print(f"⚠️ Found {len(issues)} validation issues")
-                        high_priority = [i for i in issues if i.get('severity') == 'HIGH']
-                        if high_priority:
-                            print("   Attempting to correct critical issues...")
-    #                         correction_prompt = f"""
-    # Based on the initial analysis, the following CRITICAL issues need correction:
-
-    # {json.dumps(high_priority, indent=2)}
-
-    # For each issue, perform the specific recommended search and provide ONLY the corrected data.
-    # DO NOT use broad sector data as a proxy. If specific data cannot be found, set the field to null 
-    # and add an appropriate data_gap entry.
-
-    # Focus on:
-    # 1. Finding {category}-specific market data (not total sector)
-    # 2. Adding missing required fields with proper citations
-    # 3. Using targeted search queries as recommended
-
-    # Return corrections in JSON format matching the original schema.
-    # """
-    #                         try:
-    #                             corrections = self._generate_json(LifeSciencesPrompts.BASE_SYSTEM_PROMPT, correction_prompt)
-    #                             result = self._merge_corrections(result, corrections)
-    #                             print("   ✓ Applied corrections")
-    #                         except Exception as e:
-    #                             print(f"   ⚠️ Could not apply all corrections: {e}")
-
-                    reviewer = AnalysisReviewer()
-                    review = reviewer.review_report(result, category)
-                    result['quality_assessment'] = {
-                        'score': review.get('quality_score', 0),
-                        'category': category,
-                        'issues_found': len(review.get('issues', [])),
-                        'passed_validation': review.get('quality_score', 0) >= 70
-                    }
-                    print(f"   Quality Score: {result['quality_assessment']['score']}/100")
-                    if result['quality_assessment']['score'] < 70:
-                        for rec in review.get('recommendations', [])[:3]:
-                            print(f"     - {rec}")
-                except ImportError:
-                    # Optional module missing; skip without failing the run
-                    pass
-                except Exception as e:
-                    print(f"   Validation/review warning: {e}")
-
-            # Composite score
-            try:
-                pillars = result.get("scores", {}).get("pillars")
-                if isinstance(pillars, dict):
-                    result["scores"]["composite"] = self._compute_composite_score(pillars)
-            except Exception:
-                pass
-
-            return result
-
-        except Exception as e:
-            print(f"Error during analysis: {e}")
-            raise
-
-
-    def validate_report_citations(self, report: Dict) -> Dict:
-        """Validate all citations; if invalid: blank citation, set simple value to 'None', and log data_gap.
-        Also count Tier 1/2/3 sources in citations_summary.tier_counts."""
-        citation_count = 0
-        valid_citations = 0
-        invalid_citations = []
-
-        # 1) counters for Tier 1/2/3 (classification comes from citation_validator.assess)
-        tier_counts = {1: 0, 2: 0, 3: 0}  
-        valid_by_tier = {1: 0, 2: 0, 3: 0}
-        
-
-        def add_gap(path: str, flagged_source: str = ""):
-            gaps = report.setdefault("data_gaps", [])
-            if flagged_source:
-                msg = f"Not enough valid cited information: {path} → flagged source: {flagged_source}"
-            else:
-                msg = f"Not enough valid cited information: {path}"
-            if msg not in gaps:
-                gaps.append(msg)
-
-        def check(obj, path=""):
-            nonlocal citation_count, valid_citations
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    p = f"{path}.{k}" if path else k
-                    if k == "citation" and isinstance(v, str):
-                        citation_count += 1
-
-                        # Single source of truth for tier + allow/deny
-                        allowed, tier, _ = self.citation_validator.assess(v) if v else (False, None, 'empty')
-                        is_valid = self.citation_validator.validate_medical_citation(v)  # now True for tiers 1/2/3
-
-                        if allowed and is_valid:
-                            # Count every allowed (tiers 1/2/3) as valid
-                            valid_citations += 1
-                            if tier in (1, 2, 3):
-                                tier_counts[tier] += 1
-                                valid_by_tier[tier] += 1
-                        else:
-                            # Only forbidden/empty hit this path → blank cite, set sibling to NA, add data_gap
-                            invalid_citations.append(f"{p}: {v}")
-                            obj[k] = ""  # blank invalid citation
-                            for sk in list(obj.keys()):
-                                if sk == "citation":
-                                    continue
-                                sv = obj[sk]
-                                if isinstance(sv, (str, int, float)) and sv not in ("",):
-                                    obj[sk] = None
-                                    break
-                            add_gap(path, flagged_source=v.strip())
-
-                    elif isinstance(v, (dict, list)):
-                        check(v, p)
-            elif isinstance(obj, list):
-                for i, it in enumerate(obj):
-                    check(it, f"{path}[{i}]")
-
-        check(report)
-
-        # Update citation summary
-        rep = report.setdefault('citations_summary', {})
-        rep['total_citations'] = citation_count
-        rep['valid_citations'] = valid_citations
-        rep['citation_quality_score'] = f"{(valid_citations/max(1, citation_count)*100):.1f}%"
-        if invalid_citations:
-            rep['invalid_citations'] = invalid_citations[:10]
-
-        #tier counts to the summary
-        rep['tier_counts'] = {              
-            "tier1": tier_counts[1],
-            "tier2": tier_counts[2],
-            "tier3": tier_counts[3],
-        }
-        rep['valid_by_tier'] = {
-            "tier1": valid_by_tier[1],
-            "tier2": valid_by_tier[2],
-            "tier3": valid_by_tier[3],
-        }
-        return report
-
-
-    def save_report(self, report: Dict[str, Any], input_file: str, analysis_type: str):
-        """Save the analysis report with bibliography"""
-        base_name = Path(input_file).stem
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        report_file = f"{Config.OUTPUT_DIR}/{base_name}_{analysis_type}_lifesci_dd_{timestamp}.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
-
-        biblio_file = f"{Config.OUTPUT_DIR}/{base_name}_{analysis_type}_bibliography_{timestamp}.txt"
-        self.export_bibliography(report, biblio_file)
-
-        print(f"✓ {analysis_type.upper()} analysis saved to: {report_file}")
-        print(f"✓ Bibliography saved to: {biblio_file}")
-
-        return report_file
-
-    def export_bibliography(self, report: Dict, output_file: str):
-        """Export formatted medical/scientific bibliography"""
-        citations = []
-
-        def extract_citations(obj):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key == 'citation' and isinstance(value, str) and value and not value.startswith('Not enough'):
-                        if value not in citations:
-                            citations.append(value)
-                    elif isinstance(value, (dict, list)):
-                        extract_citations(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    extract_citations(item)
-
-        extract_citations(report)
-
-        journal_citations = [c for c in citations if any(j.lower() in c.lower() for j in
-                               ['journal', 'nejm', 'lancet', 'jama', 'nature', 'science', 'cell'])]
-        regulatory_citations = [c for c in citations if any(r in c.lower() for r in
-                                  ['fda', 'ema', 'guidance', 'regulation', 'epar', 'sec.gov', 'orange book', 'purple book'])]
-        trial_citations = [c for c in citations if 'nct' in c.lower() or 'clinicaltrials' in c.lower()]
-        market_citations = [c for c in citations if any(m in c.lower() for m in
-                               ['market', 'iqvia', 'evaluate', 'globaldata', 'citeline'])]
-        other_citations = [c for c in citations if c not in journal_citations + regulatory_citations + trial_citations + market_citations]
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("MEDICAL & SCIENTIFIC BIBLIOGRAPHY\n")
-            f.write("="*60 + "\n\n")
-
-            if journal_citations:
-                f.write("PEER-REVIEWED PUBLICATIONS\n")
-                f.write("-"*40 + "\n")
-                for i, citation in enumerate(sorted(journal_citations), 1):
-                    f.write(f"[{i}] {citation}\n\n")
-
-            if trial_citations:
-                f.write("\nCLINICAL TRIALS\n")
-                f.write("-"*40 + "\n")
-                for i, citation in enumerate(sorted(trial_citations), 1):
-                    f.write(f"[{i}] {citation}\n\n")
-
-            if regulatory_citations:
-                f.write("\nREGULATORY DOCUMENTS\n")
-                f.write("-"*40 + "\n")
-                for i, citation in enumerate(sorted(regulatory_citations), 1):
-                    f.write(f"[{i}] {citation}\n\n")
-
-            if market_citations:
-                f.write("\nMARKET RESEARCH\n")
-                f.write("-"*40 + "\n")
-                for i, citation in enumerate(sorted(market_citations), 1):
-                    f.write(f"[{i}] {citation}\n\n")
-
-            if other_citations:
-                f.write("\nOTHER SOURCES\n")
-                f.write("-"*40 + "\n")
-                for i, citation in enumerate(sorted(other_citations), 1):
-                    f.write(f"[{i}] {citation}\n\n")
-
-    def run_complete_analysis(self, input_file: str, record_index: Optional[int] = None):
-        """Run only the US analysis for life sciences IP"""
-        print(f"\n🧬 Starting Life Sciences Due Diligence Analysis")
-        print("="*60)
-
-        # Load data
-        print("📁 Loading technology data...")
-        technology_data = self.load_technology_data(input_file, record_index)
-
-        # Detect and display category
-        category, _ = self.detect_life_sciences_category(technology_data)
-        print(f"🔬 Technology Category: {category}")
-
-        # --- GLOBAL analysis (DISABLED) ---
-        # print("\n🌍 Running GLOBAL life sciences analysis...")
-        # print("   Searching medical/scientific literature...")
-        # global_report = self.analyze_life_sciences_ip(technology_data, "global")
-        # global_quality = global_report.get('citations_summary', {}).get('citation_quality_score', '0%')
-        # print(f"   Citation Quality: {global_quality}")
-        # global_file = self.save_report(global_report, input_file, "global")
-
-        global_report = None
-        global_file = None
-
-        # Run US market analysis (ENABLED)
-        print("\n🇺🇸 Running US MARKET life sciences analysis...")
-        print("   Searching FDA/CMS/US medical sources...")
-        us_report = self.analyze_life_sciences_ip(technology_data, "us")
-
-        us_quality = us_report.get('citations_summary', {}).get('citation_quality_score', '0%')
-        print(f"   Citation Quality: {us_quality}")
-
-        us_file = self.save_report(us_report, input_file, "us")
-
-        # Summary
-        print("\n" + "="*60)
-        print("✅ Life Sciences Analysis Complete!")
-        print(f"📊 Technology Type: {category}")
-        # print(f"📄 Global Report: {global_file}")  # (DISABLED)
-        print(f"📄 US Report: {us_file}")
-
-        # Citation summary
-        print("\n📚 Citation Summary:")
-        # print(f"   Global: {global_report.get('citations_summary', {}).get('total_citations', 0)} citations ({global_quality} valid)")  # (DISABLED)
-        print(f"   US: {us_report.get('citations_summary', {}).get('total_citations', 0)} citations ({us_quality} valid)")
-
-        
-        return us_report  # or: return (None, us_report)
-
-    
-    # def run_complete_analysis(self, input_file: str, record_index: Optional[int] = None):
-    #     """Run both global and US analyses for life sciences IP"""
-    #     print(f"\n🧬 Starting Life Sciences Due Diligence Analysis")
-    #     print("="*60)
-
-    #     # Load data
-    #     print("📁 Loading technology data...")
-    #     technology_data = self.load_technology_data(input_file, record_index)
-
-    #     # Detect and display category
-    #     category, _ = self.detect_life_sciences_category(technology_data)
-    #     print(f"🔬 Technology Category: {category}")
-
-    #     # Run global analysis
-    #     print("\n🌍 Running GLOBAL life sciences analysis...")
-    #     print("   Searching medical/scientific literature...")
-    #     global_report = self.analyze_life_sciences_ip(technology_data, "global")
-
-    #     global_quality = global_report.get('citations_summary', {}).get('citation_quality_score', '0%')
-    #     print(f"   Citation Quality: {global_quality}")
-
-    #     global_file = self.save_report(global_report, input_file, "global")
-
-    #     # Run US market analysis
-    #     print("\n🇺🇸 Running US MARKET life sciences analysis...")
-    #     print("   Searching FDA/CMS/US medical sources...")
-    #     us_report = self.analyze_life_sciences_ip(technology_data, "us")
-
-    #     us_quality = us_report.get('citations_summary', {}).get('citation_quality_score', '0%')
-    #     print(f"   Citation Quality: {us_quality}")
-
-    #     us_file = self.save_report(us_report, input_file, "us")
-
-    #     # Summary
-    #     print("\n" + "="*60)
-    #     print("✅ Life Sciences Analysis Complete!")
-    #     print(f"📊 Technology Type: {category}")
-    #     print(f"📄 Global Report: {global_file}")
-    #     print(f"📄 US Report: {us_file}")
-
-    #     # Citation summary
-    #     print("\n📚 Citation Summary:")
-    #     print(f"   Global: {global_report.get('citations_summary', {}).get('total_citations', 0)} citations ({global_quality} valid)")
-    #     print(f"   US: {us_report.get('citations_summary', {}).get('total_citations', 0)} citations ({us_quality} valid)")
-
-    #     return global_report, us_report
-
-# ============================================================================
-# MAIN ENTRY POINT
-# ============================================================================
-
-def main():
-    """Main entry point for the life sciences DD analyzer"""
-    parser = argparse.ArgumentParser(
-        description='Generate Life Sciences Due Diligence Reports with Medical/Scientific Citations'
-    )
-    parser.add_argument('--record-index', type=int, default=None, help='If the input JSON is a list, analyze just this 0-based index')
-    parser.add_argument('input_file', help='Path to input JSON file containing life sciences IP data')
-    parser.add_argument('--api-key', help='OpenAI API key (or set OPENAI_API_KEY env variable)')
-    parser.add_argument('--model', default=Config.MODEL, help='OpenAI model to use (default: gpt-5)')
-    parser.add_argument('--output-dir', default=Config.OUTPUT_DIR, help='Output directory for reports')
-
-    args = parser.parse_args()
-
-    # Update configuration
-    if args.api_key:
-        Config.OPENAI_API_KEY = args.api_key
-    if args.model:
-        Config.MODEL = args.model
-    if args.output_dir:
-        Config.OUTPUT_DIR = args.output_dir
-
-    # Validate API key
-    if not Config.OPENAI_API_KEY or Config.OPENAI_API_KEY == "your-api-key-here":
-        print("❌ Error: OpenAI API key not set!")
-        print("   Set it via --api-key flag or OPENAI_API_KEY environment variable")
-        return
-
-    # Run analysis
-    try:
-        analyzer = LifeSciencesDueDiligenceAnalyzer()
-        analyzer.run_complete_analysis(args.input_file, args.record_index)
-    except Exception as e:
-        print(f"❌ Error during analysis: {e}")
-        import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
-    main()
+"""
+Life Sciences & Biotech Due Diligence Analysis System
+Complete, ready-to-run analyzer for medical, pharmaceutical, and biotech IP
+Includes domain-specific citations from credible medical/scientific sources
+"""
+from dotenv import load_dotenv
+load_dotenv()
+import asyncio
+import hashlib
+import json
+import math
+import operator
+import os
+import random
+import sqlite3
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
+import httpx
+from openai import (AsyncOpenAI, APIConnectionError, BadRequestError, DefaultAsyncHttpxClient,
+                    InternalServerError, RateLimitError)
+from pathlib import Path
+import argparse
+import re
+
+# ---- aiohttp transport for AsyncOpenAI (tolerant) ----
+# httpx's async pool plateaus under many concurrent requests (openai-python #1596);
+# the aiohttp-backed client from `pip install openai[aiohttp]` keeps scaling.
+try:
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
+
+# ---- HTTP/2 for the httpx transport (tolerant; httpx needs the h2 package) ----
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ---- orjson for prompt serialization / response parsing (tolerant) ----
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ---- pyahocorasick for the citation literal and category keyword scans (tolerant) ----
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes via orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(raw):
+    """Parse str/bytes JSON via orjson when available, stdlib json otherwise."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+class Config:
+    """Configuration for Life Sciences DD Analysis"""
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    # Use GPT-5 family by default; override via --model
+    # Available sizes include: "gpt-5", "gpt-5-mini", "gpt-5-nano"
+    MODEL = "gpt-5"
+    OUTPUT_DIR = "biotech_dd_reports"
+    MAX_TOKENS = 25000  # ceiling; a call that runs out of budget is retried with up to this many
+    # Per-mode starting output budget (doubled on a max_output_tokens stop, capped at MAX_TOKENS)
+    MAX_OUTPUT_TOKENS = {"global": 8192, "us": 12288}
+    # A truncated call is re-sent only if the cap still lets its budget grow by this factor;
+    # a second billed call with a few % more room would almost surely truncate again
+    MIN_BUDGET_RAISE = 1.5
+    STRICT_JSON_SCHEMA = True  # constrain the packet to PACKET_SCHEMA via a strict json_schema text format
+    TEMPERATURE = 0.2  # lower for more consistent medical/scientific analysis
+    ENABLE_DOMAIN_VALIDATION = True
+    # Analyses launched concurrently by run_complete_analysis ("global", "us")
+    ANALYSIS_TYPES = ("us",)
+    # --batch-size (with --all-records): records sent per Responses API call; packets return
+    # as {"results": [{"id", "report"}]} and are validated per record. Capped at MAX_BATCH_SIZE
+    # and at as many full per-mode budgets as fit in MAX_TOKENS (see batch_limit)
+    BATCH_SIZE = 1
+    MAX_BATCH_SIZE = 5
+    # Cap on in-flight Responses API calls; size this to your account's RPM tier
+    MAX_CONCURRENT_REQUESTS = 4
+    MAX_RETRIES = 6  # attempts per call on rate-limit / connection / timeout / 5xx errors
+    RETRY_INITIAL_DELAY = 1.0  # seconds; doubles per attempt, plus up to 1 s of jitter
+    RETRY_MAX_DELAY = 30.0  # cap on the exponential delay (a Retry-After header is honored as sent)
+    HTTP_MAX_CONNECTIONS = 256
+    HTTP_MAX_KEEPALIVE = 128
+    # Read/write/pool timeout: the SDK's own 600 s. Non-streamed GPT-5 + web_search calls
+    # can sit silent for minutes before the first byte, and a timed-out call is retried
+    # (and billed again) by _with_backoff, so this must not cut legitimate calls short
+    HTTP_TIMEOUT = 600.0
+    HTTP_CONNECT_TIMEOUT = 10.0
+    HTTP2 = True  # multiplex calls over fewer connections when h2 is installed (httpx transport only)
+    STREAM_RESPONSES = True  # consume output_text deltas as they decode; falls back to a plain call on failure
+    STREAM_PROGRESS = True  # print each top-level packet section as soon as it has fully streamed
+    DEBUG_CITATIONS = True  # count web-search URL citations per call and print a few samples
+    # Fast rerun/debug (--no-web-search): send no web_search tool, so packets come from the
+    # model alone. Cached replies and checkpoints are kept apart from web-search runs.
+    DISABLE_WEB_SEARCH = False
+    ENABLE_RESPONSE_CACHE = True  # exact (model, temperature, prompt) hash → cached JSON reply
+    # Semantic tier: reuse a reply for near-duplicate technology_data. Off by default —
+    # a near-duplicate IP can still differ in ways that matter for diligence.
+    ENABLE_SEMANTIC_CACHE = False
+    SEMANTIC_CACHE_THRESHOLD = 0.95
+    CACHE_TTL_DAYS = 7  # cached replies older than this are ignored and purged
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    # Phase 2 (opt-in, --fill-gaps): a small model fills citations for the packet's data_gaps
+    ENABLE_GAP_FILL = False
+    GAP_FILL_MODEL = "gpt-5-nano"
+    GAP_FILL_MAX_TOKENS = 4000
+    # Send a prompt_cache_key versioned by a hash of the static prompt prefix
+    # (keys + stats in OUTPUT_DIR/.prefix_cache.json)
+    ENABLE_PROMPT_CACHE_KEY = True
+    # Per-IP checkpoints (OUTPUT_DIR/<ip_id>/<mode>.json + prompt-hash sidecar) make
+    # interrupted runs restartable; FORCE_RERUN (--force) ignores them and cached replies
+    ENABLE_CHECKPOINTS = True
+    FORCE_RERUN = False
+    # Set in --workers processes: timestamped reports and the prefix registry go to
+    # OUTPUT_DIR/shard_<id>; checkpoints and the response cache stay in OUTPUT_DIR
+    SHARD_ID = None
+    # Records whose compact JSON is shorter than this get a stub report instead of an
+    # LLM call; SKIP_UNCATEGORIZED also skips records with no category keyword at all
+    MIN_CONTENT_CHARS = 200
+    SKIP_UNCATEGORIZED = False
+# ============================================================================
+# SCORING WEIGHTS
+# ============================================================================
+
+SCORE_WEIGHTS = {
+    "clinical_evidence": 0.20,
+    "regulatory_clarity": 0.15,
+    "ip_strength": 0.15,
+    "market_attractiveness": 0.15,
+    "manufacturing_cmc_readiness": 0.10,
+    "competitive_moat": 0.10,
+    "team_inventor_quality": 0.10,
+    "source_quality": 0.05
+}
+# Fixed pillar order and weight vector for _compute_composite_score
+PILLAR_ORDER = tuple(SCORE_WEIGHTS)
+SCORE_WEIGHTS_VEC = tuple(SCORE_WEIGHTS[k] for k in PILLAR_ORDER)
+SCORE_WEIGHT_SUM = sum(SCORE_WEIGHTS_VEC)
+
+# ============================================================================
+# LIFE SCIENCES CITATION SOURCES (reference cues only; not enforced)
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _life_sciences_sources() -> Dict[str, list]:
+    """Built on first use; source names are interned so repeats across categories share one object."""
+    sources = {
+        "medical_journals": [
+            "New England Journal of Medicine (NEJM)",
+            "The Lancet",
+            "Journal of the American Medical Association (JAMA)",
+            "Nature Medicine",
+            "Nature Biotechnology",
+            "Science Translational Medicine",
+            "Cell",
+            "Nature Reviews Drug Discovery",
+            "British Medical Journal (BMJ)",
+            "Annals of Internal Medicine",
+            "Clinical Cancer Research",
+            "Journal of Clinical Oncology",
+            "Circulation",
+            "Gastroenterology",
+            "Hepatology"
+        ],
+        "pharma_databases": [
+            "ClinicalTrials.gov",
+            "FDA Orange Book",
+            "FDA Purple Book",
+            "EMA Clinical Data",
+            "WHO International Clinical Trials Registry",
+            "PubMed/MEDLINE",
+            "Cochrane Database",
+            "DrugBank",
+            "PharmGKB"
+        ],
+        "regulatory_sources": [
+            "FDA Guidance Documents",
+            "EMA Guidelines",
+            "ICH Guidelines",
+            "PMDA (Japan)",
+            "NMPA (China)",
+            "Health Canada",
+            "TGA (Australia)",
+            "MHRA (UK)",
+            "SwissMedic"
+        ],
+        "market_research": [
+            "GlobalData Healthcare",
+            "Evaluate Pharma",
+            "IQVIA",
+            "Frost & Sullivan Healthcare",
+            "Grand View Research - Healthcare",
+            "BioMedTracker",
+            "Cortellis",
+            "Citeline",
+            "BioCentury"
+        ],
+        "agricultural_veterinary": [
+            "Journal of Animal Science",
+            "Veterinary Microbiology",
+            "Aquaculture",
+            "Fish & Shellfish Immunology",
+            "Vaccine",
+            "Preventive Veterinary Medicine",
+            "Journal of Agricultural and Food Chemistry",
+            "Crop Protection",
+            "Plant Biotechnology Journal"
+        ],
+        "medical_device_sources": [
+            "Journal of Medical Devices",
+            "Medical Device and Diagnostic Industry (MD+DI)",
+            "Biomedical Engineering Online",
+            "IEEE Transactions on Biomedical Engineering",
+            "Journal of Biomedical Materials Research",
+            "FDA MAUDE Database",
+            "FDA 510(k) Database"
+        ]
+    }
+    return {category: [sys.intern(name) for name in names] for category, names in sources.items()}
+
+
+def __getattr__(name: str):
+    # PEP 562: `dd_blob_runner.LIFE_SCIENCES_SOURCES` still works, but is only built when accessed
+    if name == "LIFE_SCIENCES_SOURCES":
+        return _life_sciences_sources()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Bibliography sections: substring cues matched against the lowercased citation.
+# A citation lands in every section it matches; OTHER SOURCES takes the rest.
+_JOURNAL_KWS = frozenset(['journal', 'nejm', 'lancet', 'jama', 'nature', 'science', 'cell'])
+_REG_KWS = frozenset(['fda', 'ema', 'guidance', 'regulation', 'epar', 'sec.gov', 'orange book', 'purple book'])
+_TRIAL_KWS = frozenset(['nct', 'clinicaltrials'])
+_MKT_KWS = frozenset(['market', 'iqvia', 'evaluate', 'globaldata', 'citeline'])
+
+
+def _bibliography_buckets(citations) -> Dict[str, list]:
+    """Distinct citation strings split into bibliography sections, lowercasing each once."""
+    buckets = {"journal": [], "regulatory": [], "trial": [], "market": [], "other": []}
+    sections = ((_JOURNAL_KWS, buckets["journal"]), (_REG_KWS, buckets["regulatory"]),
+                (_TRIAL_KWS, buckets["trial"]), (_MKT_KWS, buckets["market"]))
+    for c in citations:
+        cl = c.lower()
+        matched = False
+        for kws, bucket in sections:
+            if any(k in cl for k in kws):
+                bucket.append(c)
+                matched = True
+        if not matched:
+            buckets["other"].append(c)
+    return buckets
+
+# ============================================================================
+# LIFE SCIENCES SPECIFIC PROMPTS
+# ============================================================================
+
+def _split_prompt_template(template: str, placeholder: str = "{technology_data}") -> Tuple[str, str]:
+    """Split a template once around its single placeholder into (prefix, suffix)."""
+    parts = template.split(placeholder)
+    if len(parts) != 2:
+        raise ValueError(f"Prompt template must contain exactly one {placeholder} placeholder")
+    return parts[0], parts[1]
+
+
+class LifeSciencesPrompts:
+    """Specialized prompts for biotech/pharma/medical analysis"""
+
+    BASE_SYSTEM_PROMPT = """You are a senior life sciences due diligence analyst.
+
+NON-NEGOTIABLES
+- No source, no claim: every factual/clinical/regulatory/market statement must have a credible citation.
+- Acceptable sources: PubMed/DOI/PMID; ClinicalTrials.gov (NCT); FDA/EMA/ICH/WHO; CMS; national HTAs; SEC 10-K/8-K/20-F; FDA Orange/Purple; EMA EPAR; reputable healthcare market research (IQVIA/Evaluate/GlobalData/Citeline/etc); USDA-APHIS CVB (vet vaccines), FDA-CVM (vet drugs), NOAA Fisheries, FAO, ICES, OIE/WOAH, national fish health agencies; reputable aquaculture journals (Aquaculture, Journal of Fish Diseases, Reviews in Aquaculture, Veterinary Parasitology).
+
+- Not acceptable: Wikipedia, blogs, generic news, social posts. If you cannot find a valid citation, set the field’s value to null (the native JSON null). 
+- Do not return "NA", "N/A", or an empty string. 
+- Set its "citation" to "", and add a precise entry to data_gaps like: "Not enough valid cited information: <json_path>".
+- Use the web_search tool for any fact you don’t know with high confidence; every non-obvious fact must include at least one URL citation.
+
+SOURCE HIERARCHY
+- Prefer Tier 1: FDA/EMA/ICH/WHO; PubMed/PMID/DOI; NEJM/Lancet/JAMA/Nature/Science/Cell; EPAR; FDA labels/PMAs.
+- If Tier 1 is not available, Tier 2 is acceptable: ClinicalTrials.gov/NCI SEER/CDC/EudraCT.
+- If still unavailable, Tier 3 is acceptable: SEC/company reports; IQVIA/Evaluate/GlobalData/Citeline/…
+- Never use hard-blocked sources (Wikipedia/blogs/Medium/social/forums).
+- Always include an inline citation. If using Tier 2/3, still provide the value with that citation (do NOT omit or set NA). Keep the JSON shape unchanged.
+
+SCORING VS CAS
+- Keep pillar scores separate from any CAS/novelty/IP risk. CAS/novelty belongs only in the IP section notes; do not mix into `scores`.
+
+STYLE
+- Investor-ready, concise, no speculation. Prefer human clinical > preprint > animal > in vitro; prefer regulator/registry > company press.
+
+Return ONLY valid JSON for the requested schema, in the exact order specified."""
+
+    # ===================== GLOBAL (origin_country + global + US) =====================
+    GLOBAL_LIFE_SCIENCES_PROMPT = """You are a senior life sciences due diligence analyst. Produce a CITED JSON diligence packet for GLOBAL commercialization.
+
+STRICT RULES
+- Every claim must carry a credible citation (see system prompt). No Wikipedia/blogs.
+- Provide ≥5 close comparators spanning same and adjacent modalities.
+- For any uncitable field: value null, "citation": "", and add a `data_gaps` item "Not enough valid cited information: <json_path>".
+- Multi-geo scope is fixed: (1) origin_country (where the IP is published/assigned), (2) global, (3) US. Infer origin_country from assignee/inventor/patent priority data; if unclear, set origin_country.name = null and add a data gap.
+
+STAGE-BREADTH MODE: GLOBAL_EARLY
+
+REQUIRED OUTPUT JSON (exact order and shape):
+{
+  "meta": {"analysis_date":"YYYY-MM-DD","stage_breadth_mode":"GLOBAL_EARLY","analysis_type":"global_life_sciences"},
+  "executive_summary": {
+    "summary_bullets": ["",""],
+    "key_takeaway": "",
+    "citation": ""
+  },
+  "unmet_need_and_market_overview": {
+    "market_size": {
+      "global": {"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""},
+      "us":     {"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}
+    },
+    "epidemiology": {
+      "prevalence": {"global":"","us":"","citation":""},
+      "incidence":  {"global":"","us":"","citation":""}
+    }
+  },
+  "technological_differentiation": {
+    "mechanism_of_action": {"description":"","citation":""},
+    "indication": "",
+    "therapeutic_area": "",
+    "modality": "",
+    "route_of_administration": ""
+  },
+  "current_treatment_paradigm": {
+    "if_indication_listed": {
+      "first_line":  [""],
+      "second_line": [""],
+      "third_line":  [""] ,
+      "citation": ""
+    },
+    "if_indication_not_listed": {
+      "recommended_indications_based_on_moa": [""] ,
+      "gold_standard_treatments_for_recommended_indications": [""] ,
+      "citation": ""
+    }
+  },
+  "competitive_landscape": {
+    "clinical_stage_assets_global": [{"product":"","company":"","modality":"","moa":"","stage":"","key_ref_or_nct":"","citation":""}] ,
+    "on_market_drugs":             [{"product":"","company":"","modality":"","moa":"","year_of_approval":"","sales_or_share_ref":"","citation":""}] ,
+    "drugs_in_clinical_trials":    [{"product":"","company":"","phase":"","pivotal_endpoint":"","pdufa_or_milestone":"","citation":""}] ,
+    "preclinical_stage_assets_global": [{"program":"","company_or_institution":"","modality":"","moa":"","citation":""}] ,
+    "internal_ip_db_similar": [{"reference_id":"","title_or_handle":"","note":"(leave empty if not accessible)","citation":""}]
+  },
+  "intellectual_property": {
+    "patent_portfolio_and_strength": {
+      "composition_of_matter": {"patents":[""],"expiry":"","jurisdictions":[""],"citation":""},
+      "method_of_use":         {"patents":[""],"expiry":"","citation":""},
+      "formulation_or_process":{"patents":[""],"expiry":"","citation":""},
+      "overall_strength_commentary": ""
+    },
+    "cas_novelty_and_ip_risk_notes": {"commentary":"","citation":""}
+  },
+  "research_plan_and_milestones": [
+    {"milestone":"","timeline_quarter_year":"","success_criteria":"","citation":""}
+  ],
+  "market_scope": {
+    "origin_country": {
+      "name": "",
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    },
+    "global": {
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    },
+    "us": {
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    }
+  },
+  "partnership_recommendations_and_exit_strategy": {
+    "partnerships": [{"company":"","rationale":"","precedent_deals_refs":[""],"citation":""}] ,
+    "exit_strategy": {"options":["licensing","acquisition","ipo"],"potential_acquirers":[""],"valuation_range":{"low":"","high":"","citation":""}}
+  },
+  "commercialization_strategy": {
+    "go_to_market": "",
+    "access_and_pricing": {"benchmark_products":[""],"expected_price_range":"","citation":""},
+    "medical_affairs_and_kol": "",
+    "launch_phasing": ""
+  },
+  "scores": {
+    "pillars": {
+      "clinical_evidence":           {"score":0,"rationale":"","citation":""},
+      "regulatory_clarity":          {"score":0,"rationale":"","citation":""},
+      "ip_strength":                 {"score":0,"rationale":"","citation":""},
+      "market_attractiveness":       {"score":0,"rationale":"","citation":""},
+      "manufacturing_cmc_readiness": {"score":0,"rationale":"","citation":""},
+      "competitive_moat":            {"score":0,"rationale":"","citation":""},
+      "team_inventor_quality":       {"score":0,"rationale":"","citation":""},
+      "source_quality":              {"score":0,"rationale":"","citation":""}
+    },
+    "methodology": {
+      "weights": {"clinical_evidence":0.20,"regulatory_clarity":0.15,"ip_strength":0.15,"market_attractiveness":0.15,"manufacturing_cmc_readiness":0.10,"competitive_moat":0.10,"team_inventor_quality":0.10,"source_quality":0.05},
+      "scoring_notes": "",
+      "limitations": ""
+    }
+  },
+  "citations_summary": {"total_citations":0,"peer_reviewed_papers":0,"regulatory_documents":0,"clinical_trial_refs":0,"primary_sources":[""]},
+  "data_gaps": [],
+  "bibliography": [{"category":"peer_reviewed/regulatory/market/patent","citation":""}]
+}
+Return ONLY valid JSON.
+
+TECHNOLOGY DATA (verbatim):
+{technology_data}
+"""
+
+    # ===================== US (same packet order, US emphasis) =====================
+    US_LIFE_SCIENCES_PROMPT = """You are a senior life sciences due diligence analyst. Produce a CITED JSON diligence packet for the US market. Use the same packet order and fields as the GLOBAL prompt.
+
+STRICT RULES
+- Cite every claim with FDA/CMS/ClinicalTrials.gov, peer-reviewed journals, SEC filings, and reputable US market sources.
+- Provide ≥5 US-relevant close comparators with formulary/coverage or pricing/market refs where applicable.
+- For any uncitable field: value null, empty "citation", and add "Not enough valid cited information: <json_path>" to data_gaps.
+- Keep pillar scores separate from CAS novelty.
+
+STAGE-BREADTH MODE: US_LATE
+
+REQUIRED OUTPUT JSON (exact order and shape — identical keys as GLOBAL; US-specific facts should be emphasized where relevant):
+{
+  "meta": {"analysis_date":"YYYY-MM-DD","stage_breadth_mode":"US_LATE","analysis_type":"us_life_sciences"},
+  "executive_summary": {
+    "summary_bullets": ["",""],
+    "key_takeaway": "",
+    "citation": ""
+  },
+  "unmet_need_and_market_overview": {
+    "market_size": {
+      "global": {"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""},
+      "us":     {"current_usd":"","cagr_percent":"","five_year_usd_out":"","citation":""}
+    },
+    "epidemiology": {
+      "prevalence": {"global":"","us":"","citation":""},
+      "incidence":  {"global":"","us":"","citation":""}
+    }
+  },
+  "technological_differentiation": {
+    "mechanism_of_action": {"description":"","citation":""},
+    "indication": "",
+    "therapeutic_area": "",
+    "modality": "",
+    "route_of_administration": ""
+  },
+  "current_treatment_paradigm": {
+    "if_indication_listed": {
+      "first_line":  [""],
+      "second_line": [""],
+      "third_line":  [""] ,
+      "citation": ""
+    },
+    "if_indication_not_listed": {
+      "recommended_indications_based_on_moa": [""] ,
+      "gold_standard_treatments_for_recommended_indications": [""] ,
+      "citation": ""
+    }
+  },
+  "competitive_landscape": {
+    "clinical_stage_assets_global": [{"product":"","company":"","modality":"","moa":"","stage":"","key_ref_or_nct":"","citation":""}] ,
+    "on_market_drugs":             [{"product":"","company":"","modality":"","moa":"","year_of_approval":"","sales_or_share_ref":"","citation":""}] ,
+    "drugs_in_clinical_trials":    [{"product":"","company":"","phase":"","pivotal_endpoint":"","pdufa_or_milestone":"","citation":""}] ,
+    "preclinical_stage_assets_global": [{"program":"","company_or_institution":"","modality":"","moa":"","citation":""}] ,
+    "internal_ip_db_similar": [{"reference_id":"","title_or_handle":"","note":"(leave empty if not accessible)","citation":""}]
+  },
+  "intellectual_property": {
+    "patent_portfolio_and_strength": {
+      "composition_of_matter": {"patents":[""],"expiry":"","jurisdictions":[""],"citation":""},
+      "method_of_use":         {"patents":[""],"expiry":"","citation":""},
+      "formulation_or_process":{"patents":[""],"expiry":"","citation":""},
+      "overall_strength_commentary": ""
+    },
+    "cas_novelty_and_ip_risk_notes": {"commentary":"","citation":""}
+  },
+  "research_plan_and_milestones": [
+    {"milestone":"","timeline_quarter_year":"","success_criteria":"","citation":""}
+  ],
+  "market_scope": {
+    "origin_country": {
+      "name": "",
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    },
+    "global": {
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    },
+    "us": {
+      "market_size_usd": "",
+      "cagr_percent": "",
+      "five_year_usd_out": "",
+      "citation": ""
+    }
+  },
+  "partnership_recommendations_and_exit_strategy": {
+    "partnerships": [{"company":"","rationale":"","precedent_deals_refs":[""],"citation":""}] ,
+    "exit_strategy": {"options":["licensing","acquisition","ipo"],"potential_acquirers":[""],"valuation_range":{"low":"","high":"","citation":""}}
+  },
+  "commercialization_strategy": {
+    "go_to_market": "",
+    "access_and_pricing": {"benchmark_products":[""],"expected_price_range":"","citation":""},
+    "medical_affairs_and_kol": "",
+    "launch_phasing": ""
+  },
+  "scores": {
+    "pillars": {
+      "clinical_evidence":           {"score":0,"rationale":"","citation":""},
+      "regulatory_clarity":          {"score":0,"rationale":"","citation":""},
+      "ip_strength":                 {"score":0,"rationale":"","citation":""},
+      "market_attractiveness":       {"score":0,"rationale":"","citation":""},
+      "manufacturing_cmc_readiness": {"score":0,"rationale":"","citation":""},
+      "competitive_moat":            {"score":0,"rationale":"","citation":""},
+      "team_inventor_quality":       {"score":0,"rationale":"","citation":""},
+      "source_quality":              {"score":0,"rationale":"","citation":""}
+    },
+    "methodology": {
+      "weights": {"clinical_evidence":0.20,"regulatory_clarity":0.15,"ip_strength":0.15,"market_attractiveness":0.15,"manufacturing_cmc_readiness":0.10,"competitive_moat":0.10,"team_inventor_quality":0.10,"source_quality":0.05},
+      "scoring_notes": "",
+      "limitations": ""
+    }
+  },
+  "citations_summary": {"total_citations":0,"peer_reviewed_papers":0,"regulatory_documents":0,"clinical_trial_refs":0,"primary_sources":[""]},
+  "data_gaps": [],
+  "bibliography": [{"category":"peer_reviewed/regulatory/market/patent","citation":""}]
+}
+Return ONLY valid JSON.
+
+TECHNOLOGY DATA (verbatim):
+{technology_data}
+"""
+
+    # Phase 2 prompt: only the open data_gaps paths are appended, not the packet
+    GAP_FILL_PROMPT = """A life sciences diligence packet has data gaps: the JSON paths below lack a credibly cited value.
+For each path, search for the fact and return ONLY a JSON object holding the corrected fields nested exactly as in the packet,
+with the sibling "citation" filled (e.g. {"market_scope": {"us": {"market_size_usd": "...", "citation": "..."}}}).
+Omit any path you cannot cite. Do not return fields that are not listed.
+
+"""
+
+    # Batch calls: several records share one request; appended after the per-record context
+    BATCH_INSTRUCTIONS = """
+BATCH MODE: the TECHNOLOGY DATA above is a JSON array of records, each {"id": <int>, "technology_data": {...}}.
+Analyze every record independently and produce one full packet per record, using the schema above.
+Return ONLY a JSON object {"results": [{"id": <record id>, "report": <packet>}, ...]} with exactly one entry per record id.
+"""
+
+    # Templates are rendered by concatenation, not str.format, so the JSON schema
+    # above is stored with single braces and never re-parsed per call. Everything
+    # before {technology_data} is static per mode, so the long rules + schema prefix
+    # is identical across IPs and eligible for OpenAI's automatic prompt caching.
+    # Split (and schema parse) happen on first use, not at import.
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def template_parts(analysis_type: str) -> Tuple[str, str]:
+        """(prefix, suffix) of the GLOBAL (analysis_type == "global") or US template."""
+        return _split_prompt_template(
+            LifeSciencesPrompts.GLOBAL_LIFE_SCIENCES_PROMPT if analysis_type == "global"
+            else LifeSciencesPrompts.US_LIFE_SCIENCES_PROMPT
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def packet_schema() -> Dict[str, Any]:
+        """Required packet shape, parsed from the GLOBAL template's schema literal (US shares the keys)."""
+        prefix = LifeSciencesPrompts.template_parts("global")[0]
+        return json.loads(prefix[prefix.index("{"):prefix.rindex("}") + 1])
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def packet_json_schema() -> Dict[str, Any]:
+        """
+        Strict JSON Schema for structured outputs, derived from packet_schema():
+        objects list every key as required with no extras, arrays take the shape
+        of their first template element, and every leaf may be null.
+        """
+        def derive(node):
+            if isinstance(node, dict):
+                return {"type": "object", "properties": {k: derive(v) for k, v in node.items()},
+                        "required": list(node), "additionalProperties": False}
+            if isinstance(node, list):
+                return {"type": "array", "items": derive(node[0]) if node else {"type": "string"}}
+            if isinstance(node, bool):
+                return {"type": ["boolean", "null"]}
+            if isinstance(node, (int, float)):
+                return {"type": ["number", "null"]}
+            return {"type": ["string", "null"]}
+
+        return derive(LifeSciencesPrompts.packet_schema())
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def batch_json_schema() -> Dict[str, Any]:
+        """Strict schema for BATCH_INSTRUCTIONS replies: {"results": [{"id", "report": packet}]}."""
+        item = {"type": "object",
+                "properties": {"id": {"type": "integer"}, "report": LifeSciencesPrompts.packet_json_schema()},
+                "required": ["id", "report"], "additionalProperties": False}
+        return {"type": "object", "properties": {"results": {"type": "array", "items": item}},
+                "required": ["results"], "additionalProperties": False}
+
+    @classmethod
+    def render(cls, analysis_type: str, technology_data: str) -> str:
+        """Fill the GLOBAL (analysis_type == "global") or US template with serialized technology data."""
+        prefix, suffix = cls.template_parts(analysis_type)
+        return "".join((prefix, technology_data, suffix))
+
+# ============================================================================
+# PACKET SHAPE VALIDATOR
+# ============================================================================
+
+# Computed by validate_report_citations, not expected from the model
+PACKET_SCHEMA_SKIP = ("citations_summary",)
+
+
+@lru_cache(maxsize=None)
+def _packet_schema_json() -> str:
+    return json.dumps(LifeSciencesPrompts.packet_schema())
+
+
+@lru_cache(maxsize=None)
+def _compile_packet_validator(schema_json: str):
+    """
+    Generate, compile and exec a validator specialized to one packet schema
+    (keyed by its canonical JSON). The emitted function indexes the known keys
+    directly and appends a data_gaps message for every missing or wrongly
+    typed container/field: validate(packet, gaps) -> None.
+    """
+    schema = json.loads(schema_json)
+    lines = ["def validate(d, gaps):"]
+    counter = [0]
+
+    def new_var() -> str:
+        counter[0] += 1
+        return f"v{counter[0]}"
+
+    def emit(node, var: str, path: str, indent: int):
+        pad = "    " * indent
+        here = path or "'$'"  # root packet
+        if isinstance(node, dict):
+            lines.append(f"{pad}if not isinstance({var}, dict):")
+            lines.append(f"{pad}    gaps.append(GAP + {here})")
+            lines.append(f"{pad}else:")
+            lines.append(f"{pad}    pass")
+            for key, child in node.items():
+                if not path and key in PACKET_SCHEMA_SKIP:
+                    continue
+                child_path = f"{path} + {'.' + key!r}" if path else repr(key)
+                if isinstance(child, (dict, list)):
+                    v = new_var()
+                    lines.append(f"{pad}    {v} = {var}.get({key!r})")
+                    emit(child, v, child_path, indent + 1)
+                else:
+                    lines.append(f"{pad}    if {key!r} not in {var}:")
+                    lines.append(f"{pad}        gaps.append(GAP + {child_path})")
+        elif isinstance(node, list):
+            lines.append(f"{pad}if not isinstance({var}, list):")
+            lines.append(f"{pad}    gaps.append(GAP + {here})")
+            if node and isinstance(node[0], (dict, list)):
+                i, item = new_var(), new_var()
+                lines.append(f"{pad}else:")
+                lines.append(f"{pad}    for {i}, {item} in enumerate({var}):")
+                emit(node[0], item, f"{path} + '[' + str({i}) + ']'", indent + 2)
+
+    emit(schema, "d", "", 1)
+    source = "\n".join(lines)
+    namespace = {"GAP": "Not enough valid cited information: "}
+    exec(compile(source, "<packet_validator>", "exec"), namespace)
+    return namespace["validate"]
+
+
+def validate_packet_shape(packet: Dict[str, Any], schema: Dict[str, Any] = None) -> list:
+    """data_gaps messages for fields of `schema` (default: LifeSciencesPrompts.packet_schema()) missing from `packet`."""
+    schema_json = json.dumps(schema) if schema is not None else _packet_schema_json()
+    gaps = []
+    _compile_packet_validator(schema_json)(packet, gaps)
+    return gaps
+
+# ============================================================================
+# CITATION VALIDATOR FOR LIFE SCIENCES
+# ============================================================================
+
+class LifeSciencesCitationValidator:
+    """Validates citations for medical/scientific credibility with tiers."""
+
+    # Hard blocklist stays
+    FORBIDDEN = ['wikipedia', 'webmd', 'healthline', 'blog', 'medium.com',
+                 'reddit', 'quora', 'facebook', 'twitter']
+
+    # Regex groups for tiers (highest preference first)
+    TIER_PATTERNS = [
+        # Tier 1: regulators, PubMed/DOI/PMID, top journals
+        (1, [
+            r'\b(fda|ema|ich|who|pmda|tga|mhra|swissmedic)\b',
+            r'\bepar\b',
+            r'\bpubmed\b|\bpmid:\s*\d+\b',
+            r'\bdoi:\s*10\.\d{4,9}/\S+',
+            r'\bnejm\b|\blancet\b|\bjama\b|\bnature\b|\bscience\b|\bcell\b',
+            r'drugsatfda|accessdata\.fda\.gov|cfpma|pma\.cfm'
+        ]),
+        # Tier 2: clinical registries and public health/statistics
+        (2, [
+            r'clinicaltrials\.gov|\bnct\d{8}\b',
+            r'\bseer\.cancer\.gov\b',
+            r'\bcdc\.gov\b',
+            r'\beudract\b'
+        ]),
+        # Tier 3: company and market research (acceptable if needed)
+        (3, [
+            r'\bsec\.gov\b|\b10-k\b|\bannual report\b',
+            r'iqvia|evaluate|globaldata|citeline|biomedtracker|cortellis|frost\s*&\s*sullivan|grand\s*view\s*research'
+        ])
+    ]
+
+    # Compiled once at class load: per-pattern objects, plus one alternation per tier
+    # so assess() does a single scan per tier instead of one re.search per pattern
+    TIER_PATTERNS_COMPILED = [
+        (tier, [re.compile(p, re.IGNORECASE) for p in pats]) for tier, pats in TIER_PATTERNS
+    ]
+    TIER_REGEXES = [
+        (tier, re.compile("|".join(f"(?:{p})" for p in pats), re.IGNORECASE)) for tier, pats in TIER_PATTERNS
+    ]
+    # Every tier in one multi-pattern scan: each tier is a named group, so one
+    # left-to-right pass reports which tiers occur (m.lastgroup -> "t1"/"t2"/"t3")
+    TIER_SCANNER = re.compile(
+        "|".join(f"(?P<t{tier}>{rx.pattern})" for tier, rx in TIER_REGEXES), re.IGNORECASE
+    )
+    # Blocklist as a single alternation over the lowercased citation
+    FORBIDDEN_RE = re.compile("|".join(map(re.escape, FORBIDDEN)))
+
+    # Optional Aho-Corasick fast path (pyahocorasick): the literal part of FORBIDDEN +
+    # TIER_PATTERNS as (needle, tier, word-bounded) over the lowercased citation;
+    # tier None marks a forbidden term
+    LITERAL_NEEDLES = (
+        [(w, None, False) for w in FORBIDDEN]
+        + [(w, 1, True) for w in ("fda", "ema", "ich", "who", "pmda", "tga", "mhra", "swissmedic", "epar",
+                                  "pubmed", "nejm", "lancet", "jama", "nature", "science", "cell")]
+        + [(w, 1, False) for w in ("drugsatfda", "accessdata.fda.gov", "cfpma", "pma.cfm")]
+        + [("clinicaltrials.gov", 2, False)]
+        + [(w, 2, True) for w in ("seer.cancer.gov", "cdc.gov", "eudract")]
+        + [(w, 3, True) for w in ("sec.gov", "10-k", "annual report")]
+        + [(w, 3, False) for w in ("iqvia", "evaluate", "globaldata", "citeline", "biomedtracker", "cortellis")]
+    )
+    # The genuinely regex-shaped remainder of TIER_PATTERNS, checked after the literal scan
+    RESIDUAL_PATTERNS = [
+        (1, re.compile(r'\bpmid:\s*\d+\b|\bdoi:\s*10\.\d{4,9}/\S+', re.IGNORECASE)),
+        (2, re.compile(r'\bnct\d{8}\b', re.IGNORECASE)),
+        (3, re.compile(r'frost\s*&\s*sullivan|grand\s*view\s*research', re.IGNORECASE)),
+    ]
+
+    @staticmethod
+    def _matches_any(text: str, patterns) -> bool:
+        """`patterns` are compiled (see TIER_PATTERNS_COMPILED)."""
+        return any(p.search(text) for p in patterns)
+
+    def assess(self, citation: str):
+        """
+        Returns (allowed: bool, tier: int|None, reason: str)
+        """
+        return self.assess_many([citation])[0]
+
+    def assess_many(self, citations) -> list:
+        """
+        Batched assess(): each distinct citation is classified once (memoized in
+        _classify_citation across reports). Results align with `citations`.
+        """
+        classify = _classify_citation
+        return [
+            classify(c) if isinstance(c, str) and c.strip() else (False, None, 'empty')
+            for c in citations
+        ]
+
+    # Backwards-compatible shim (so the rest of your code keeps calling the same name if needed)
+    def validate_medical_citation(self, citation: str) -> bool:
+        """
+        Treat Tier 1, 2, and 3 as valid (allowed). Only forbidden/empty are invalid.
+        """
+        allowed, tier, _ = self.assess(citation)
+        return bool(allowed and tier in (1, 2, 3))
+
+
+
+    @staticmethod
+    def format_medical_citation(citation_data: Dict) -> str:
+        """Format medical/scientific citations properly"""
+        cit_type = citation_data.get('type', '')
+
+        if cit_type == 'journal':
+            authors = citation_data.get('authors', 'Unknown')
+            year = citation_data.get('year', 'n.d.')
+            title = citation_data.get('title', 'Untitled')
+            journal = citation_data.get('journal', 'Unknown Journal')
+            volume = citation_data.get('volume', '')
+            pages = citation_data.get('pages', '')
+            doi = citation_data.get('doi', '')
+            pmid = citation_data.get('pmid', '')
+
+            citation = f"{authors}. ({year}). {title}. {journal}"
+            if volume:
+                citation += f", {volume}"
+            if pages:
+                citation += f":{pages}"
+            if doi:
+                citation += f". DOI: {doi}"
+            elif pmid:
+                citation += f". PMID: {pmid}"
+            return citation
+
+        elif cit_type == 'clinical_trial':
+            nct = citation_data.get('nct_number', '')
+            title = citation_data.get('title', 'Untitled')
+            sponsor = citation_data.get('sponsor', 'Unknown')
+            status = citation_data.get('status', '')
+            return f"ClinicalTrials.gov {nct}. {title}. Sponsor: {sponsor}. Status: {status}"
+
+        elif cit_type == 'regulatory':
+            agency = citation_data.get('agency', 'FDA')
+            doc_type = citation_data.get('doc_type', 'Guidance')
+            title = citation_data.get('title', 'Untitled')
+            year = citation_data.get('year', 'n.d.')
+            doc_number = citation_data.get('doc_number', '')
+            return f"{agency}. ({year}). {doc_type}: {title}. {doc_number}"
+
+        else:
+            source = citation_data.get('source', 'Unknown')
+            year = citation_data.get('year', 'n.d.')
+            title = citation_data.get('title', '')
+            return f"{source}. ({year}). {title}"
+
+
+@lru_cache(maxsize=None)
+def _citation_automaton():
+    """Automaton over LITERAL_NEEDLES, or None when pyahocorasick is not installed."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for needle, tier, bounded in LifeSciencesCitationValidator.LITERAL_NEEDLES:
+        automaton.add_word(needle, (len(needle), tier, bounded))
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word_char(ch: str) -> bool:
+    """Same character class as regex \\w (so word-bounded needles honour \\b)."""
+    return ch.isalnum() or ch == "_"
+
+
+def _classify_with_automaton(citation: str, automaton) -> Tuple[bool, Optional[int], str]:
+    text = citation.lower()
+    last = len(text) - 1
+    best = None
+    # One pass reports every literal hit; keep going after Tier 1 since a forbidden term may follow
+    for end, (length, tier, bounded) in automaton.iter(text):
+        if tier is None:
+            return (False, None, 'forbidden')
+        if bounded:
+            start = end - length + 1
+            if (start > 0 and _is_word_char(text[start - 1])) or (end < last and _is_word_char(text[end + 1])):
+                continue
+        if best is None or tier < best:
+            best = tier
+
+    # Regex only for patterns that could still lower the tier
+    for tier, rx in LifeSciencesCitationValidator.RESIDUAL_PATTERNS:
+        if best is not None and tier >= best:
+            break
+        if rx.search(citation):
+            best = tier
+            break
+    if best is not None:
+        return (True, best, 'matched')
+    return (True, 3, 'fallback')
+
+
+@lru_cache(maxsize=4096)
+def _classify_citation(citation: str) -> Tuple[bool, Optional[int], str]:
+    """assess() result for a non-empty citation string. Module-level so the LRU
+    cache is keyed on the string alone and shared by every validator instance."""
+    automaton = _citation_automaton()
+    if automaton is not None:
+        return _classify_with_automaton(citation, automaton)
+
+    if LifeSciencesCitationValidator.FORBIDDEN_RE.search(citation.lower()):
+        return (False, None, 'forbidden')
+
+    # Lowest tier hit wins; a Tier 1 hit ends the scan early
+    best = None
+    for m in LifeSciencesCitationValidator.TIER_SCANNER.finditer(citation):
+        tier = int(m.lastgroup[1:])
+        if best is None or tier < best:
+            best = tier
+            if best == 1:
+                break
+    if best is not None:
+        return (True, best, 'matched')
+
+    # If it doesn't match any pattern, allow it but treat as Tier 3 fallback
+    return (True, 3, 'fallback')
+
+# ============================================================================
+# TECHNOLOGY CATEGORY DETECTION
+# ============================================================================
+
+# Each keyword found anywhere in the record scores its category once:
+# 2 points for keywords longer than 5 characters, 1 otherwise
+CATEGORY_KEYWORDS = {
+    'SMALL_MOLECULE_DRUG': ['small molecule', 'compound', 'nce', 'new chemical entity', 'oral drug'],
+    'BIOLOGIC': ['antibody', 'protein', 'peptide', 'biologic', 'mab', 'biosimilar', 'fusion protein'],
+    'GENE_THERAPY': ['gene therapy', 'gene editing', 'crispr', 'aav', 'lentivirus', 'car-t'],
+    'VACCINE': ['vaccine', 'immunization', 'prophylactic', 'adjuvant', 'antigen'],
+    'DIAGNOSTIC': ['diagnostic', 'biomarker', 'assay', 'pcr', 'elisa', 'sequencing', 'liquid biopsy'],
+    'MEDICAL_DEVICE': ['device','implant','surgical','catheter','stent','510k','510(k)','pma'],
+    'DIGITAL_HEALTH': ['digital therapeutic', 'dtx', 'samd', 'ai diagnostic', 'telehealth', 'mhealth'],
+    'AGRICULTURAL_BIOTECH': ['crop', 'seed', 'pesticide', 'herbicide', 'gmo', 'plant', 'soil', 'yield', 'trait'],
+    'VETERINARY': ['veterinary', 'animal health', 'livestock', 'aquaculture', 'fish', 'cattle', 'poultry', 'companion animal', 'salmon', 'louse', 'parasite'],
+}
+
+
+@lru_cache(maxsize=None)
+def _category_automaton():
+    """Automaton over every CATEGORY_KEYWORDS entry, or None when pyahocorasick is not installed."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keywords in CATEGORY_KEYWORDS.values():
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=256)
+def _score_categories(data_str: str) -> Tuple[Tuple[str, int], ...]:
+    """(category, score) pairs in CATEGORY_KEYWORDS order for a lowercased record dump."""
+    automaton = _category_automaton()
+    if automaton is not None:
+        # One pass over the text instead of one substring search per keyword
+        found = {keyword for _, keyword in automaton.iter(data_str)}
+    else:
+        found = {kw for keywords in CATEGORY_KEYWORDS.values() for kw in keywords if kw in data_str}
+    scores = []
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = sum(2 if len(keyword) > 5 else 1 for keyword in keywords if keyword in found)
+        if score > 0:
+            scores.append((category, score))
+    return tuple(scores)
+
+
+# Origin-country hint: whole-word mentions in the record text; earlier entries win
+ORIGIN_CANDIDATES = (
+    "united states", "usa", "us", "china", "cn", "europe", "eu", "japan", "jp",
+    "korea", "kr", "india", "in", "united kingdom", "uk", "germany", "de",
+    "france", "fr", "italy", "it", "canada", "ca", "australia", "au", "brazil", "br",
+)
+_ORIGIN_RE = re.compile(r"\b(" + "|".join(map(re.escape, ORIGIN_CANDIDATES)) + r")\b")
+_ORIGIN_RANK = {c: i for i, c in enumerate(ORIGIN_CANDIDATES)}
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """Two-tier SQLite cache for DD prompt calls.
+
+    Tier 1 is an exact SHA-256 over (model, temperature, system prompt, user prompt).
+    Tier 2 (optional) matches near-duplicate technology_data by embedding cosine
+    similarity within the same namespace (model + prompt template) and category.
+    Rows expire after `ttl_days`; lookups are counted for stats().
+    """
+
+    # Added after the first release; older cache files are migrated in place
+    _MIGRATED_COLUMNS = (("analysis_type", "TEXT"), ("category", "TEXT"), ("expires_at", "REAL"))
+
+    def __init__(self, path: str, ttl_days: float = Config.CACHE_TTL_DAYS):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl_days * 86400
+        self.counts = {"exact": 0, "semantic": 0, "miss": 0}
+        # Shared by --workers processes: wait out another writer's lock instead of failing
+        self.conn = sqlite3.connect(path, timeout=30.0)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                response_json TEXT NOT NULL,
+                debug_json TEXT,
+                embedding BLOB,
+                created_at TEXT NOT NULL
+            )"""
+        )
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(responses)")}
+        for name, kind in self._MIGRATED_COLUMNS:
+            if name not in existing:
+                try:
+                    self.conn.execute(f"ALTER TABLE responses ADD COLUMN {name} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # another worker process migrated it first
+        # Legacy rows carry no expiry: give them one full TTL from now
+        self.conn.execute("UPDATE responses SET expires_at = ? WHERE expires_at IS NULL",
+                          (time.time() + self.ttl,))
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_namespace ON responses(namespace)")
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete rows past their TTL; returns how many were removed."""
+        removed = self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),)).rowcount
+        self.conn.commit()
+        return removed
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def prefix_state(*parts: Any):
+        """
+        SHA-256 state after hashing `parts` the way make_key does, with the last part
+        treated as the leading text of the final make_key part. Computed (and the
+        static prompt text encoded) once; extend_key copies it for each call.
+        """
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8"))
+
+    @staticmethod
+    def extend_key(state, rest: str) -> str:
+        """make_key(*parts[:-1], parts[-1] + rest) for a prefix_state(*parts)."""
+        h = state.copy()
+        h.update(rest.encode("utf-8"))
+        return h.hexdigest()
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def namespace_key(*parts: Any) -> str:
+        """make_key for all-static parts (model + prompt template namespace), memoized."""
+        return ResponseCache.make_key(*parts)
+
+    @staticmethod
+    def _normalize(vector) -> array:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return array("f", (x / norm for x in vector))
+
+    def get(self, key: str) -> Optional[Tuple[dict, dict]]:
+        row = self.conn.execute(
+            "SELECT response_json, debug_json FROM responses WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), json.loads(row[1] or "{}")
+
+    def get_similar(self, namespace: str, embedding, threshold: float,
+                    category: Optional[str] = None) -> Optional[Tuple[dict, dict, float]]:
+        """Top-1 cosine match among unexpired cached replies of the same namespace and category."""
+        query = self._normalize(embedding)
+        best, best_sim = None, threshold
+        rows = self.conn.execute(
+            "SELECT response_json, debug_json, embedding FROM responses "
+            "WHERE namespace = ? AND category IS ? AND expires_at >= ? AND embedding IS NOT NULL",
+            (namespace, category, time.time()),
+        )
+        for response_json, debug_json, blob in rows:
+            stored = array("f")
+            stored.frombytes(blob)
+            sim = sum(a * b for a, b in zip(query, stored))
+            if sim >= best_sim:
+                best, best_sim = (response_json, debug_json), sim
+        if best is None:
+            return None
+        return json.loads(best[0]), json.loads(best[1] or "{}"), best_sim
+
+    def set(self, key: str, namespace: str, data: dict, debug: dict, embedding=None,
+            analysis_type: Optional[str] = None, category: Optional[str] = None):
+        blob = self._normalize(embedding).tobytes() if embedding is not None else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, namespace, response_json, debug_json, embedding, created_at, "
+            "analysis_type, category, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, namespace, json.dumps(data, ensure_ascii=False), json.dumps(debug, ensure_ascii=False),
+             blob, datetime.now().isoformat(), analysis_type, category, time.time() + self.ttl),
+        )
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counts for this run plus the hit rate over all lookups."""
+        lookups = sum(self.counts.values())
+        hits = self.counts["exact"] + self.counts["semantic"]
+        return {**self.counts, "lookups": lookups, "hit_rate": hits / lookups if lookups else 0.0}
+
+    def close(self):
+        self.conn.close()
+
+
+class PrefixCacheRegistry:
+    """Versioned `prompt_cache_key` values for the invariant prompt prefix.
+
+    The key is named per mode and suffixed with a hash of the prefix text, so an
+    edit to the system prompt, sources or schema starts a new provider-side cache
+    entry. Keys and their cached-token stats persist in a small JSON file; the
+    KV state itself lives with the provider (no identifier is returned for it).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def key_for(self, name: str, *prefix_parts: str) -> str:
+        digest = hashlib.sha256("\x1f".join(prefix_parts).encode("utf-8")).hexdigest()[:12]
+        key = f"{name}_{digest}"
+        if key not in self.entries:
+            # Prefix edited: forget stale versions of this name
+            for stale in [k for k, v in self.entries.items() if v.get("name") == name]:
+                del self.entries[stale]
+            self.entries[key] = {"name": name, "prefix_sha256_12": digest,
+                                 "created_at": datetime.now().isoformat(timespec="seconds"),
+                                 "calls": 0, "cached_tokens": 0, "prompt_tokens": 0}
+            self.save()
+        return key
+
+    def record(self, key: str, token_usage: Optional[Dict[str, Any]]):
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        usage = token_usage or {}
+        entry["calls"] += 1
+        entry["cached_tokens"] += usage.get("cached_tokens") or 0
+        entry["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        entry["last_used"] = datetime.now().isoformat(timespec="seconds")
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class JsonStreamProgress:
+    """
+    Incremental structure scan of a streamed JSON object. Each delta is fed once
+    and only its structural characters are visited, so the accumulated text is
+    never re-parsed: tracks which top-level keys have finished and whether the
+    root object has closed.
+    """
+
+    _SPECIALS = re.compile(r'[{}\[\]",:\\]')
+
+    def __init__(self, on_section=None):
+        self.depth = 0
+        self.closed = False
+        self.sections = []
+        self._on_section = on_section
+        self._in_string = False
+        self._skip_first = False  # previous delta ended in a backslash
+        self._expect_key = False
+        self._key_parts = None
+        self._key = None
+
+    def _finish_section(self):
+        if self._key is not None:
+            self.sections.append(self._key)
+            if self._on_section:
+                self._on_section(self._key)
+            self._key = None
+
+    def feed(self, delta: str):
+        skip = 0 if self._skip_first else -1
+        self._skip_first = False
+        start = 0  # where the key being captured starts within this delta
+        for match in self._SPECIALS.finditer(delta):
+            pos, ch = match.start(), match.group()
+            if pos == skip:
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    skip = pos + 1
+                    self._skip_first = skip == len(delta)
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_parts is not None:
+                        self._key_parts.append(delta[start:pos])
+                        self._key = json.loads(f'"{"".join(self._key_parts)}"')  # undo escapes
+                        self._key_parts = None
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self.depth == 1 and self._expect_key:
+                    self._key_parts, start = [], pos + 1
+            elif ch in "{[":
+                self.depth += 1
+                self._expect_key = self.depth == 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth <= 1:
+                    self._finish_section()
+                if self.depth == 0 and ch == "}":
+                    self.closed = True
+            elif self.depth == 1:
+                if ch == ":":
+                    self._expect_key = False
+                elif ch == ",":
+                    self._finish_section()
+                    self._expect_key = True
+        if self._key_parts is not None:
+            self._key_parts.append(delta[start:])
+
+
+# ============================================================================
+# MAIN ANALYZER CLASS
+# ============================================================================
+
+class LifeSciencesDueDiligenceAnalyzer:
+    """Complete analyzer for life sciences and biotech IP"""
+
+    def __init__(self, api_key: str = None):
+        """Initialize with OpenAI client and validators"""
+        self.api_key = api_key or Config.OPENAI_API_KEY
+        # SDK-internal retries off: _with_backoff is the single retry policy
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=self._build_http_client(), max_retries=0)
+        self._semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        self._json_schema_supported = True
+        self._prompt_cache_keys = {}
+        self.citation_validator = LifeSciencesCitationValidator()
+        self.ensure_output_dir()
+        self.response_cache = (
+            ResponseCache(str(Path(Config.OUTPUT_DIR) / ".cache" / "responses.sqlite3"))
+            if Config.ENABLE_RESPONSE_CACHE else None
+        )
+        self.prefix_cache = (
+            PrefixCacheRegistry(str(self.report_dir() / ".prefix_cache.json"))
+            if Config.ENABLE_PROMPT_CACHE_KEY else None
+        )
+
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        """Pooled async HTTP client for the SDK; aiohttp transport when the extra is installed,
+        otherwise httpx (HTTP/2 when h2 is available)."""
+        limits = httpx.Limits(max_connections=Config.HTTP_MAX_CONNECTIONS,
+                              max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE)
+        timeout = httpx.Timeout(Config.HTTP_TIMEOUT, connect=Config.HTTP_CONNECT_TIMEOUT)
+        if DefaultAioHttpClient is not None:
+            try:
+                return DefaultAioHttpClient(limits=limits, timeout=timeout)
+            except RuntimeError:  # openai[aiohttp] extra not installed
+                pass
+        return DefaultAsyncHttpxClient(limits=limits, timeout=timeout,
+                                       http2=Config.HTTP2 and HTTP2_AVAILABLE)
+
+    async def aclose(self):
+        """Release pooled HTTP connections and the response cache."""
+        await self.client.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    # Transient API failures worth retrying (APITimeoutError is an APIConnectionError)
+    RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds the server asked us to wait (retry-after-ms / retry-after headers), if any."""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            try:
+                return max(0.0, float(headers[name]) * scale)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+
+    async def _with_backoff(self, call, **kwargs):
+        """Await call(**kwargs), retrying RETRYABLE_ERRORS with jittered exponential backoff."""
+        for attempt in range(Config.MAX_RETRIES):
+            try:
+                return await call(**kwargs)
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == Config.MAX_RETRIES - 1:
+                    raise
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = min(Config.RETRY_MAX_DELAY, Config.RETRY_INITIAL_DELAY * 2 ** attempt) + random.random()
+                print(f"   ⏳ {type(e).__name__}; retrying in {delay:.1f}s ({attempt + 1}/{Config.MAX_RETRIES - 1})")
+                await asyncio.sleep(delay)
+
+    async def _create_response_with_backoff(self, **request):
+        """Create a Responses API call under the shared retry policy."""
+        return await self._with_backoff(self.client.responses.create, **request)
+
+    async def _stream_response_text(self, request: Dict[str, Any]):
+        """
+        Stream a Responses API call, collecting output_text deltas as they decode.
+        Returns (joined text, final response object for usage/annotations,
+        whether the top-level JSON object closed).
+        """
+        stream = await self._create_response_with_backoff(**request, stream=True)
+        on_section = (lambda key: print(f"      ⏳ streamed: {key}")) if Config.STREAM_PROGRESS else None
+        progress = JsonStreamProgress(on_section)
+        chunks, final = [], None
+        async for event in stream:
+            etype = getattr(event, "type", "")
+            if etype == "response.output_text.delta":
+                chunks.append(event.delta)
+                progress.feed(event.delta)
+            elif etype in ("response.completed", "response.incomplete"):
+                final = event.response
+            elif etype in ("response.failed", "error"):
+                raise RuntimeError(f"stream reported {etype}")
+        return "".join(chunks), final, progress.closed
+
+    @staticmethod
+    def _response_text(resp) -> Optional[str]:
+        """Output text of a Responses API result (convenience property, then first message part)."""
+        if resp is None:
+            return None
+        # Prefer the convenience property if present
+        raw_json = getattr(resp, "output_text", None)
+
+        # Fallback: walk the structured output for the first text part
+        if not raw_json:
+            msg = next((x for x in getattr(resp, "output", []) if getattr(x, "type", "") == "message"), None)
+            if msg and getattr(msg, "content", None):
+                part = msg.content[0]
+                raw_json = getattr(part, "text", None) or str(part)
+        return raw_json
+
+    @staticmethod
+    def _hit_output_limit(resp) -> bool:
+        """True if the response stopped because max_output_tokens ran out."""
+        details = getattr(resp, "incomplete_details", None)
+        return getattr(resp, "status", None) == "incomplete" and getattr(details, "reason", None) == "max_output_tokens"
+
+    async def _fetch_json(self, request: Dict[str, Any]):
+        """
+        One attempt at `request`: streamed when enabled, non-streamed as fallback.
+        Returns (data, resp); data is None when the output budget ran out, since
+        a truncated packet is not worth repairing.
+        """
+        if Config.STREAM_RESPONSES:
+            try:
+                raw_json, resp, complete = await self._stream_response_text(request)
+                if self._hit_output_limit(resp):
+                    return None, resp
+                if raw_json and not complete:
+                    # Known-truncated text: skip the doomed parse + block-extraction attempt
+                    raise ValueError("stream ended before the JSON object closed")
+                return self._parse_json_text(raw_json or self._response_text(resp)), resp
+            except (BadRequestError, *self.RETRYABLE_ERRORS):
+                # Already retried (or not retryable); a plain call would only repeat the failure
+                raise
+            except Exception as e:
+                # Malformed partials / broken stream: redo the call non-streamed
+                print(f"   ⚠️ Streamed response unusable ({type(e).__name__}: {e}); retrying without streaming")
+        resp = await self._create_response_with_backoff(**request)
+        if self._hit_output_limit(resp):
+            return None, resp
+        return self._parse_json_text(self._response_text(resp)), resp
+
+    def _parse_json_text(self, raw_json: Optional[str]) -> dict:
+        if not raw_json:
+            raise RuntimeError("Responses API returned no text; cannot parse JSON.")
+
+        # Strict parse, then fallback to largest-JSON-block extraction if needed
+        try:
+            return _json_loads(raw_json)
+        except Exception:
+            return _json_loads(self._extract_json_block(raw_json))
+
+    @staticmethod
+    def _schema_rejected(error: BadRequestError) -> bool:
+        """True if a 400 is about the structured-output format (text.format / json_schema)."""
+        param = str(getattr(error, "param", None) or "")
+        message = str(getattr(error, "message", None) or error).lower()
+        return (param.startswith("text")
+                or any(term in message for term in ("json_schema", "text.format", "response_format")))
+
+    async def _responses_generate_json(self, system_prompt: str, user_prompt: str, max_output_tokens: int,
+                                       model: Optional[str] = None, prompt_cache_key: Optional[str] = None,
+                                       json_schema: Optional[Dict[str, Any]] = None,
+                                       tools_enabled: bool = True):
+        """
+        Call Responses API with hosted web_search enabled (unless `tools_enabled` is
+        False or Config.DISABLE_WEB_SEARCH is set, in which case no tools are sent).
+        JSON is forced by instruction, plus a strict json_schema text format when
+        `json_schema` is given (dropped for the run if the API rejects it).
+        """
+        # Strong, explicit JSON-only nudge
+        json_only_nudge = (
+            "Return ONLY a valid JSON object matching the requested schema. "
+            "No markdown, no prose, no preamble."
+        )
+
+        request = dict(
+            model=model or Config.MODEL,
+            input=[
+                {
+                    "role": "system",
+                    "content": [
+                        {"type": "input_text", "text": system_prompt}
+                    ],
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "input_text", "text": f"{user_prompt}\n\n{json_only_nudge}"}
+                    ],
+                },
+            ],
+            max_output_tokens=max_output_tokens,
+            #temperature=Config.TEMPERATURE,
+        )
+        if tools_enabled and not Config.DISABLE_WEB_SEARCH:
+            request["tools"] = [{"type": "web_search"}]
+            # tool_choice is optional; default is auto. If you keep it:
+            request["tool_choice"] = "auto"
+        if prompt_cache_key:
+            # Routes requests sharing the static prefix to the same provider-side prompt cache
+            request["prompt_cache_key"] = prompt_cache_key
+
+        if json_schema is not None and self._json_schema_supported:
+            # Structured outputs: the model is constrained to the packet schema at decode time
+            request["text"] = {"format": {"type": "json_schema", "name": "life_sciences_dd_packet",
+                                          "schema": json_schema, "strict": True}}
+
+        async with self._semaphore:
+            while True:
+                try:
+                    data, resp = await self._fetch_json(request)
+                except BadRequestError as e:
+                    # Only a rejected text.format / json_schema is worth a retry without it;
+                    # other 400s (context length, bad prompt_cache_key...) would fail again
+                    if "text" not in request or not self._schema_rejected(e):
+                        raise
+                    print(f"   ⚠️ Structured-output schema rejected ({e}); using JSON-by-instruction")
+                    self._json_schema_supported = False
+                    request.pop("text")
+                    continue
+                if data is not None:
+                    break
+                # Output budget exhausted mid-packet: raise it (up to MAX_TOKENS) and retry
+                budget = request["max_output_tokens"]
+                raised = min(Config.MAX_TOKENS, budget * 2)
+                if raised < budget * Config.MIN_BUDGET_RAISE:
+                    data = self._parse_json_text(self._response_text(resp))
+                    break
+                request["max_output_tokens"] = raised
+                print(f"   ⚠️ Hit max_output_tokens={budget}; retrying with {request['max_output_tokens']}")
+
+        # Optional: count URL citations and keep the first few for debug output
+        url_count, sample_urls = 0, []
+        if Config.DEBUG_CITATIONS:
+            try:
+                msg = next((x for x in getattr(resp, "output", ()) if getattr(x, "type", "") == "message"), None)
+                anns = (a for p in (getattr(msg, "content", None) or ()) for a in (getattr(p, "annotations", None) or ()))
+                urls = (a.url for a in anns if getattr(a, "type", "") == "url_citation" and getattr(a, "url", None))
+                # Lazy: only the five samples are materialized; the rest are just counted
+                sample_urls = list(islice(urls, 5))
+                url_count = len(sample_urls) + sum(1 for _ in urls)
+            except Exception:
+                pass
+
+        # Light usage capture if available (returned, not stored on self: calls run concurrently)
+        usage = getattr(resp, "usage", None)
+        token_usage = {
+            "prompt_tokens": getattr(usage, "input_tokens", None),
+            "completion_tokens": getattr(usage, "output_tokens", None),
+            "total_tokens": ((getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)),
+            # Input tokens served from the API's automatic prefix cache
+            "cached_tokens": getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", None),
+        }
+
+        return data, {"url_citations_found": url_count, "sample_citations": sample_urls, "token_usage": token_usage}
+
+    async def _embed(self, text: str):
+        # Same in-flight cap as the Responses calls: run_records gathers every record at once
+        async with self._semaphore:
+            resp = await self._with_backoff(self.client.embeddings.create,
+                                            model=Config.EMBEDDING_MODEL, input=text[:8000])
+        return resp.data[0].embedding
+
+    async def _generate_json(self, system_prompt: str, user_prompt: str,
+                             semantic_text: Optional[str] = None,
+                             semantic_namespace: str = "",
+                             static_prefix: str = "",
+                             prompt_cache_key: Optional[str] = None,
+                             max_output_tokens: Optional[int] = None,
+                             json_schema: Optional[Dict[str, Any]] = None,
+                             analysis_type: Optional[str] = None,
+                             category: Optional[str] = None,
+                             tools_enabled: bool = True) -> Tuple[dict, dict]:
+        """
+        Now uses Responses API + web_search. Returns (data, debug_info).
+        Replies are served from ResponseCache when the same prompt (or, with the
+        semantic tier enabled, near-identical `semantic_text` of the same category)
+        was answered within the cache TTL.
+        `static_prefix` is a leading part of `user_prompt` shared across calls; its
+        hash state is computed once and only the remainder is encoded per call.
+        """
+        cache = self.response_cache
+        max_output_tokens = max_output_tokens or Config.MAX_TOKENS
+        if cache is None:
+            return await self._responses_generate_json(system_prompt, user_prompt, max_output_tokens,
+                                                       prompt_cache_key=prompt_cache_key, json_schema=json_schema,
+                                                       tools_enabled=tools_enabled)
+
+        # Replies written without web search never answer a web-search call (and vice versa)
+        model_key = Config.MODEL
+        if not tools_enabled or Config.DISABLE_WEB_SEARCH:
+            model_key = f"{Config.MODEL}|no_web_search"
+        if static_prefix and user_prompt.startswith(static_prefix):
+            key = ResponseCache.extend_key(
+                ResponseCache.prefix_state(model_key, Config.TEMPERATURE, system_prompt, static_prefix),
+                user_prompt[len(static_prefix):],
+            )
+        else:
+            key = ResponseCache.make_key(model_key, Config.TEMPERATURE, system_prompt, user_prompt)
+        # --force: a fresh model reply is wanted, so skip cache reads (the reply is still written)
+        hit = None if Config.FORCE_RERUN else cache.get(key)
+        if hit:
+            cache.counts["exact"] += 1
+            data, dbg = hit
+            return data, {**dbg, "cache": "exact"}
+
+        namespace = ResponseCache.namespace_key(model_key, Config.TEMPERATURE, system_prompt, semantic_namespace)
+        embedding = None
+        if Config.ENABLE_SEMANTIC_CACHE and semantic_text:
+            embedding = await self._embed(semantic_text)
+        if embedding is not None and not Config.FORCE_RERUN:
+            similar = cache.get_similar(namespace, embedding, Config.SEMANTIC_CACHE_THRESHOLD, category)
+            if similar:
+                cache.counts["semantic"] += 1
+                data, dbg, sim = similar
+                return data, {**dbg, "cache": "semantic", "cache_similarity": round(sim, 4)}
+
+        data, dbg = await self._responses_generate_json(system_prompt, user_prompt, max_output_tokens,
+                                                       prompt_cache_key=prompt_cache_key, json_schema=json_schema,
+                                                       tools_enabled=tools_enabled)
+        cache.counts["miss"] += 1
+        cache.set(key, namespace, data, dbg, embedding, analysis_type=analysis_type, category=category)
+        return data, {**dbg, "cache": "miss"}
+
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _static_sources_block() -> str:
+        """Category-independent source list that opens every user prompt (joined once)."""
+        return f"""SPECIFIC CREDIBLE SOURCES TO PRIORITIZE:
+    - Medical Journals: {', '.join(_life_sciences_sources()['medical_journals'][:5])}
+    - Databases: {', '.join(_life_sciences_sources()['pharma_databases'][:5])}
+    - Regulatory: {', '.join(_life_sciences_sources()['regulatory_sources'][:5])}
+    - Market Research: {', '.join(_life_sciences_sources()['market_research'][:5])}"""
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _static_prompt_head(analysis_type: str) -> str:
+        """Leading, IP-independent part of the user prompt: source list + template up to the data."""
+        sources_block = LifeSciencesDueDiligenceAnalyzer._static_sources_block()
+        return f"""
+    {sources_block}
+
+    {LifeSciencesPrompts.template_parts(analysis_type)[0]}"""
+
+    def _prompt_cache_key(self, analysis_type: str) -> Optional[str]:
+        """Versioned prompt_cache_key for this mode's static prefix, or None when disabled."""
+        if self.prefix_cache is None:
+            return None
+        memo = (analysis_type, Config.MODEL)
+        if memo not in self._prompt_cache_keys:
+            self._prompt_cache_keys[memo] = self.prefix_cache.key_for(
+                f"dd_{analysis_type}", Config.MODEL,
+                LifeSciencesPrompts.BASE_SYSTEM_PROMPT, self._static_sources_block(),
+                LifeSciencesPrompts.template_parts(analysis_type)[0],
+            )
+        return self._prompt_cache_keys[memo]
+
+    @staticmethod
+    def report_dir() -> Path:
+        """Where timestamped reports go: OUTPUT_DIR, or its shard_<id> subdir in a worker process."""
+        base = Path(Config.OUTPUT_DIR)
+        return base if Config.SHARD_ID is None else base / f"shard_{Config.SHARD_ID}"
+
+    def ensure_output_dir(self):
+        """Create output directory if it doesn't exist"""
+        self.report_dir().mkdir(parents=True, exist_ok=True)
+
+    def _compute_composite_score(self, scores_pillars: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute weighted composite score 0-100 and band."""
+        normalized = []
+        for pillar in PILLAR_ORDER:
+            try:
+                s = float(scores_pillars.get(pillar, {}).get("score", 0))
+                s = max(0.0, min(5.0, s))
+            except (TypeError, ValueError):
+                s = 0.0
+            normalized.append(s / 5.0)
+        total = sum(map(operator.mul, normalized, SCORE_WEIGHTS_VEC))
+        pct = round(((total / SCORE_WEIGHT_SUM) * 100.0), 1) if SCORE_WEIGHT_SUM else 0.0
+        band = "Green" if pct >= 75 else ("Amber" if pct >= 55 else "Red")
+        return {"score_0_100": pct, "band": band}
+
+    @staticmethod
+    def _technology_text(technology_data: Dict[str, Any]) -> str:
+        """Canonical compact dump of a record (sorted keys): semantic-cache text; lowercased for keyword scans."""
+        return json.dumps(technology_data, ensure_ascii=False, sort_keys=True)
+
+    def detect_life_sciences_category(self, technology_data: Dict, prepared_text: Optional[str] = None) -> tuple:
+        """Detect specific life sciences category from data.
+        `prepared_text` is _technology_text(technology_data).lower(), when the caller already has it."""
+        if prepared_text is None:
+            prepared_text = self._technology_text(technology_data).lower()
+        scores = dict(_score_categories(prepared_text))
+
+        if scores:
+            # Get top category but also check for multi-category technologies
+            detected = max(scores, key=scores.get)
+            
+            # Special handling for combination categories
+            if 'DIAGNOSTIC' in scores and 'DIGITAL_HEALTH' in scores:
+                detected = 'DIGITAL_DIAGNOSTIC'
+            elif 'MEDICAL_DEVICE' in scores and 'DIGITAL_HEALTH' in scores:
+                detected = 'CONNECTED_MEDICAL_DEVICE'
+            
+            return detected, scores
+        
+        return 'GENERAL_LIFE_SCIENCES', {}
+
+    def _guess_origin_country(self, technology_data: Dict[str, Any], prepared_text: Optional[str] = None) -> str:
+        """Best-effort origin-country hint from fields or text (non-authoritative).
+        `prepared_text` is _technology_text(technology_data).lower(), when the caller already has it."""
+        # direct fields first
+        for key in ("assignee_country","inventor_country","priority_country",
+                    "jurisdiction","applicant_country","origin_country"):
+            v = technology_data.get(key)
+            if isinstance(v, str) and v.strip():
+                return v.strip()
+        # heuristic scan
+        txt = prepared_text if prepared_text is not None else self._technology_text(technology_data).lower()
+        # One pass; whole words only, so "us"/"in" no longer match inside "virus"/"protein"
+        best = None
+        for match in _ORIGIN_RE.finditer(txt):
+            rank = _ORIGIN_RANK[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return ORIGIN_CANDIDATES[best] if best is not None else ""
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def enhance_prompt_with_sources(category: str) -> str:
+        """Add relevant citation source hints based on category (pure in `category`, so memoized)"""
+        source_recommendations = []
+
+        if 'DRUG' in category or 'BIOLOGIC' in category:
+            source_recommendations.extend([
+                "Search PubMed for mechanism of action studies",
+                "Check ClinicalTrials.gov (NCT) for ongoing trials / endpoints",
+                "Review FDA Orange/Purple Book for patent & exclusivity",
+                "Use IQVIA/Evaluate/GlobalData for market size and share"
+            ])
+        elif 'VACCINE' in category:
+            source_recommendations.extend([
+                "NEJM/Lancet vaccine trials",
+                "WHO vaccine pipeline / SAGE/ACIP",
+                "EMA EPAR, FDA BLA precedents"
+            ])
+        elif 'DIAGNOSTIC' in category:
+            source_recommendations.extend([
+                "Diagnostic accuracy studies (sensitivity/specificity)",
+                "FDA 510(k)/PMA predicates",
+                "CMS coverage decisions (NCD/LCD)"
+            ])
+        elif 'DEVICE' in category:
+            source_recommendations.extend([
+                "FDA MAUDE adverse events",
+                "510(k)/PMA database for predicates",
+                "Peer-reviewed device outcomes"
+            ])
+        elif 'AGRICULTURAL' in category or 'VETERINARY' in category:
+            source_recommendations.extend([
+                "USDA/EPA registrations",
+                "Veterinary/agri peer-reviewed journals",
+                "FAO market/epidemiology reports"
+            ])
+
+        return "\n".join(source_recommendations)
+    
+    def _merge_corrections(self, original: Dict, corrections: Dict) -> Dict:
+        """Merge targeted corrections into original report"""
+        # Reports are plain JSON; a serializer round-trip copies them far faster than deepcopy
+        merged = _json_loads(_json_dumps(original))
+        
+        def update_nested(target, source, path=""):
+            for key, value in source.items():
+                if key in target:
+                    if isinstance(value, dict) and isinstance(target[key], dict):
+                        update_nested(target[key], value, f"{path}.{key}" if path else key)
+                    elif value is not None and value != "":
+                        # Only update if correction has valid data
+                        target[key] = value
+                        print(f"      Updated: {path}.{key}")
+                else:
+                    target[key] = value
+        
+        update_nested(merged, corrections)
+        return merged
+
+    @staticmethod
+    def _gap_path(gap: str) -> str:
+        """JSON path of a data_gaps message ("Not enough valid cited information: <path>[ → flagged source: …]")."""
+        return gap.split(": ", 1)[-1].split(" → ", 1)[0].strip()
+
+    @staticmethod
+    def _is_filled(report: Dict[str, Any], path: str) -> bool:
+        """True if the dotted (dict-only) `path` now holds a value backed by a non-empty citation."""
+        parent, node = None, report
+        for key in path.split("."):
+            if not isinstance(node, dict) or key not in node:
+                return False
+            parent, node = node, node[key]
+        if isinstance(node, dict):
+            return bool(node.get("citation"))
+        return node not in (None, "") and bool(isinstance(parent, dict) and parent.get("citation"))
+
+    async def _fill_data_gaps(self, report: Dict[str, Any], technology_data: Dict[str, Any], tag: str) -> Dict[str, Any]:
+        """
+        Send only the data_gaps list to Config.GAP_FILL_MODEL, merge the returned
+        corrections, re-validate citations, and drop the gaps that are now filled.
+        Array-element paths are left alone: a merge would replace the whole list.
+        """
+        gaps = report.get("data_gaps") or []
+        paths = list(dict.fromkeys(
+            p for p in map(self._gap_path, gaps) if p and p != "$" and "[" not in p
+        ))
+        if not paths:
+            return report
+
+        title = ""
+        if isinstance(technology_data, dict):
+            title = str(technology_data.get("title") or technology_data.get("name") or "")
+        user_prompt = LifeSciencesPrompts.GAP_FILL_PROMPT + "\n".join(
+            [f"TECHNOLOGY: {title or 'NA'}", "DATA GAPS:"] + [f"- {p}" for p in paths]
+        )
+
+        print(f"   {tag} Phase 2: filling {len(paths)} data gap(s) with {Config.GAP_FILL_MODEL}...")
+        try:
+            corrections, dbg = await self._responses_generate_json(
+                LifeSciencesPrompts.BASE_SYSTEM_PROMPT, user_prompt,
+                Config.GAP_FILL_MAX_TOKENS, model=Config.GAP_FILL_MODEL,
+            )
+        except Exception as e:
+            print(f"   {tag} ⚠️ Gap fill skipped: {e}")
+            return report
+        if not isinstance(corrections, dict) or not corrections:
+            return report
+
+        merged = self.validate_report_citations(self._merge_corrections(report, corrections))
+        filled = {p for p in paths if self._is_filled(merged, p)}
+        merged["data_gaps"] = [g for g in merged.get("data_gaps", []) if self._gap_path(g) not in filled]
+        merged.setdefault("meta", {})["gap_fill"] = {
+            "model": Config.GAP_FILL_MODEL,
+            "requested": len(paths),
+            "filled": len(filled),
+            "token_usage": dbg.get("token_usage"),
+        }
+        print(f"   {tag} ✓ Phase 2 filled {len(filled)}/{len(paths)} gap(s)")
+        return merged
+
+    @staticmethod
+    def _record_id(data, record_index: Optional[int], technology_data: Dict[str, Any]) -> str:
+        """
+        Stable, filesystem-safe id for one input record: its ip_id / _id.$oid / id
+        when present (step2 output carries _id.$oid), else a hash of its content.
+        """
+        item = data
+        if isinstance(data, list) and record_index is not None and 0 <= record_index < len(data):
+            item = data[record_index]
+        candidates = []
+        for source in (item, technology_data):
+            if isinstance(source, dict):
+                oid = source.get("_id")
+                candidates += [source.get("ip_id"), oid.get("$oid") if isinstance(oid, dict) else oid, source.get("id")]
+        raw = next((str(c) for c in candidates if isinstance(c, (str, int)) and str(c).strip()), None)
+        if raw is None:
+            content = json.dumps(technology_data, ensure_ascii=False, sort_keys=True, default=str)
+            raw = "sha_" + hashlib.blake2b(content.encode("utf-8"), digest_size=12).hexdigest()
+        return re.sub(r"[^A-Za-z0-9._-]+", "_", raw.strip())[:120]
+
+    @staticmethod
+    def _checkpoint_paths(checkpoint_id: str, analysis_type: str) -> Tuple[Path, Path]:
+        """(packet, prompt-hash sidecar) for OUTPUT_DIR/<ip_id>/<mode>.json."""
+        base = Path(Config.OUTPUT_DIR) / checkpoint_id
+        return base / f"{analysis_type}.json", base / f"{analysis_type}.hash"
+
+    @staticmethod
+    def _checkpoint_hash(system_prompt: str, user_prompt: str) -> bytes:
+        """Everything that shapes the packet: model, prompts, schema mode, gap-fill pass, web search."""
+        h = hashlib.blake2b(digest_size=16)
+        for part in (Config.MODEL, Config.STRICT_JSON_SCHEMA, Config.ENABLE_GAP_FILL, system_prompt, user_prompt):
+            h.update(str(part).encode("utf-8"))
+            h.update(b"\x1f")
+        if Config.DISABLE_WEB_SEARCH:
+            # Only mixed in when set, so existing web-search checkpoints keep their hash
+            h.update(b"no_web_search\x1f")
+        return h.hexdigest().encode("ascii")
+
+    @staticmethod
+    def _load_checkpoint(paths: Tuple[Path, Path], prompt_hash: bytes) -> Optional[Dict[str, Any]]:
+        out, hash_file = paths
+        try:
+            if hash_file.read_bytes() != prompt_hash:
+                return None
+            return _json_loads(out.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_checkpoint(paths: Tuple[Path, Path], prompt_hash: bytes, report: Dict[str, Any]):
+        """Atomic writes (tmp + os.replace): packet first, then the hash that vouches for it."""
+        out, hash_file = paths
+        out.parent.mkdir(parents=True, exist_ok=True)
+        for target, payload in ((out, _json_dumps(report)), (hash_file, prompt_hash)):
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, target)
+
+    def load_technology_data(self, file_path: str, record_index: Optional[int] = None) -> Dict[str, Any]:
+        """Load technology data from JSON file; optionally select one record in a list."""
+        return self._select_record(self._read_json_file(file_path), record_index)
+
+    @staticmethod
+    def _read_json_file(file_path: str):
+        raw = Path(file_path).read_bytes()
+        try:
+            return _json_loads(raw)
+        except ValueError:
+            # Invalid UTF-8 (or malformed JSON, which json.loads then reports)
+            return json.loads(raw.decode('utf-8', errors='replace'))
+
+    @staticmethod
+    def _select_record(data, record_index: Optional[int] = None) -> Dict[str, Any]:
+        """One record of a list input (unwrapping its "details"), or the whole input."""
+        if isinstance(data, list) and record_index is not None:
+            if record_index < 0 or record_index >= len(data):
+                raise IndexError(f"record_index {record_index} out of range (0..{len(data)-1})")
+            item = data[record_index]
+            if isinstance(item, dict) and "details" in item and isinstance(item["details"], dict):
+                return item["details"]
+            return item
+        return data
+
+    @staticmethod
+    def _extract_json_block(text: str) -> str:
+        """Best-effort: pull the largest JSON object from a text block."""
+        if not text:
+            return ""
+        start = text.find("{")
+        end = text.rfind("}")
+        if start != -1 and end != -1 and end > start:
+            return text[start:end+1].strip()
+        return text.strip()
+
+
+    def _build_ip_prompt(self, technology_data: Dict[str, Any], analysis_type: str,
+                         tag: str, technology_text: Optional[str] = None) -> Tuple[str, str, str]:
+        """(category, per-IP context block, full user prompt) for one IP and mode.
+        `technology_text` is _technology_text(technology_data), when the caller already has it."""
+        # The compact dump is lowercased once and shared by both keyword scans
+        td_lower = (technology_text or self._technology_text(technology_data)).lower()
+        # Detect category early (you already do this later; do it once here)
+        category, _ = self.detect_life_sciences_category(technology_data, td_lower)
+        print(f"   {tag} Detected Category: {category}")
+
+        # Prompt enhancers (optional module)
+        domain_requirements = ""
+        if Config.ENABLE_DOMAIN_VALIDATION:
+            try:
+                from domain_validation import DomainSpecificPrompter
+                prompter = DomainSpecificPrompter()
+                domain_requirements = prompter.get_enhancement(category)
+            except ImportError:
+                print("   (domain_validation not installed; skipping domain prompt enhancements)")
+            except Exception as e:
+                print(f"   (domain_validation prompt enhancer warning: {e})")
+
+        source_guidance = self.enhance_prompt_with_sources(category)
+        origin_hint = self._guess_origin_country(technology_data, td_lower)
+        origin_hint_line = f"ORIGIN COUNTRY HINT (best-effort): {origin_hint or 'NA'}"
+
+        # Static text first (sources, rules, schema), per-IP text last: keeps the
+        # prompt prefix byte-identical across IPs so the API's prefix cache applies
+        static_head = self._static_prompt_head(analysis_type)
+        suffix = LifeSciencesPrompts.template_parts(analysis_type)[1]
+        context = f"""
+
+    {origin_hint_line}
+    DETECTED TECHNOLOGY CATEGORY: {category}
+
+    {domain_requirements}
+
+    RECOMMENDED CITATION SOURCES FOR THIS CATEGORY:
+    {source_guidance}
+    """
+        enhanced_prompt = "".join(
+            (static_head, _json_dumps(technology_data, indent=True).decode("utf-8"), suffix, context)
+        )
+        return category, context, enhanced_prompt
+
+    async def analyze_life_sciences_ip(self, technology_data: Dict[str, Any], analysis_type: str = "global",
+                                       checkpoint_id: Optional[str] = None) -> Dict[str, Any]:
+        tag = f"[{analysis_type.upper()}]"
+        technology_text = self._technology_text(technology_data)
+        skip_reason = self._skip_reason(technology_data, technology_text)
+        if skip_reason:
+            print(f"   {tag} ⏭️ Skipping LLM call: {skip_reason}")
+            return self._skipped_report(skip_reason)
+        category, _, enhanced_prompt = self._build_ip_prompt(technology_data, analysis_type, tag, technology_text)
+        static_head = self._static_prompt_head(analysis_type)
+
+        # Restartable runs: a finished packet for this IP + mode + exact prompt is reused
+        checkpoint = None
+        if checkpoint_id and Config.ENABLE_CHECKPOINTS:
+            checkpoint = self._checkpoint_paths(checkpoint_id, analysis_type)
+            prompt_hash = self._checkpoint_hash(LifeSciencesPrompts.BASE_SYSTEM_PROMPT, enhanced_prompt)
+            if not Config.FORCE_RERUN:
+                saved = self._load_checkpoint(checkpoint, prompt_hash)
+                if saved is not None:
+                    print(f"   {tag} ♻️ Reusing checkpoint {checkpoint[0]}")
+                    return saved
+
+        try:
+            print(f"   {tag} Generating analysis report...")
+            result, dbg = await self._generate_json(
+                LifeSciencesPrompts.BASE_SYSTEM_PROMPT, enhanced_prompt,
+                semantic_text=technology_text,
+                # Template head in the namespace: editing the GLOBAL/US template or its schema
+                # retires semantic hits written against the old one
+                semantic_namespace=f"{analysis_type}\x1f{LifeSciencesPrompts.template_parts(analysis_type)[0]}",
+                static_prefix=static_head,
+                prompt_cache_key=self._prompt_cache_key(analysis_type),
+                max_output_tokens=Config.MAX_OUTPUT_TOKENS.get(analysis_type, Config.MAX_TOKENS),
+                json_schema=LifeSciencesPrompts.packet_json_schema() if Config.STRICT_JSON_SCHEMA else None,
+                analysis_type=analysis_type,
+                category=category,
+            )
+            self._report_call_stats(dbg, analysis_type, tag)
+            if dbg.get("token_usage"):
+                result.setdefault("meta", {})["token_usage"] = dbg["token_usage"]
+            result = await self._finish_packet(result, technology_data, category, tag)
+
+            if checkpoint is not None:
+                self._save_checkpoint(checkpoint, prompt_hash, result)
+            return result
+
+        except Exception as e:
+            print(f"{tag} Error during analysis: {e}")
+            raise
+
+    @staticmethod
+    def batch_limit(analysis_type: str) -> int:
+        """Records per batch call: as many per-mode output budgets as fit in MAX_TOKENS."""
+        per_packet = Config.MAX_OUTPUT_TOKENS.get(analysis_type, Config.MAX_TOKENS)
+        return max(1, min(Config.MAX_BATCH_SIZE, Config.MAX_TOKENS // per_packet))
+
+    async def analyze_life_sciences_ip_batch(self, records: List[Dict[str, Any]], analysis_type: str = "global",
+                                             checkpoint_ids: Optional[List[Optional[str]]] = None
+                                             ) -> List[Dict[str, Any]]:
+        """
+        Analyze several records in one Responses API call per batch_limit(analysis_type) records.
+        The static prompt head is sent once per batch; each record's packet is then
+        validated and scored locally as in analyze_life_sciences_ip. Records whose
+        packet is missing from the reply (or whose batch fails) are retried alone.
+        """
+        checkpoint_ids = list(checkpoint_ids or [None] * len(records))
+        step = self.batch_limit(analysis_type)
+        if len(records) > step:
+            chunks = await asyncio.gather(*(
+                self.analyze_life_sciences_ip_batch(records[i:i + step], analysis_type, checkpoint_ids[i:i + step])
+                for i in range(0, len(records), step)
+            ))
+            return [report for chunk in chunks for report in chunk]
+
+        tag = f"[{analysis_type.upper()} x{len(records)}]"
+        reports: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        pending = []  # (position, category, context, checkpoint, prompt_hash)
+        for i, (technology_data, checkpoint_id) in enumerate(zip(records, checkpoint_ids)):
+            technology_text = self._technology_text(technology_data)
+            skip_reason = self._skip_reason(technology_data, technology_text)
+            if skip_reason:
+                print(f"   {tag} ⏭️ Record {i}: skipping LLM call: {skip_reason}")
+                reports[i] = self._skipped_report(skip_reason)
+                continue
+            category, context, enhanced_prompt = self._build_ip_prompt(technology_data, analysis_type, tag,
+                                                                       technology_text)
+            checkpoint = prompt_hash = None
+            if checkpoint_id and Config.ENABLE_CHECKPOINTS:
+                # Same hash as a single-record run, so checkpoints carry over either way
+                checkpoint = self._checkpoint_paths(checkpoint_id, analysis_type)
+                prompt_hash = self._checkpoint_hash(LifeSciencesPrompts.BASE_SYSTEM_PROMPT, enhanced_prompt)
+                if not Config.FORCE_RERUN:
+                    saved = self._load_checkpoint(checkpoint, prompt_hash)
+                    if saved is not None:
+                        print(f"   {tag} ♻️ Reusing checkpoint {checkpoint[0]}")
+                        reports[i] = saved
+                        continue
+            pending.append((i, category, context, checkpoint, prompt_hash))
+
+        packets = {}
+        dbg: Dict[str, Any] = {}
+        if len(pending) > 1:
+            static_head = self._static_prompt_head(analysis_type)
+            batch_data = [{"id": i, "technology_data": records[i]} for i, *_ in pending]
+            prompt = "".join((
+                static_head,
+                _json_dumps(batch_data, indent=True).decode("utf-8"),
+                LifeSciencesPrompts.template_parts(analysis_type)[1],
+                "".join(f"\n    RECORD {i}:{context}" for i, _, context, *_ in pending),
+                LifeSciencesPrompts.BATCH_INSTRUCTIONS,
+            ))
+            per_packet = Config.MAX_OUTPUT_TOKENS.get(analysis_type, Config.MAX_TOKENS)
+            try:
+                print(f"   {tag} Generating {len(pending)} analysis reports in one call...")
+                data, dbg = await self._generate_json(
+                    LifeSciencesPrompts.BASE_SYSTEM_PROMPT, prompt,
+                    static_prefix=static_head,
+                    prompt_cache_key=self._prompt_cache_key(analysis_type),
+                    # batch_limit keeps this within MAX_TOKENS: every packet gets its full budget
+                    max_output_tokens=min(Config.MAX_TOKENS, per_packet * len(pending)),
+                    json_schema=LifeSciencesPrompts.batch_json_schema() if Config.STRICT_JSON_SCHEMA else None,
+                    analysis_type=analysis_type,
+                )
+                self._report_call_stats(dbg, analysis_type, tag)
+                packets = {str(item.get("id")): item.get("report")
+                           for item in data.get("results", []) if isinstance(item, dict)}
+            except Exception as e:
+                print(f"   {tag} Batch call failed ({e}); analyzing records one at a time")
+
+        async def finish(i, category, context, checkpoint, prompt_hash):
+            packet = packets.get(str(i))
+            if not isinstance(packet, dict):
+                if len(pending) > 1:
+                    print(f"   {tag} No packet for record {i} in batch reply; analyzing it alone")
+                return await self.analyze_life_sciences_ip(records[i], analysis_type, checkpoint_id=checkpoint_ids[i])
+            if dbg.get("token_usage"):
+                # Usage of the whole batch call, not of this record alone
+                packet.setdefault("meta", {})["token_usage"] = {**dbg["token_usage"], "batch_size": len(pending)}
+            packet = await self._finish_packet(packet, records[i], category, f"[{analysis_type.upper()} #{i}]")
+            if checkpoint is not None:
+                self._save_checkpoint(checkpoint, prompt_hash, packet)
+            return packet
+
+        for (i, *_), report in zip(pending, await asyncio.gather(*(finish(*p) for p in pending))):
+            reports[i] = report
+        return reports
+
+    def _skip_reason(self, technology_data: Dict[str, Any], technology_text: str) -> Optional[str]:
+        """Why a record is too thin to be worth a web-search call, or None to analyze it."""
+        if len(technology_text) < Config.MIN_CONTENT_CHARS:
+            return (f"Input too small for meaningful analysis "
+                    f"({len(technology_text)} chars < {Config.MIN_CONTENT_CHARS})")
+        if Config.SKIP_UNCATEGORIZED and not self.detect_life_sciences_category(
+                technology_data, technology_text.lower())[1]:
+            return "Input too small for meaningful analysis (no life sciences category keywords)"
+        return None
+
+    def _skipped_report(self, reason: str) -> Dict[str, Any]:
+        """Stub packet for a skipped record: no scores, one data_gap, zeroed citation summary."""
+        report = {
+            "meta": {"analysis_date": datetime.now().strftime("%Y-%m-%d"), "skipped_llm": True},
+            "scores": {"pillars": {}},
+            "data_gaps": [reason],
+        }
+        return self.validate_report_citations(report)
+
+    def _report_call_stats(self, dbg: Dict[str, Any], analysis_type: str, tag: str):
+        """Print cache / web-citation / prompt-cache stats for one call and record them in the prefix registry."""
+        if dbg.get("cache") in ("exact", "semantic"):
+            print(f"   {tag} ♻️ Served from response cache ({dbg['cache']})")
+        elif self.prefix_cache is not None:
+            self.prefix_cache.record(self._prompt_cache_key(analysis_type), dbg.get("token_usage"))
+        if Config.DEBUG_CITATIONS:
+            print(f"🔎 {tag} web citations found:", dbg.get("url_citations_found", 0))
+            print(f"🔗 {tag} sample URLs:", dbg.get("sample_citations", []))
+        if dbg.get("token_usage") and dbg["token_usage"].get("cached_tokens") is not None:
+            print(f"   {tag} prompt cache hit tokens: {dbg['token_usage']['cached_tokens']}"
+                  f"/{dbg['token_usage']['prompt_tokens']}")
+
+    async def _finish_packet(self, result: Dict[str, Any], technology_data: Dict[str, Any],
+                             category: str, tag: str) -> Dict[str, Any]:
+        """Local post-processing of one model packet: citations, shape gaps, gap fill, review, composite score."""
+        result = self.validate_report_citations(result)
+
+        # Structural check against the required packet shape
+        shape_gaps = validate_packet_shape(result)
+        if shape_gaps:
+            gaps = result.get("data_gaps")
+            if not isinstance(gaps, list):
+                gaps = result["data_gaps"] = []
+            seen = {g for g in gaps if isinstance(g, str)}
+            gaps.extend(g for g in dict.fromkeys(shape_gaps) if g not in seen)
+            print(f"   {tag} ⚠️ {len(shape_gaps)} required field(s) missing or malformed in packet")
+
+        # Phase 2 (opt-in): small-model pass over the remaining data gaps
+        if Config.ENABLE_GAP_FILL and result.get("data_gaps"):
+            result = await self._fill_data_gaps(result, technology_data, tag)
+
+        # Domain-specific validation and review (optional)
+        if Config.ENABLE_DOMAIN_VALIDATION:
+            try:
+                from domain_validation import DomainValidator, AnalysisReviewer
+                validator = DomainValidator()
+                issues = validator.validate_market_data(result, category)  # result & category now exist
+
+                if issues:
+                    print(f"⚠️ Found {len(issues)} validation issues")
+                    high_priority = [i for i in issues if i.get('severity') == 'HIGH']
+                    if high_priority:
+                        print("   Attempting to correct critical issues...")
+    #                         correction_prompt = f"""
+    # Based on the initial analysis, the following CRITICAL issues need correction:
+
+    # {json.dumps(high_priority, indent=2)}
+
+    # For each issue, perform the specific recommended search and provide ONLY the corrected data.
+    # DO NOT use broad sector data as a proxy. If specific data cannot be found, set the field to null 
+    # and add an appropriate data_gap entry.
+
+    # Focus on:
+    # 1. Finding {category}-specific market data (not total sector)
+    # 2. Adding missing required fields with proper citations
+    # 3. Using targeted search queries as recommended
+
+    # Return corrections in JSON format matching the original schema.
+    # """
+    #                         try:
+    #                             corrections = self._generate_json(LifeSciencesPrompts.BASE_SYSTEM_PROMPT, correction_prompt)
+    #                             result = self._merge_corrections(result, corrections)
+    #                             print("   ✓ Applied corrections")
+    #                         except Exception as e:
+    #                             print(f"   ⚠️ Could not apply all corrections: {e}")
+
+                reviewer = AnalysisReviewer()
+                review = reviewer.review_report(result, category)
+                result['quality_assessment'] = {
+                    'score': review.get('quality_score', 0),
+                    'category': category,
+                    'issues_found': len(review.get('issues', [])),
+                    'passed_validation': review.get('quality_score', 0) >= 70
+                }
+                print(f"   Quality Score: {result['quality_assessment']['score']}/100")
+                if result['quality_assessment']['score'] < 70:
+                    for rec in review.get('recommendations', [])[:3]:
+                        print(f"     - {rec}")
+            except ImportError:
+                # Optional module missing; skip without failing the run
+                pass
+            except Exception as e:
+                print(f"   Validation/review warning: {e}")
+
+        # Composite score
+        try:
+            pillars = result.get("scores", {}).get("pillars")
+            if isinstance(pillars, dict):
+                result["scores"]["composite"] = self._compute_composite_score(pillars)
+        except Exception:
+            pass
+
+        return result
+
+
+    def validate_report_citations(self, report: Dict) -> Dict:
+        """Validate all citations; if invalid: blank citation, set simple value to 'None', and log data_gap.
+        Also count Tier 1/2/3 sources in citations_summary.tier_counts."""
+        citation_count = 0
+        valid_citations = 0
+        invalid_citations = []
+
+        # 1) counters for Tier 1/2/3 (classification comes from citation_validator.assess)
+        tier_counts = {1: 0, 2: 0, 3: 0}  
+        valid_by_tier = {1: 0, 2: 0, 3: 0}
+        gap_seen = None  # O(1) duplicate check alongside report["data_gaps"]
+
+        def add_gap(path: str, flagged_source: str = ""):
+            nonlocal gap_seen
+            gaps = report.setdefault("data_gaps", [])
+            if gap_seen is None:
+                # Model-written gaps may be objects; only strings can equal our messages
+                gap_seen = {g for g in gaps if isinstance(g, str)}
+            if flagged_source:
+                msg = f"Not enough valid cited information: {path} → flagged source: {flagged_source}"
+            else:
+                msg = f"Not enough valid cited information: {path}"
+            if msg not in gap_seen:
+                gap_seen.add(msg)
+                gaps.append(msg)
+
+        # Classify every citation string in one batched pass before the walk
+        found = []
+        pending = [report]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    if k == "citation" and isinstance(v, str):
+                        found.append(v)
+                    elif isinstance(v, (dict, list)):
+                        pending.append(v)
+            elif isinstance(node, list):
+                pending.extend(it for it in node if isinstance(it, (dict, list)))
+        assessed = dict(zip(found, self.citation_validator.assess_many(found)))
+
+        def frame(node, path):
+            # Live iterators: values are read as the walk reaches them, like the recursive walk did
+            return (node, path, iter(node.items()) if isinstance(node, dict) else enumerate(node))
+
+        def check(root):
+            """Pre-order walk with an explicit stack of iterator frames (no recursion)."""
+            nonlocal citation_count, valid_citations
+            if not isinstance(root, (dict, list)):
+                return
+            stack = [frame(root, "")]
+            while stack:
+                obj, path, items = stack[-1]
+                item = next(items, None)
+                if item is None:
+                    stack.pop()
+                    continue
+                k, v = item
+                if isinstance(obj, list):
+                    if isinstance(v, (dict, list)):
+                        stack.append(frame(v, f"{path}[{k}]"))
+                    continue
+
+                p = f"{path}.{k}" if path else k
+                if k == "citation" and isinstance(v, str):
+                    citation_count += 1
+
+                    # Single source of truth for tier + allow/deny
+                    allowed, tier, _ = assessed[v] if v else (False, None, 'empty')
+                    is_valid = bool(allowed and tier in (1, 2, 3))  # same rule as validate_medical_citation
+
+                    if allowed and is_valid:
+                        # Count every allowed (tiers 1/2/3) as valid
+                        valid_citations += 1
+                        if tier in (1, 2, 3):
+                            tier_counts[tier] += 1
+                            valid_by_tier[tier] += 1
+                    else:
+                        # Only forbidden/empty hit this path → blank cite, set sibling to NA, add data_gap
+                        invalid_citations.append(f"{p}: {v}")
+                        obj[k] = ""  # blank invalid citation
+                        # First simple sibling in key order; one early-exit pass, no key-list copy
+                        # (a dict has one "citation" key, so this runs at most once per dict)
+                        sk = next((sk for sk, sv in obj.items() if sk != "citation"
+                                   and isinstance(sv, (str, int, float)) and sv not in ("",)), None)
+                        if sk is not None:
+                            obj[sk] = None
+                        add_gap(path, flagged_source=v.strip())
+
+                elif isinstance(v, (dict, list)):
+                    stack.append(frame(v, p))
+
+        check(report)
+
+        # Update citation summary
+        rep = report.setdefault('citations_summary', {})
+        rep['total_citations'] = citation_count
+        rep['valid_citations'] = valid_citations
+        rep['citation_quality_score'] = f"{(valid_citations/max(1, citation_count)*100):.1f}%"
+        if invalid_citations:
+            rep['invalid_citations'] = invalid_citations[:10]
+
+        #tier counts to the summary
+        rep['tier_counts'] = {              
+            "tier1": tier_counts[1],
+            "tier2": tier_counts[2],
+            "tier3": tier_counts[3],
+        }
+        rep['valid_by_tier'] = {
+            "tier1": valid_by_tier[1],
+            "tier2": valid_by_tier[2],
+            "tier3": valid_by_tier[3],
+        }
+        return report
+
+
+    def save_report(self, report: Dict[str, Any], input_file: str, analysis_type: str, file_tag: str = ""):
+        """Save the analysis report with bibliography"""
+        base_name = Path(input_file).stem + file_tag
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        report_dir = self.report_dir()
+        report_file = f"{report_dir}/{base_name}_{analysis_type}_lifesci_dd_{timestamp}.json"
+        Path(report_file).write_bytes(_json_dumps(report, indent=True))
+
+        biblio_file = f"{report_dir}/{base_name}_{analysis_type}_bibliography_{timestamp}.txt"
+        self.export_bibliography(report, biblio_file)
+
+        print(f"✓ {analysis_type.upper()} analysis saved to: {report_file}")
+        print(f"✓ Bibliography saved to: {biblio_file}")
+
+        return report_file
+
+    @staticmethod
+    def _collect_citations(report: Dict) -> Dict[str, None]:
+        """Distinct non-empty citation strings of a report, in walk order."""
+        citations = {}  # insertion-ordered set of distinct citation strings
+
+        def items(node):
+            # List indices are ints, so they never match the "citation" key
+            return iter(node.items()) if isinstance(node, dict) else enumerate(node)
+
+        # Pre-order walk with an explicit stack of live iterators (no recursion)
+        stack = [items(report)] if isinstance(report, (dict, list)) else []
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            key, value = item
+            if key == 'citation' and isinstance(value, str):
+                if value and not value.startswith('Not enough'):
+                    citations[value] = None
+            elif isinstance(value, (dict, list)):
+                stack.append(items(value))
+        return citations
+
+    def export_bibliography(self, report: Dict, output_file: str):
+        """Export formatted medical/scientific bibliography"""
+        buckets = _bibliography_buckets(self._collect_citations(report))
+        sections = (
+            ("PEER-REVIEWED PUBLICATIONS\n", buckets["journal"]),
+            ("\nCLINICAL TRIALS\n", buckets["trial"]),
+            ("\nREGULATORY DOCUMENTS\n", buckets["regulatory"]),
+            ("\nMARKET RESEARCH\n", buckets["market"]),
+            ("\nOTHER SOURCES\n", buckets["other"]),
+        )
+
+        # Assemble the whole file, then write it once
+        parts = ["MEDICAL & SCIENTIFIC BIBLIOGRAPHY\n", "="*60 + "\n\n"]
+        for heading, citations in sections:
+            if citations:
+                parts.append(heading)
+                parts.append("-"*40 + "\n")
+                parts.extend(f"[{i}] {citation}\n\n" for i, citation in enumerate(sorted(citations), 1))
+        # Text mode on purpose: keeps the platform newline translation the file always had
+        Path(output_file).write_text("".join(parts), encoding='utf-8')
+
+    async def run_complete_analysis(self, input_file: str, record_index: Optional[int] = None,
+                                    analysis_types: Optional[tuple] = None,
+                                    technology_data: Optional[Dict[str, Any]] = None,
+                                    file_tag: str = "",
+                                    record_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Run the enabled analyses (default: Config.ANALYSIS_TYPES) concurrently for life sciences IP.
+        `technology_data` skips loading input_file (batch runs load it once); `file_tag`
+        is appended to the report file stem so records of one input do not collide."""
+        analysis_types = tuple(analysis_types or Config.ANALYSIS_TYPES)
+        labels = {"global": "🌍 GLOBAL", "us": "🇺🇸 US MARKET"}
+
+        print(f"\n🧬 Starting Life Sciences Due Diligence Analysis")
+        print("="*60)
+
+        # Load data
+        if technology_data is None:
+            print("📁 Loading technology data...")
+            data = self._read_json_file(input_file)
+            technology_data = self._select_record(data, record_index)
+            record_id = record_id or self._record_id(data, record_index, technology_data)
+        record_id = record_id or self._record_id(technology_data, None, technology_data)
+
+        # Detect and display category
+        category, _ = self.detect_life_sciences_category(technology_data)
+        print(f"🔬 Technology Category: {category}")
+
+        # Launch every analysis at once; wall time is the slowest call, not the sum
+        print(f"\nRunning {' + '.join(labels.get(t, t.upper()) for t in analysis_types)} life sciences analysis...")
+        print("   Searching medical/scientific, FDA/CMS and market sources...")
+        reports = await asyncio.gather(
+            *(self.analyze_life_sciences_ip(technology_data, t, checkpoint_id=record_id) for t in analysis_types)
+        )
+        results = dict(zip(analysis_types, reports))
+
+        files = {}
+        for analysis_type, report in results.items():
+            quality = report.get('citations_summary', {}).get('citation_quality_score', '0%')
+            print(f"   {labels.get(analysis_type, analysis_type.upper())} Citation Quality: {quality}")
+            files[analysis_type] = self.save_report(report, input_file, analysis_type, file_tag)
+
+        # Summary
+        print("\n" + "="*60)
+        print("✅ Life Sciences Analysis Complete!")
+        print(f"📊 Technology Type: {category}")
+        for analysis_type, report_file in files.items():
+            print(f"📄 {analysis_type.upper()} Report: {report_file}")
+
+        # Citation summary
+        print("\n📚 Citation Summary:")
+        for analysis_type, report in results.items():
+            summary = report.get('citations_summary', {})
+            print(f"   {analysis_type.upper()}: {summary.get('total_citations', 0)} citations "
+                  f"({summary.get('citation_quality_score', '0%')} valid)")
+
+        if self.response_cache is not None:
+            stats = self.response_cache.stats()
+            print(f"\n♻️ Response cache: {stats['exact']} exact + {stats['semantic']} semantic hits, "
+                  f"{stats['miss']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+        return results
+
+    async def run_records(self, input_file: str, record_indices, analysis_types: Optional[tuple] = None,
+                          batch_size: Optional[int] = None) -> Dict[Optional[int], Dict[str, str]]:
+        """
+        Analyze several records of one input concurrently (API calls stay bounded by
+        the shared semaphore). The file is read once. Returns {record_index:
+        {analysis_type: citation_quality_score}} or {"error": ...} for a failed record.
+        With batch_size > 1 (Config.BATCH_SIZE), that many records share each call.
+        """
+        data = self._read_json_file(input_file)
+        batch_size = max(1, min(batch_size or Config.BATCH_SIZE, Config.MAX_BATCH_SIZE))
+        if batch_size > 1:
+            return await self._run_record_batches(data, input_file, list(record_indices),
+                                                  tuple(analysis_types or Config.ANALYSIS_TYPES), batch_size)
+
+        async def one(index):
+            try:
+                technology_data = self._select_record(data, index)
+                results = await self.run_complete_analysis(
+                    input_file, index, analysis_types,
+                    technology_data=technology_data,
+                    file_tag="" if index is None else f"_r{index}",
+                    record_id=self._record_id(data, index, technology_data),
+                )
+                return index, {t: r.get('citations_summary', {}).get('citation_quality_score', '0%')
+                               for t, r in results.items()}
+            except Exception as e:
+                print(f"❌ Record {index}: {e}")
+                return index, {"error": str(e)}
+
+        return dict(await asyncio.gather(*(one(i) for i in record_indices)))
+
+    async def _run_record_batches(self, data, input_file: str, record_indices: list, analysis_types: tuple,
+                                  batch_size: int) -> Dict[Optional[int], Dict[str, str]]:
+        """run_records with `batch_size` records per analyze_life_sciences_ip_batch call."""
+        async def one(indices):
+            try:
+                records = [self._select_record(data, index) for index in indices]
+                ids = [self._record_id(data, index, td) for index, td in zip(indices, records)]
+                by_type = await asyncio.gather(
+                    *(self.analyze_life_sciences_ip_batch(records, t, ids) for t in analysis_types)
+                )
+                summary = {}
+                for pos, index in enumerate(indices):
+                    summary[index] = {}
+                    for analysis_type, reports in zip(analysis_types, by_type):
+                        report = reports[pos]
+                        self.save_report(report, input_file, analysis_type, "" if index is None else f"_r{index}")
+                        summary[index][analysis_type] = report.get('citations_summary', {}).get(
+                            'citation_quality_score', '0%')
+                return summary
+            except Exception as e:
+                print(f"❌ Records {indices}: {e}")
+                return {index: {"error": str(e)} for index in indices}
+
+        chunks = await asyncio.gather(*(
+            one(record_indices[i:i + batch_size]) for i in range(0, len(record_indices), batch_size)
+        ))
+        if self.response_cache is not None:
+            stats = self.response_cache.stats()
+            print(f"\n♻️ Response cache: {stats['exact']} exact + {stats['semantic']} semantic hits, "
+                  f"{stats['miss']} misses ({stats['hit_rate']:.0%} hit rate)")
+        return {index: result for chunk in chunks for index, result in chunk.items()}
+
+# ============================================================================
+# MAIN ENTRY POINT
+# ============================================================================
+
+def _config_overrides() -> Dict[str, Any]:
+    """Current Config values, re-applied in worker processes (spawned workers re-import the module)."""
+    return {k: v for k, v in vars(Config).items() if k.isupper()}
+
+
+def _run_shard(shard_id: int, workers: int, input_file: str, record_indices: list,
+               analysis_types: tuple, config_overrides: Dict[str, Any]) -> Dict[Optional[int], Dict[str, str]]:
+    """Worker-process entry: own event loop, own AsyncOpenAI client, own report dir."""
+    for k, v in config_overrides.items():
+        setattr(Config, k, v)
+    # Per-shard reports and prefix registry; checkpoints (keyed by record id) and the
+    # SQLite response cache stay shared, so a rerun with another --workers still finds them
+    Config.SHARD_ID = shard_id
+    # Split the in-flight request budget across processes (workers <= budget, so each gets
+    # at least 1); the remainder goes to the first shards so the totals add up to the budget
+    share, extra = divmod(Config.MAX_CONCURRENT_REQUESTS, workers)
+    Config.MAX_CONCURRENT_REQUESTS = max(1, share + (shard_id < extra))
+
+    async def run():
+        async with LifeSciencesDueDiligenceAnalyzer() as analyzer:
+            return await analyzer.run_records(input_file, record_indices, analysis_types)
+
+    return asyncio.run(run())
+
+
+async def run_all_records(input_file: str, analysis_types: tuple, workers: int = 1):
+    """Analyze every record of a list input, sharded across `workers` processes."""
+    data = LifeSciencesDueDiligenceAnalyzer._read_json_file(input_file)
+    indices = list(range(len(data))) if isinstance(data, list) else [None]
+    requested = workers
+    # More processes than in-flight calls would each still hold one, overshooting the budget
+    workers = max(1, min(workers, len(indices), Config.MAX_CONCURRENT_REQUESTS))
+    if workers < min(requested, len(indices)):
+        print(f"⚠️ --workers {requested} exceeds MAX_CONCURRENT_REQUESTS={Config.MAX_CONCURRENT_REQUESTS}; "
+              f"using {workers} process(es)")
+    print(f"🗂️ {len(indices)} record(s) across {workers} worker process(es)")
+
+    if workers == 1:
+        async with LifeSciencesDueDiligenceAnalyzer() as analyzer:
+            summary = await analyzer.run_records(input_file, indices, analysis_types)
+    else:
+        loop = asyncio.get_running_loop()
+        overrides = _config_overrides()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = await asyncio.gather(*(
+                loop.run_in_executor(pool, _run_shard, shard_id, workers, input_file,
+                                     indices[shard_id::workers], analysis_types, overrides)
+                for shard_id in range(workers)
+            ))
+        summary = dict(sorted(((k, v) for shard in shards for k, v in shard.items()), key=lambda kv: kv[0]))
+
+    failed = [i for i, r in summary.items() if "error" in r]
+    print("\n" + "="*60)
+    print(f"✅ Batch complete: {len(summary) - len(failed)}/{len(summary)} record(s) analyzed")
+    if failed:
+        print(f"❌ Failed records: {failed}")
+    return summary
+
+async def main():
+    """Main entry point for the life sciences DD analyzer"""
+    parser = argparse.ArgumentParser(
+        description='Generate Life Sciences Due Diligence Reports with Medical/Scientific Citations'
+    )
+    parser.add_argument('--record-index', type=int, default=None, help='If the input JSON is a list, analyze just this 0-based index')
+    parser.add_argument('input_file', help='Path to input JSON file containing life sciences IP data')
+    parser.add_argument('--api-key', help='OpenAI API key (or set OPENAI_API_KEY env variable)')
+    parser.add_argument('--model', default=Config.MODEL, help='OpenAI model to use (default: gpt-5)')
+    parser.add_argument('--output-dir', default=Config.OUTPUT_DIR, help='Output directory for reports')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk response cache')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-run analyses even if a matching checkpoint or cached reply exists (fresh replies are still cached)')
+    parser.add_argument('--no-web-search', action='store_true',
+                        help='Fast rerun/debug: call the model without the web_search tool')
+    parser.add_argument('--fill-gaps', action='store_true',
+                        help=f'Second pass: fill data_gaps citations with {Config.GAP_FILL_MODEL}')
+    parser.add_argument('--analysis-types', nargs='+', choices=['global', 'us'], default=list(Config.ANALYSIS_TYPES),
+                        help='Analyses to run concurrently (default: us)')
+    parser.add_argument('--all-records', action='store_true', help='If the input JSON is a list, analyze every record')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='With --all-records: shard records across N processes (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=Config.BATCH_SIZE,
+                        help=f'With --all-records: records per API call, up to {Config.MAX_BATCH_SIZE} and to '
+                             f'MAX_TOKENS // per-mode budget (default: 1)')
+
+    args = parser.parse_args()
+
+    # Update configuration
+    if args.api_key:
+        Config.OPENAI_API_KEY = args.api_key
+    if args.model:
+        Config.MODEL = args.model
+    if args.output_dir:
+        Config.OUTPUT_DIR = args.output_dir
+    if args.no_cache:
+        Config.ENABLE_RESPONSE_CACHE = False
+    if args.fill_gaps:
+        Config.ENABLE_GAP_FILL = True
+    if args.force:
+        Config.FORCE_RERUN = True
+    if args.no_web_search:
+        Config.DISABLE_WEB_SEARCH = True
+    batch_cap = max(LifeSciencesDueDiligenceAnalyzer.batch_limit(t) for t in args.analysis_types)
+    Config.BATCH_SIZE = max(1, min(args.batch_size, batch_cap))
+    if args.batch_size > Config.BATCH_SIZE:
+        print(f"⚠️ --batch-size {args.batch_size} exceeds what fits in MAX_TOKENS={Config.MAX_TOKENS}; "
+              f"using {Config.BATCH_SIZE}")
+
+    # Validate API key
+    if not Config.OPENAI_API_KEY or Config.OPENAI_API_KEY == "your-api-key-here":
+        print("❌ Error: OpenAI API key not set!")
+        print("   Set it via --api-key flag or OPENAI_API_KEY environment variable")
+        return
+
+    if args.all_records:
+        if args.record_index is not None:
+            print("❌ Error: --record-index and --all-records are mutually exclusive")
+            return
+        try:
+            await run_all_records(args.input_file, tuple(args.analysis_types), args.workers)
+        except Exception as e:
+            print(f"❌ Error during batch analysis: {e}")
+        return
+
+    # Run analysis
+    try:
+        async with LifeSciencesDueDiligenceAnalyzer() as analyzer:
+            await analyzer.run_complete_analysis(args.input_file, args.record_index, tuple(args.analysis_types))
+    except Exception as e:
+        print(f"❌ Error during analysis: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,444 +1,840 @@
-# Detail Scraper Using OpenAI Search Models
-# - Uses gpt-4o-search-preview for built-in agentic web searching
-# - More reliable than Responses API + web_search tool
-import os
-import re
-import json
-import time
-import logging
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, Any, Optional, List
-from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
-
-# ---- tqdm import (tolerant) ----
-try:
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(iterable, **kwargs):
-        return iterable
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-class SearchModelDetailScraper:
-    """
-    Uses OpenAI's dedicated search models (gpt-4o-search-preview)
-    These models have built-in agentic web searching
-    """
-    
-    def __init__(self, api_key: str = None, model: str = "gpt-4o-search-preview"):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        
-        k = api_key or OPENAI_API_KEY
-        if not k or not k.startswith("sk-"):
-            raise ValueError("OPENAI_API_KEY missing or malformed (must start with 'sk-')")
-        
-        logger.info(f"OpenAI key suffix in use: …{k[-6:]}")
-        self.openai_client = OpenAI(api_key=k)
-        self.model = model
-        
-        # Tracking
-        self.traditional_count = 0
-        self.gpt_count = 0
-        self.total_cost = 0.0
-        self.last_token_usage = {}
-        self.last_citations = []
-
-    def _fetch_with_requests(self, url: str) -> Optional[BeautifulSoup]:
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except Exception as e:
-            logger.debug(f"Requests failed: {e}")
-            return None
-
-    def _extract_traditional(self, soup: BeautifulSoup, url: str, ip_id: str) -> Dict[str, Any]:
-        details = {
-            "title": None,
-            "post_date": None,
-            "summary": None,
-            "abstract": None,
-            "benefit": None,
-            "market_application": None,
-            "technology_description": None,
-            "publications": {"text": None, "urls": []},
-            "image_urls": [],
-            "licensing_contacts": [],
-            "researchers": [],
-            "organizations": [],
-            "companies_interested": [],
-            "additional_data": {},
-            "extracted_urls": []
-        }
-        
-        # Title
-        for tag in ['h1', 'h2', 'title']:
-            elem = soup.find(tag)
-            if elem:
-                details['title'] = elem.get_text(strip=True)
-                break
-        
-        # Abstract/description
-        for selector in ['abstract', 'description', 'summary', 'overview']:
-            elem = soup.find(class_=re.compile(selector, re.I))
-            if elem:
-                details['abstract'] = elem.get_text(strip=True)
-                break
-
-        # If abstract exists but summary is empty, derive a short summary from abstract
-        if details["abstract"] and not details["summary"]:
-            # Take the first sentence-ish from the abstract
-            first_sentence = re.split(r'(?<=[.!?])\s+', details["abstract"].strip())[0]
-            if first_sentence:
-                details["summary"] = first_sentence
-
-        # Images
-        for img in soup.find_all('img')[:5]:
-            src = img.get('src', '')
-            if src:
-                if src.startswith('http'):
-                    details['image_urls'].append(src)
-                elif src.startswith('/'):
-                    base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
-                    details['image_urls'].append(urljoin(base_url, src))
-        
-        # Links
-        for link in soup.find_all('a', href=True)[:20]:
-            href = link['href']
-            if href.startswith('http'):
-                details['extracted_urls'].append(href)
-        
-        return details
-
-    def _calculate_completeness(self, details: Dict) -> float:
-        fields = ['title', 'abstract', 'researchers', 'licensing_contacts']
-        filled = sum(1 for f in fields if details.get(f))
-        return filled / len(fields)
-
-    def _search_model_extract(self, url: str, ip_id: str) -> Optional[Dict[str, Any]]:
-        logger.info(f"   🔍 Using search model ({self.model}) for {ip_id}")
-        
-        prompt = f"""You are researching a technology transfer opportunity. Search the web thoroughly to extract complete information about this technology.
-
-TARGET URL: {url}
-
-INSTRUCTIONS:
-1. Search for and read the technology page at the URL above
-2. Search for related information from the university/institution's technology transfer office
-3. Search for the researchers/inventors and their affiliations
-4. Search for any related publications, patents, or press releases
-5. Search for licensing contact information
-
-Extract and return ONLY the following information in valid JSON format (no markdown, no code blocks):
-
-{{
-  "details": {{
-    "title": "Technology title from the page",
-    "post_date": "Publication or posting date if available",
-    "summary": "Brief 2-3 sentence summary",
-    "abstract": "Full technical description or abstract",
-    "benefit": "Key benefits and advantages of this technology",
-    "market_application": "Potential market applications and use cases",
-    "technology_description": "Additional technical details",
-    "publications": {{
-      "text": "Description of related publications",
-      "urls": ["URLs to publications, papers, or patents"]
-    }},
-    "image_urls": ["URLs to relevant images"],
-    "licensing_contacts": [
-      {{
-        "name": "Contact person name",
-        "phone": "Phone number",
-        "email": "Email address"
-      }}
-    ],
-    "researchers": ["Names of researchers/inventors"],
-    "organizations": [
-      {{
-        "name": "Institution or organization name",
-        "logo_url": "Logo URL if available"
-      }}
-    ],
-    "companies_interested": [],
-    "additional_data": {{}},
-    "extracted_urls": ["All relevant URLs you found"]
-  }},
-  "citations": ["List ALL source URLs you used"]
-}}
-
-CRITICAL RULES:
-- Use null for any field you cannot find
-- Use empty arrays [] for lists with no data
-- Include ALL source URLs in the citations field
-- Return ONLY valid JSON, no other text
-- Do NOT make up information - only use what you find"""
-
-        try:
-            # Use Chat Completions API with search model
-            # NOTE: Search models don't accept temperature parameter
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000
-            )
-            
-            # Extract the response
-            content = response.choices[0].message.content
-            
-            # Parse JSON from response
-            try:
-                # Try direct parse
-                data = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown code blocks
-                content = content.strip()
-                if content.startswith('```'):
-                    # Remove markdown code blocks
-                    content = re.sub(r'^```(?:json)?\s*', '', content)
-                    content = re.sub(r'\s*```$', '', content)
-                
-                # Try to find JSON object
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                if start >= 0 and end > start:
-                    json_str = content[start:end]
-                    data = json.loads(json_str)
-                else:
-                    logger.error(f"   ✗ Could not extract JSON from response")
-                    return None
-            
-            # Extract citations
-            self.last_citations = []
-            try:
-                for cit in data.get('citations', []):
-                    if isinstance(cit, str) and cit.startswith('http'):
-                        self.last_citations.append(cit)
-                    elif isinstance(cit, dict):
-                        u = cit.get('url') or cit.get('source')
-                        if u and isinstance(u, str) and u.startswith('http'):
-                            self.last_citations.append(u)
-            except Exception:
-                pass
-            
-            # Token usage and cost calculation
-            usage = response.usage
-            if usage:
-                self.last_token_usage = {
-                    "prompt_tokens": usage.prompt_tokens,
-                    "completion_tokens": usage.completion_tokens,
-                    "total_tokens": usage.total_tokens,
-                }
-                
-                # Pricing for gpt-4o-search-preview: $30 per 1000 queries (not per token)
-                # This is query-based pricing, approximately $0.03 per query
-                self.total_cost += 0.03
-            
-            logger.info(f"   ✅ Extracted with {len(self.last_citations)} citations using {self.model}")
-            return data
-            
-        except Exception as e:
-            logger.error(f"   ✗ Search model failed for {ip_id}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
-            return None
-
-    def scrape_single(self, url: str, ip_id: str, source_id: str) -> Dict[str, Any]:
-        logger.info(f"Processing: {ip_id}")
-        
-        soup = self._fetch_with_requests(url)
-        if soup:
-            details = self._extract_traditional(soup, url, ip_id)
-            completeness = self._calculate_completeness(details)
-            logger.info(f"   📊 Traditional extraction: {completeness:.0%} complete")
-            
-            # FORCE search model whenever completeness is not 100%
-            if completeness < 0.6:
-                logger.info(f"   🔄 Insufficient data, using search model")
-                gpt_data = self._search_model_extract(url, ip_id)
-                
-                if gpt_data and 'details' in gpt_data:
-                    self.gpt_count += 1
-                    details = gpt_data['details']
-                    completeness = self._calculate_completeness(details)
-                    scraping_method = 'search_model'
-                    model_used = self.model
-                else:
-                    self.traditional_count += 1
-                    scraping_method = 'traditional'
-                    model_used = 'beautifulsoup'
-                    logger.warning(f"   ⚠️ Search model failed, using traditional")
-            else:
-                self.traditional_count += 1
-                scraping_method = 'traditional'
-                model_used = 'beautifulsoup'
-        else:
-            logger.info(f"   ⚠️ Traditional failed, using search model")
-            gpt_data = self._search_model_extract(url, ip_id)
-            
-            if gpt_data and 'details' in gpt_data:
-                self.gpt_count += 1
-                details = gpt_data['details']
-                completeness = self._calculate_completeness(details)
-                scraping_method = 'search_model'
-                model_used = self.model
-            else:
-                details = {
-                    "title": None,
-                    "abstract": None,
-                    "researchers": [],
-                    "licensing_contacts": []
-                }
-                completeness = 0.0
-                scraping_method = 'failed'
-                model_used = 'none'
-        
-        return {
-            "_id": {"$oid": ip_id},
-            "source_id": source_id,
-            "url": url,
-            "details": details,
-            "timestamp": datetime.now().isoformat(),
-            "model": model_used,
-            "scraping_method": scraping_method,
-            "completeness_score": completeness,
-            "web_citations": self.last_citations if self.last_citations else []
-        }
-
-    def scrape_all(self, urls_file: Path) -> List[Dict[str, Any]]:
-        logger.info(f"Loading URLs from {urls_file}")
-        
-        with open(urls_file, 'r', encoding='utf-8') as f:
-            url_data = json.load(f)
-        
-        urls = url_data.get('urls', [])
-        source_id = url_data.get('source_id', 'unknown')
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"SCRAPING {len(urls)} IP PAGES")
-        logger.info(f"Source: {source_id}")
-        logger.info(f"Model: {self.model}")
-        logger.info(f"{'='*60}\n")
-        
-        results = []
-        for url_entry in tqdm(urls, desc="Scraping IPs"):
-            url = url_entry['url']
-            ip_id = url_entry.get('id', url.split('/')[-1])
-            
-            result = self.scrape_single(url, ip_id, source_id)
-            results.append(result)
-            self.last_citations = []
-            time.sleep(0.5)
-        
-        return results
-
-    def save_results(self, results: List[Dict], urls_file: Path, output_dir: Path = None):
-        if output_dir is None:
-            output_dir = Path('data/detailed')
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        source_name = Path(urls_file).stem.replace('filtered_urls_', '').replace('raw_urls_', '')
-        
-        output = {
-            "scraped_date": datetime.now().isoformat(),
-            "total_count": len(results),
-            "traditional_count": self.traditional_count,
-            "search_model_count": self.gpt_count,
-            "total_cost": round(self.total_cost, 4),
-            "model": self.model,
-            "ips": results
-        }
-        
-        output_file = output_dir / f"detailed_{source_name}.json"
-        backup_file = output_dir / f"detailed_{source_name}_{timestamp}.json"
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"\n{'='*60}")
-        logger.info("SCRAPING COMPLETE")
-        logger.info(f"{'='*60}")
-        logger.info(f"Total IPs: {len(results)}")
-        logger.info(f"Traditional: {self.traditional_count}")
-        logger.info(f"Search Model: {self.gpt_count}")
-        logger.info(f"Total Cost: ${self.total_cost:.2f}")
-        logger.info(f"\nSaved to: {output_file}")
-        
-        return output_file
-
-
-def main():
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("\n" + "="*60)
-        print("SEARCH MODEL DETAIL SCRAPER")
-        print("="*60)
-        print("\nUses OpenAI's dedicated search models for agentic web searching")
-        print("- gpt-4o-search-preview (recommended)")
-        print("- gpt-4o-mini-search-preview (cheaper)")
-        print("\nUsage: python step2_search_model.py <urls_file> [model]")
-        print("\nExamples:")
-        print("  python step2_search_model.py data/raw/filtered_urls_tto.json")
-        print("  python step2_search_model.py data/raw/filtered_urls_tto.json gpt-4o-mini-search-preview")
-        print("\nPricing:")
-        print("  gpt-4o-search-preview: $30 per 1000 queries (~$0.03/query)")
-        print("  gpt-4o-mini-search-preview: $25 per 1000 queries (~$0.025/query)")
-        print("\nRequires: OPENAI_API_KEY environment variable")
-        sys.exit(1)
-    
-    urls_file = Path(sys.argv[1])
-    model = sys.argv[2] if len(sys.argv) > 2 else "gpt-4o-search-preview"
-    
-    # Validate model
-    valid_models = ["gpt-4o-search-preview", "gpt-4o-mini-search-preview"]
-    if model not in valid_models:
-        print(f"⚠️  Warning: {model} may not be a search model")
-        print(f"   Valid search models: {', '.join(valid_models)}")
-        response = input("   Continue anyway? (y/n): ")
-        if response.lower() != 'y':
-            sys.exit(1)
-    
-    if not urls_file.exists():
-        print(f"❌ File not found: {urls_file}")
-        sys.exit(1)
-    
-    if not OPENAI_API_KEY:
-        print("❌ OPENAI_API_KEY not set!")
-        print("\nSet it in PowerShell:")
-        print('  $env:OPENAI_API_KEY="sk-your-key-here"')
-        print("\nSet it in Linux/Mac:")
-        print('  export OPENAI_API_KEY="sk-your-key-here"')
-        sys.exit(1)
-    
-    try:
-        scraper = SearchModelDetailScraper(model=model)
-        results = scraper.scrape_all(urls_file)
-        output_file = scraper.save_results(results, urls_file)
-        
-        print(f"\n✅ Success! Results saved to:")
-        print(f"   {output_file}")
-        
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-if __name__ == "__main__":
-    main()
+# Detail Scraper Using OpenAI Search Models
+# - Uses gpt-4o-search-preview for built-in agentic web searching
+# - More reliable than Responses API + web_search tool
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import shutil
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+# ---- HTML parser: libxml2-backed lxml when installed, else the pure-Python stdlib parser ----
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# ---- brotli (tolerant): urllib3 can only decode 'br' responses when one of these is installed ----
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# ---- orjson for result file load/dump (tolerant) ----
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ---- tqdm import (tolerant) ----
+try:
+    from tqdm import tqdm
+except ImportError:
+    def tqdm(iterable, **kwargs):
+        return iterable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes via orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(raw):
+    """Parse str/bytes JSON via orjson when available, stdlib json otherwise."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Concurrency / rate limits: size these to your OpenAI tier
+DEFAULT_CONCURRENCY = 8  # URLs in flight at once (page fetch + search-model call)
+DEFAULT_FETCH_WORKERS = 16  # threads for blocking fetch + parse + extract
+DEFAULT_PER_HOST = 4  # politeness: concurrent page fetches per host
+MAX_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_MAX_RPM", "100"))
+MAX_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_MAX_TPM", "200000"))
+SEARCH_MAX_TOKENS = 4000
+
+# Page fetches: keep-alive pool sized for many TTO hosts, (connect, read) timeouts in seconds
+HTTP_POOL_SIZE = 100
+FETCH_TIMEOUT = (5, 30)
+
+# Per-URL result cache: reruns skip the fetch and the (~$0.03) search-model query
+SCRAPE_CACHE_DIR = Path('data/.scrape_cache')
+SCRAPE_CACHE_TTL_DAYS = 30
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_ABSTRACT_SELECTORS = tuple(re.compile(s, re.I) for s in ('abstract', 'description', 'summary', 'overview'))
+_TITLE_TAGS = {'h1': 0, 'h2': 1, 'title': 2}  # preference order for the page title
+_MD_FENCE_HEAD = re.compile(r'^```(?:json)?\s*')
+_MD_FENCE_TAIL = re.compile(r'\s*```$')
+
+# List-valued detail fields: a null from the model is normalized to [] (what the prompt asks for)
+_DETAIL_LIST_FIELDS = ('image_urls', 'licensing_contacts', 'researchers', 'organizations',
+                       'companies_interested', 'extracted_urls')
+
+
+def _parse_search_response(content: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parse a search-model reply: one fence-strip pre-pass, a strict parse, then the
+    outermost {...} as a fallback (raises ValueError if that is not JSON either).
+    Returns None when no JSON object is found or it is not {"details": {...}, ...}.
+    """
+    text = (content or '').strip()
+    if text.startswith('```'):
+        text = _MD_FENCE_TAIL.sub('', _MD_FENCE_HEAD.sub('', text))
+    try:
+        data = _json_loads(text)
+    except ValueError:
+        start = text.find('{')
+        end = text.rfind('}') + 1
+        if start < 0 or end <= start:
+            return None
+        data = _json_loads(text[start:end])
+    
+    # Shape check: fail here rather than deep in scrape_single / the next pipeline step
+    if not isinstance(data, dict) or not isinstance(data.get('details'), dict):
+        return None
+    details = data['details']
+    for field in _DETAIL_LIST_FIELDS:
+        if details.get(field) is None:
+            details[field] = []
+    if not isinstance(data.get('citations'), list):
+        data['citations'] = []
+    return data
+
+# Fields that count towards completeness and their weights (an abstract is worth the most)
+_COMPLETENESS_WEIGHTS = (('title', 30), ('abstract', 40), ('researchers', 15), ('licensing_contacts', 15))
+_COMPLETENESS_TOTAL = sum(w for _, w in _COMPLETENESS_WEIGHTS)
+
+# Search-model fallback (~$0.03/query) for pages whose traditional extraction scores below
+# the threshold. _extract_traditional never fills researchers / licensing_contacts, so its
+# best score is title + abstract = 0.70: the threshold must not exceed that, or every page
+# pays for the query. At 0.70 a page with both keeps its traditional result and a page
+# missing either falls back. A non-empty domain allowlist further restricts the fallback to
+# those hosts (and their subdomains); the default, empty, lets any host fall back.
+SEARCH_MODEL_THRESHOLD = 0.70
+SEARCH_MODEL_DOMAINS = frozenset()
+
+# Retries for transient search-model errors (429 / 5xx / timeouts / dropped connections)
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_INITIAL_DELAY = 1.0  # seconds; doubles per attempt, plus up to 1 s of jitter
+RETRY_MAX_DELAY = 60.0  # cap on the exponential delay (a Retry-After header is honored as sent)
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (retry-after-ms / retry-after headers), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers[name]) * scale)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+class AsyncRateLimiter:
+    """
+    Token buckets for requests/minute and tokens/minute, refilled continuously.
+    acquire() waits until one request and the estimated tokens are available;
+    a limit <= 0 disables that bucket.
+    """
+
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self._requests = float(max(max_requests_per_minute, 0))
+        self._tokens = float(max(max_tokens_per_minute, 0))
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self._last = now - self._last, now
+        if self.max_requests_per_minute > 0:
+            self._requests = min(self.max_requests_per_minute,
+                                 self._requests + elapsed * self.max_requests_per_minute / 60.0)
+        if self.max_tokens_per_minute > 0:
+            self._tokens = min(self.max_tokens_per_minute,
+                               self._tokens + elapsed * self.max_tokens_per_minute / 60.0)
+
+    async def acquire(self, tokens: int = 0):
+        rpm, tpm = self.max_requests_per_minute, self.max_tokens_per_minute
+        tokens = min(tokens, tpm) if tpm > 0 else 0
+        # Waiters queue on the lock, so capacity is handed out in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                need_req = (1 - self._requests) * 60.0 / rpm if rpm > 0 else 0.0
+                need_tok = (tokens - self._tokens) * 60.0 / tpm if tpm > 0 else 0.0
+                wait = max(need_req, need_tok)
+                if wait <= 0:
+                    if rpm > 0:
+                        self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep(wait)
+
+
+class ScrapeCache:
+    """
+    Directory of per-URL scrape results: <dir>/<key[:2]>/<key>.json with
+    key = blake2b(url, 16 bytes). Entries older than the TTL are ignored;
+    writes go through a temp file + os.replace, so a crash never leaves a torn entry.
+    """
+
+    def __init__(self, cache_dir: Path = SCRAPE_CACHE_DIR, ttl_days: float = SCRAPE_CACHE_TTL_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_days * 86400
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = _json_loads(self._path(url).read_bytes())
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url or time.time() - entry.get('cached_at', 0) > self.ttl_seconds:
+            return None
+        return entry.get('result')
+
+    def set(self, url: str, result: Dict[str, Any]):
+        path = self._path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(_json_dumps({"url": url, "cached_at": time.time(), "result": result}))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug(f"Scrape cache write failed for {url}: {e}")
+
+
+class SearchModelDetailScraper:
+    """
+    Uses OpenAI's dedicated search models (gpt-4o-search-preview)
+    These models have built-in agentic web searching
+    """
+    
+    def __init__(self, api_key: str = None, model: str = "gpt-4o-search-preview",
+                 max_requests_per_minute: int = MAX_REQUESTS_PER_MINUTE,
+                 max_tokens_per_minute: int = MAX_TOKENS_PER_MINUTE,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 cache: Optional[ScrapeCache] = None,
+                 search_threshold: float = SEARCH_MODEL_THRESHOLD,
+                 search_domains=SEARCH_MODEL_DOMAINS):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+        # One pooled adapter for all hosts: connections stay alive across fetches (the default
+        # pool of 10 hosts evicts on a multi-domain crawl); GETs retry on 429/5xx, honoring Retry-After
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        k = api_key or OPENAI_API_KEY
+        if not k or not k.startswith("sk-"):
+            raise ValueError("OPENAI_API_KEY missing or malformed (must start with 'sk-')")
+        
+        logger.info(f"OpenAI key suffix in use: …{k[-6:]}")
+        # SDK retries off: _create_completion owns the retry policy (and re-acquires the rate limiter)
+        self.openai_client = AsyncOpenAI(api_key=k, max_retries=0)
+        self.model = model
+        self.max_attempts = max(1, max_attempts)
+        self.cache = cache  # None disables the per-URL result cache
+        self.search_threshold = search_threshold
+        self.search_domains = frozenset(d.lower().strip('.') for d in search_domains)
+        # Set for the duration of scrape_all (None: default executor, no per-host cap)
+        self._fetch_pool: Optional[ThreadPoolExecutor] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._per_host = 0
+        self._run_iso: Optional[str] = None  # UTC start of the current scrape_all, stamped on each record
+        self.rate_limiter = AsyncRateLimiter(max_requests_per_minute, max_tokens_per_minute)
+        
+        # Tracking (updated from the event loop only, so no locking needed)
+        self.traditional_count = 0
+        self.gpt_count = 0
+        self.cache_hits = 0
+        self.total_cost = 0.0
+        self.last_token_usage = {}
+
+    def _fetch_with_requests(self, url: str) -> Optional[BeautifulSoup]:
+        try:
+            response = self.session.get(url, timeout=FETCH_TIMEOUT, stream=False)
+            response.raise_for_status()
+            return BeautifulSoup(response.content, HTML_PARSER)
+        except Exception as e:
+            logger.debug(f"Requests failed: {e}")
+            return None
+
+    def _fetch_and_extract(self, url: str, ip_id: str) -> Optional[Dict[str, Any]]:
+        """Blocking fetch + parse + extract (runs on the fetch pool; the soup never leaves the thread)."""
+        soup = self._fetch_with_requests(url)
+        if soup is None:
+            return None
+        return self._extract_traditional(soup, url, ip_id)
+
+    async def _fetch_details(self, url: str, ip_id: str) -> Optional[Dict[str, Any]]:
+        """Traditional extraction off the event loop, at most _per_host fetches per host at once."""
+        loop = asyncio.get_running_loop()
+        if self._per_host <= 0:
+            return await loop.run_in_executor(self._fetch_pool, self._fetch_and_extract, url, ip_id)
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self._per_host)
+        async with semaphore:
+            return await loop.run_in_executor(self._fetch_pool, self._fetch_and_extract, url, ip_id)
+
+    def _extract_traditional(self, soup: BeautifulSoup, url: str, ip_id: str) -> Dict[str, Any]:
+        details = {
+            "title": None,
+            "post_date": None,
+            "summary": None,
+            "abstract": None,
+            "benefit": None,
+            "market_application": None,
+            "technology_description": None,
+            "publications": {"text": None, "urls": []},
+            "image_urls": [],
+            "licensing_contacts": [],
+            "researchers": [],
+            "organizations": [],
+            "companies_interested": [],
+            "additional_data": {},
+            "extracted_urls": []
+        }
+        
+        # One walk over the tree collects everything the separate find/find_all scans did:
+        # the best-ranked title tag (h1 > h2 > title), the best-ranked abstract class
+        # (_ABSTRACT_SELECTORS order), the first 5 <img> and the first 20 <a href>.
+        # Each candidate is the first in document order for its rank, as find() returned.
+        title_elem, title_rank = None, len(_TITLE_TAGS)
+        abstract_elem, abstract_rank = None, len(_ABSTRACT_SELECTORS)
+        imgs, links = [], []
+        for el in soup.descendants:
+            name = el.name
+            if name is None:  # text node
+                continue
+            rank = _TITLE_TAGS.get(name)
+            if rank is not None and rank < title_rank:
+                title_elem, title_rank = el, rank
+            if abstract_rank:
+                classes = el.get('class')
+                if classes:
+                    if isinstance(classes, str):
+                        classes = (classes,)
+                    for rank, selector in enumerate(_ABSTRACT_SELECTORS[:abstract_rank]):
+                        if any(selector.search(c) for c in classes):
+                            abstract_elem, abstract_rank = el, rank
+                            break
+            if name == 'img':
+                if len(imgs) < 5:
+                    imgs.append(el)
+            elif name == 'a':
+                if len(links) < 20 and el.get('href') is not None:
+                    links.append(el)
+            if not title_rank and not abstract_rank and len(imgs) == 5 and len(links) == 20:
+                break
+        
+        # Title
+        if title_elem is not None:
+            details['title'] = title_elem.get_text(strip=True)
+        
+        # Abstract/description
+        if abstract_elem is not None:
+            details['abstract'] = abstract_elem.get_text(strip=True)
+
+        # If abstract exists but summary is empty, derive a short summary from abstract
+        if details["abstract"] and not details["summary"]:
+            # Take the first sentence-ish from the abstract
+            first_sentence = _SENTENCE_SPLIT.split(details["abstract"].strip(), 1)[0]
+            if first_sentence:
+                details["summary"] = first_sentence
+
+        # Images
+        base_url = None
+        for img in imgs:
+            src = img.get('src', '')
+            if src:
+                if src.startswith('http'):
+                    details['image_urls'].append(src)
+                elif src.startswith('/'):
+                    if base_url is None:
+                        parsed = urlparse(url)
+                        base_url = f"{parsed.scheme}://{parsed.netloc}"
+                    details['image_urls'].append(urljoin(base_url, src))
+        
+        # Links
+        for link in links:
+            href = link['href']
+            if href.startswith('http'):
+                details['extracted_urls'].append(href)
+        
+        return details
+
+    @staticmethod
+    def _calculate_completeness(details: Dict) -> float:
+        get = details.get
+        return sum(w for f, w in _COMPLETENESS_WEIGHTS if get(f)) / _COMPLETENESS_TOTAL
+
+    def _search_allowed(self, url: str) -> bool:
+        if not self.search_domains:
+            return True
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == d or host.endswith('.' + d) for d in self.search_domains)
+
+    @staticmethod
+    def _extract_citations(data: Dict[str, Any]) -> List[str]:
+        citations = []
+        try:
+            for cit in data.get('citations', []):
+                if isinstance(cit, str) and cit.startswith('http'):
+                    citations.append(cit)
+                elif isinstance(cit, dict):
+                    u = cit.get('url') or cit.get('source')
+                    if u and isinstance(u, str) and u.startswith('http'):
+                        citations.append(u)
+        except Exception:
+            pass
+        return citations
+
+    async def _create_completion(self, estimated_tokens: int, **request):
+        """chat.completions.create under the rate limiter, retrying RETRYABLE_ERRORS with jittered backoff."""
+        for attempt in range(self.max_attempts):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                return await self.openai_client.chat.completions.create(**request)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** attempt) + random.random()
+                logger.warning(f"   ⏳ {type(e).__name__}; retrying in {delay:.1f}s ({attempt + 1}/{self.max_attempts - 1})")
+                await asyncio.sleep(delay)
+
+    async def _search_model_extract(self, url: str, ip_id: str):
+        """Returns (data, citations); (None, []) on failure. Citations are per call, not shared state."""
+        logger.info(f"   🔍 Using search model ({self.model}) for {ip_id}")
+        
+        prompt = f"""You are researching a technology transfer opportunity. Search the web thoroughly to extract complete information about this technology.
+
+TARGET URL: {url}
+
+INSTRUCTIONS:
+1. Search for and read the technology page at the URL above
+2. Search for related information from the university/institution's technology transfer office
+3. Search for the researchers/inventors and their affiliations
+4. Search for any related publications, patents, or press releases
+5. Search for licensing contact information
+
+Extract and return ONLY the following information in valid JSON format (no markdown, no code blocks):
+
+{{
+  "details": {{
+    "title": "Technology title from the page",
+    "post_date": "Publication or posting date if available",
+    "summary": "Brief 2-3 sentence summary",
+    "abstract": "Full technical description or abstract",
+    "benefit": "Key benefits and advantages of this technology",
+    "market_application": "Potential market applications and use cases",
+    "technology_description": "Additional technical details",
+    "publications": {{
+      "text": "Description of related publications",
+      "urls": ["URLs to publications, papers, or patents"]
+    }},
+    "image_urls": ["URLs to relevant images"],
+    "licensing_contacts": [
+      {{
+        "name": "Contact person name",
+        "phone": "Phone number",
+        "email": "Email address"
+      }}
+    ],
+    "researchers": ["Names of researchers/inventors"],
+    "organizations": [
+      {{
+        "name": "Institution or organization name",
+        "logo_url": "Logo URL if available"
+      }}
+    ],
+    "companies_interested": [],
+    "additional_data": {{}},
+    "extracted_urls": ["All relevant URLs you found"]
+  }},
+  "citations": ["List ALL source URLs you used"]
+}}
+
+CRITICAL RULES:
+- Use null for any field you cannot find
+- Use empty arrays [] for lists with no data
+- Include ALL source URLs in the citations field
+- Return ONLY valid JSON, no other text
+- Do NOT make up information - only use what you find"""
+
+        try:
+            # Use Chat Completions API with search model
+            # NOTE: Search models don't accept temperature parameter
+            # Rough token estimate (~4 chars/token) plus the output cap, for the TPM bucket
+            response = await self._create_completion(
+                len(prompt) // 4 + SEARCH_MAX_TOKENS,
+                model=self.model,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=SEARCH_MAX_TOKENS
+            )
+            
+            # Extract the response
+            content = response.choices[0].message.content
+            
+            # Parse JSON from response
+            data = _parse_search_response(content)
+            if data is None:
+                logger.error(f"   ✗ Could not extract a details JSON object from response")
+                return None, []
+            
+            # Extract citations
+            citations = self._extract_citations(data)
+            
+            # Token usage and cost calculation
+            usage = response.usage
+            if usage:
+                self.last_token_usage = {
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "total_tokens": usage.total_tokens,
+                }
+                
+                # Pricing for gpt-4o-search-preview: $30 per 1000 queries (not per token)
+                # This is query-based pricing, approximately $0.03 per query
+                self.total_cost += 0.03
+            
+            logger.info(f"   ✅ Extracted with {len(citations)} citations using {self.model}")
+            return data, citations
+            
+        except Exception as e:
+            logger.error(f"   ✗ Search model failed for {ip_id}: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return None, []
+
+    async def scrape_single(self, url: str, ip_id: str, source_id: str) -> Dict[str, Any]:
+        logger.info(f"Processing: {ip_id}")
+        citations = []
+        fallback_failed = False
+        
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                self.cache_hits += 1
+                logger.info(f"   💾 Cached result ({cached.get('scraping_method')}, {cached.get('timestamp')})")
+                return {**cached, "_id": {"$oid": ip_id}, "source_id": source_id}
+        
+        # requests is blocking: fetch + parse + extract in a worker thread so other URLs keep moving
+        details = await self._fetch_details(url, ip_id)
+        if details is not None:
+            completeness = self._calculate_completeness(details)
+            logger.info(f"   📊 Traditional extraction: {completeness:.0%} complete")
+            
+            # Search model only below the threshold, and only for allowlisted hosts when a list is set
+            if completeness < self.search_threshold and self._search_allowed(url):
+                logger.info(f"   🔄 Insufficient data, using search model")
+                gpt_data, citations = await self._search_model_extract(url, ip_id)
+                
+                if gpt_data and 'details' in gpt_data:
+                    self.gpt_count += 1
+                    details = gpt_data['details']
+                    completeness = self._calculate_completeness(details)
+                    scraping_method = 'search_model'
+                    model_used = self.model
+                else:
+                    self.traditional_count += 1
+                    scraping_method = 'traditional'
+                    model_used = 'beautifulsoup'
+                    fallback_failed = True
+                    logger.warning(f"   ⚠️ Search model failed, using traditional")
+            else:
+                self.traditional_count += 1
+                scraping_method = 'traditional'
+                model_used = 'beautifulsoup'
+        else:
+            logger.info(f"   ⚠️ Traditional failed, using search model")
+            gpt_data, citations = await self._search_model_extract(url, ip_id)
+            
+            if gpt_data and 'details' in gpt_data:
+                self.gpt_count += 1
+                details = gpt_data['details']
+                completeness = self._calculate_completeness(details)
+                scraping_method = 'search_model'
+                model_used = self.model
+            else:
+                details = {
+                    "title": None,
+                    "abstract": None,
+                    "researchers": [],
+                    "licensing_contacts": []
+                }
+                completeness = 0.0
+                scraping_method = 'failed'
+                model_used = 'none'
+        
+        result = {
+            "_id": {"$oid": ip_id},
+            "source_id": source_id,
+            "url": url,
+            "details": details,
+            "timestamp": self._run_iso or datetime.now(timezone.utc).isoformat(),
+            "model": model_used,
+            "scraping_method": scraping_method,
+            "completeness_score": completeness,
+            "web_citations": citations
+        }
+        # Failures (including a failed search-model fallback) are not cached: the next run should try again
+        if self.cache is not None and scraping_method != 'failed' and not fallback_failed:
+            self.cache.set(url, result)
+        return result
+
+    @staticmethod
+    def _clean_urls(urls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop entries without an http(s) URL and repeats of a URL already listed (compared
+        without surrounding whitespace or trailing slashes), before any network call.
+        The first entry for a URL wins; its URL is kept as written, minus whitespace.
+        """
+        seen, clean = set(), []
+        for entry in urls:
+            url = entry.get('url') if isinstance(entry, dict) else None
+            if not isinstance(url, str):
+                continue
+            url = url.strip()
+            key = url.rstrip('/')
+            if not key.startswith('http') or key in seen:
+                continue
+            seen.add(key)
+            clean.append(entry if url == entry['url'] else {**entry, 'url': url})
+        return clean
+
+    async def scrape_all(self, urls_file: Path, concurrency: int = DEFAULT_CONCURRENCY,
+                         workers: int = DEFAULT_FETCH_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        logger.info(f"Loading URLs from {urls_file}")
+        
+        url_data = _json_loads(Path(urls_file).read_bytes())
+        
+        raw_urls = url_data.get('urls', [])
+        urls = self._clean_urls(raw_urls)
+        if len(urls) < len(raw_urls):
+            logger.info(f"Dropped {len(raw_urls) - len(urls)} duplicate/invalid URL entries")
+        if limit is not None and limit < len(urls):
+            logger.info(f"--limit: scraping the first {limit} of {len(urls)} URLs")
+            urls = urls[:max(0, limit)]
+        source_id = url_data.get('source_id', 'unknown')
+        
+        logger.info(f"\n{'='*60}")
+        logger.info(f"SCRAPING {len(urls)} IP PAGES")
+        logger.info(f"Source: {source_id}")
+        logger.info(f"Model: {self.model}")
+        logger.info(f"Concurrency: {concurrency} (fetch workers: {workers}, per host: {per_host or 'unlimited'})")
+        logger.info(f"{'='*60}\n")
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def scrape_one(i: int, url_entry: Dict[str, Any]):
+            url = url_entry['url']
+            ip_id = url_entry.get('id', url.split('/')[-1])
+            async with semaphore:
+                return i, await self.scrape_single(url, ip_id, source_id)
+
+        # Pacing is left to the rate limiter; results keep the input order
+        results = [None] * len(urls)
+        self._run_iso = datetime.now(timezone.utc).isoformat()
+        self._host_semaphores, self._per_host = {}, per_host
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="fetch") as pool:
+            self._fetch_pool = pool
+            try:
+                tasks = [scrape_one(i, u) for i, u in enumerate(urls)]
+                for fut in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Scraping IPs"):
+                    i, result = await fut
+                    results[i] = result
+            finally:
+                self._fetch_pool = None
+        
+        return results
+
+    def save_results(self, results: List[Dict], urls_file: Path, output_dir: Path = None):
+        if output_dir is None:
+            output_dir = Path('data/detailed')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        now = datetime.now(timezone.utc)
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        source_name = Path(urls_file).stem.replace('filtered_urls_', '').replace('raw_urls_', '')
+        
+        output = {
+            "scraped_date": now.isoformat(),
+            "total_count": len(results),
+            "traditional_count": self.traditional_count,
+            "search_model_count": self.gpt_count,
+            "cache_hits": self.cache_hits,
+            "total_cost": round(self.total_cost, 4),
+            "model": self.model,
+            "ips": results
+        }
+        
+        output_file = output_dir / f"detailed_{source_name}.json"
+        backup_file = output_dir / f"detailed_{source_name}_{timestamp}.json"
+        
+        # Serialize and write once. The output is swapped in via os.replace (a fresh inode),
+        # so hardlinking the backup to it is safe: the next run never rewrites this backup.
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        tmp_file.write_bytes(_json_dumps(output, indent=True))
+        os.replace(tmp_file, output_file)
+        try:
+            os.link(output_file, backup_file)
+        except (OSError, NotImplementedError):
+            # No hardlinks here (e.g. FAT/exFAT, some network shares): plain copy
+            shutil.copyfile(output_file, backup_file)
+        
+        logger.info(f"\n{'='*60}")
+        logger.info("SCRAPING COMPLETE")
+        logger.info(f"{'='*60}")
+        logger.info(f"Total IPs: {len(results)}")
+        logger.info(f"Traditional: {self.traditional_count}")
+        logger.info(f"Search Model: {self.gpt_count}")
+        logger.info(f"From cache: {self.cache_hits}")
+        logger.info(f"Total Cost: ${self.total_cost:.2f}")
+        logger.info(f"\nSaved to: {output_file}")
+        
+        return output_file
+
+
+def main():
+    import sys
+    
+    if len(sys.argv) < 2:
+        print("\n" + "="*60)
+        print("SEARCH MODEL DETAIL SCRAPER")
+        print("="*60)
+        print("\nUses OpenAI's dedicated search models for agentic web searching")
+        print("- gpt-4o-search-preview (recommended)")
+        print("- gpt-4o-mini-search-preview (cheaper)")
+        print("\nUsage: python step2_search_model.py <urls_file> [model] [--concurrency N]")
+        print("\nExamples:")
+        print("  python step2_search_model.py data/raw/filtered_urls_tto.json")
+        print("  python step2_search_model.py data/raw/filtered_urls_tto.json gpt-4o-mini-search-preview")
+        print("  python step2_search_model.py data/raw/filtered_urls_tto.json --concurrency 16 --workers 32")
+        print("\nPricing:")
+        print("  gpt-4o-search-preview: $30 per 1000 queries (~$0.03/query)")
+        print("  gpt-4o-mini-search-preview: $25 per 1000 queries (~$0.025/query)")
+        print("\nRequires: OPENAI_API_KEY environment variable")
+        sys.exit(1)
+    
+    parser = argparse.ArgumentParser(description="Search model detail scraper")
+    parser.add_argument('urls_file', type=Path, help='Filtered/raw URLs JSON from step 1')
+    parser.add_argument('model', nargs='?', default="gpt-4o-search-preview", help='Search model to use')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'URLs processed concurrently (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help=f'Threads for page fetch + parse (default: {DEFAULT_FETCH_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help=f'Max concurrent page fetches per host, 0 = unlimited (default: {DEFAULT_PER_HOST})')
+    parser.add_argument('--rpm', type=int, default=MAX_REQUESTS_PER_MINUTE,
+                        help=f'Max search-model requests per minute, 0 = unlimited (default: {MAX_REQUESTS_PER_MINUTE})')
+    parser.add_argument('--tpm', type=int, default=MAX_TOKENS_PER_MINUTE,
+                        help=f'Max estimated tokens per minute, 0 = unlimited (default: {MAX_TOKENS_PER_MINUTE})')
+    parser.add_argument('--search-threshold', type=float, default=SEARCH_MODEL_THRESHOLD,
+                        help=f'Use the search model below this traditional completeness; title + abstract '
+                             f'scores 0.70 (default: {SEARCH_MODEL_THRESHOLD})')
+    parser.add_argument('--search-domains', nargs='*', default=sorted(SEARCH_MODEL_DOMAINS), metavar='DOMAIN',
+                        help='Only these hosts (and subdomains) may use the search-model fallback '
+                             '(default: none listed, so any host below the threshold falls back)')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Scrape only the first N URLs (after dedup), for sampled runs')
+    parser.add_argument('--no-cache', action='store_true', help=f'Re-scrape every URL, ignoring {SCRAPE_CACHE_DIR}')
+    parser.add_argument('--cache-ttl-days', type=float, default=SCRAPE_CACHE_TTL_DAYS,
+                        help=f'Reuse cached per-URL results newer than this (default: {SCRAPE_CACHE_TTL_DAYS})')
+    args = parser.parse_args()
+
+    urls_file = args.urls_file
+    model = args.model
+    
+    # Validate model
+    valid_models = ["gpt-4o-search-preview", "gpt-4o-mini-search-preview"]
+    if model not in valid_models:
+        print(f"⚠️  Warning: {model} may not be a search model")
+        print(f"   Valid search models: {', '.join(valid_models)}")
+        response = input("   Continue anyway? (y/n): ")
+        if response.lower() != 'y':
+            sys.exit(1)
+    
+    if not urls_file.exists():
+        print(f"❌ File not found: {urls_file}")
+        sys.exit(1)
+    
+    if not OPENAI_API_KEY:
+        print("❌ OPENAI_API_KEY not set!")
+        print("\nSet it in PowerShell:")
+        print('  $env:OPENAI_API_KEY="sk-your-key-here"')
+        print("\nSet it in Linux/Mac:")
+        print('  export OPENAI_API_KEY="sk-your-key-here"')
+        sys.exit(1)
+    
+    async def run(scraper: SearchModelDetailScraper) -> List[Dict[str, Any]]:
+        try:
+            return await scraper.scrape_all(urls_file, concurrency=args.concurrency,
+                                            workers=args.workers, per_host=args.per_host, limit=args.limit)
+        finally:
+            await scraper.openai_client.close()
+
+    try:
+        cache = None if args.no_cache else ScrapeCache(ttl_days=args.cache_ttl_days)
+        scraper = SearchModelDetailScraper(model=model, max_requests_per_minute=args.rpm,
+                                           max_tokens_per_minute=args.tpm, cache=cache,
+                                           search_threshold=args.search_threshold,
+                                           search_domains=args.search_domains)
+        results = asyncio.run(run(scraper))
+        output_file = scraper.save_results(results, urls_file)
+        
+        print(f"\n✅ Success! Results saved to:")
+        print(f"   {output_file}")
+        
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,198 +1,664 @@
-# step3_agi_analyzer.py
-"""
-STEP 3: Analyze scraped IPs using AGI API
-This is the AGENTIC part that the hackathon requires!
-"""
-import json
-import logging
-from pathlib import Path
-from typing import Dict, List
-import requests
-
-# Load config (which loads .env)
-from config import AGI_API_KEY, AGI_API_URL
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-class AGIAnalyzer:
-    """
-    Uses AGI API to analyze university IP
-    This is the agentic intelligence layer!
-    """
-    
-    def __init__(self):
-        if not AGI_API_KEY:
-            raise ValueError("AGI_API_KEY not found in environment!")
-        
-        self.api_key = AGI_API_KEY
-        self.api_url = AGI_API_URL
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        logger.info(f"🤖 AGI API initialized: {self.api_key[:8]}****")
-    
-    def analyze_ip(self, scraped_data: Dict) -> Dict:
-        """
-        Use AGI API to analyze commercial potential
-        """
-        logger.info(f"🧠 Analyzing {scraped_data.get('ip_id')} with AGI...")
-        
-        # Build prompt for AGI agent
-        prompt = f"""Analyze this university technology for commercialization:
-
-Title: {scraped_data.get('title', 'Unknown')}
-Summary: {scraped_data.get('summary', 'N/A')}
-Applications: {scraped_data.get('applications', 'N/A')}
-Stage: {scraped_data.get('stage_of_development', 'Unknown')}
-
-Provide analysis in JSON format:
-{{
-    "commercial_score": 0-10,
-    "market_readiness": "early/mid/late",
-    "therapeutic_area": "specific area",
-    "ideal_licensee": "startup/pharma/device",
-    "deal_size_estimate": "$XM",
-    "key_risks": ["risk1", "risk2"],
-    "differentiation": "what makes this unique",
-    "commercialization_timeline": "X years",
-    "competitive_advantages": ["adv1", "adv2"]
-}}
-
-Respond with ONLY valid JSON, no markdown or explanations.
-"""
-        
-        # Call AGI API (agent endpoint)
-        try:
-            response = requests.post(
-                f"{self.api_url}/agents/complete",
-                headers=self.headers,
-                json={
-                    "prompt": prompt,
-                    "model": "agi-agent-v1",  # Adjust based on hackathon docs
-                    "max_tokens": 1500,
-                    "temperature": 0.3
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Parse AGI response
-                content = result.get("content", "{}")
-                
-                # Clean markdown if present
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-                
-                analysis = json.loads(content)
-                analysis['ip_id'] = scraped_data.get('ip_id')
-                analysis['analyzed_by'] = 'agi_api'
-                
-                logger.info(f"   ✅ Score: {analysis.get('commercial_score', 'N/A')}/10")
-                return analysis
-            else:
-                logger.error(f"   ❌ AGI API error: {response.status_code} - {response.text}")
-                return {
-                    "error": f"AGI API returned {response.status_code}",
-                    "ip_id": scraped_data.get('ip_id'),
-                    "commercial_score": 5,  # Default
-                    "market_readiness": "unknown"
-                }
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"   ❌ JSON parse error: {e}")
-            return {
-                "error": "Failed to parse AGI response",
-                "ip_id": scraped_data.get('ip_id'),
-                "commercial_score": 5
-            }
-        except Exception as e:
-            logger.error(f"   ❌ AGI API exception: {e}")
-            return {
-                "error": str(e),
-                "ip_id": scraped_data.get('ip_id'),
-                "commercial_score": 5
-            }
-    
-    def analyze_batch(self, scraped_file: Path) -> Path:
-        """Analyze all IPs in a scraped file"""
-        logger.info(f"\n{'='*60}")
-        logger.info(f"📊 Loading scraped data from {scraped_file}")
-        logger.info(f"{'='*60}\n")
-        
-        if not scraped_file.exists():
-            raise FileNotFoundError(f"Scraped file not found: {scraped_file}")
-        
-        with open(scraped_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        ips = data.get('ips', [])
-        logger.info(f"Found {len(ips)} IPs to analyze\n")
-        
-        analyzed_ips = []
-        for i, ip in enumerate(ips, 1):
-            logger.info(f"[{i}/{len(ips)}] " + "-"*50)
-            analysis = self.analyze_ip(ip)
-            ip['agi_analysis'] = analysis
-            analyzed_ips.append(ip)
-        
-        # Save analyzed data
-        output_file = scraped_file.parent / scraped_file.name.replace('.json', '_analyzed.json')
-        output = {
-            'analyzed_date': data.get('scraped_date'),
-            'total_count': len(analyzed_ips),
-            'analysis_method': 'agi_api',
-            'ips': analyzed_ips
-        }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"✅ ANALYSIS COMPLETE")
-        logger.info(f"{'='*60}")
-        logger.info(f"📁 Output: {output_file}")
-        logger.info(f"📊 Analyzed: {len(analyzed_ips)} IPs")
-        
-        # Show sample
-        logger.info(f"\n📋 Sample results:")
-        for ip in analyzed_ips[:3]:
-            analysis = ip.get('agi_analysis', {})
-            logger.info(f"  • {ip.get('title', 'Unknown')[:50]}...")
-            logger.info(f"    Score: {analysis.get('commercial_score', 'N/A')}/10")
-            logger.info(f"    Area: {analysis.get('therapeutic_area', 'Unknown')}")
-        
-        return output_file
-
-
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        logger.error("\n" + "="*60)
-        logger.error("STEP 3: AGI ANALYZER")
-        logger.error("="*60)
-        logger.error("\nUsage: python step3_agi_analyzer.py <scraped_file>")
-        logger.error("\nExample:")
-        logger.error("  python step3_agi_analyzer.py data/scraped/hybrid_ips_stanford.json")
-        logger.error("\nThis will create:")
-        logger.error("  data/scraped/hybrid_ips_stanford_analyzed.json")
-        sys.exit(1)
-    
-    scraped_file = Path(sys.argv[1])
-    
-    try:
-        analyzer = AGIAnalyzer()
-        analyzer.analyze_batch(scraped_file)
-    except Exception as e:
-        logger.error(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+# step3_agi_analyzer.py
+"""
+STEP 3: Analyze scraped IPs using AGI API
+This is the AGENTIC part that the hackathon requires!
+"""
+import os
+import json
+import time
+import random
+import logging
+import asyncio
+import argparse
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import httpx
+
+# ---- h2 (tolerant): HTTP/2 multiplexing of AGI calls over one connection when installed ----
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ---- orjson for result file load/dump (tolerant) ----
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ---- ijson for streaming the scraped 'ips' array (tolerant; falls back to a full load) ----
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# ---- OpenAI import (tolerant; only needed for --batch-api) ----
+try:
+    from openai import OpenAI
+except ImportError:
+    OpenAI = None
+
+# Load config (which loads .env)
+from config import AGI_API_KEY, AGI_API_URL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes via orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(raw):
+    """Parse str/bytes JSON via orjson when available, stdlib json otherwise."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+# OpenAI Batch API path (--batch-api): one async job for the whole file, ~50% cheaper
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+BATCH_MODEL = "gpt-4o-mini"
+BATCH_POLL_INITIAL = 10.0  # seconds; doubles per poll up to BATCH_POLL_MAX
+BATCH_POLL_MAX = 300.0
+BATCH_TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+# Retries for transient AGI API failures (429 / 5xx / timeouts / dropped connections)
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_INITIAL_DELAY = 1.0  # seconds; doubles per attempt, plus up to 1 s of jitter
+RETRY_MAX_DELAY = 60.0  # cap on the exponential delay (a Retry-After header is honored as sent)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# AGI calls in flight at once (one shared AsyncClient; results are still written in input order)
+DEFAULT_CONCURRENCY = 20
+AGI_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+AGI_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=50)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After, in seconds), if any."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _analysis_failed(ip: Dict) -> bool:
+    """True for records whose agi_analysis is an error stub (placeholder score, no real analysis)."""
+    analysis = ip.get('agi_analysis')
+    return isinstance(analysis, dict) and 'error' in analysis
+
+
+class _AnalyzedWriter:
+    """
+    Streams the <name>_analyzed.json document one IP at a time into a .tmp file that
+    replaces the output only on a clean exit: an interrupted run leaves the previous output intact.
+    Keeps the count and the first few records for the summary.
+    """
+
+    def __init__(self, output_file: Path, analyzed_date, method: str, keep_samples: int = 3):
+        self.output_file = output_file
+        self.tmp_file = output_file.with_name(output_file.name + ".tmp")
+        self.header = (b'{\n  "analyzed_date": ' + _json_dumps(analyzed_date)
+                       + b',\n  "analysis_method": ' + _json_dumps(method) + b',\n  "ips": [')
+        self.keep_samples = keep_samples
+        self.count, self.samples = 0, []
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.tmp_file, 'wb')
+        self._f.write(self.header)
+        return self
+
+    def write(self, ip: Dict):
+        self._f.write((b',\n    ' if self.count else b'\n    ') + _json_dumps(ip, indent=True).replace(b'\n', b'\n    '))
+        self.count += 1
+        if len(self.samples) < self.keep_samples:
+            self.samples.append(ip)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._f.write((b'\n  ' if self.count else b'') + b'],\n  "total_count": '
+                              + str(self.count).encode() + b'\n}')
+        finally:
+            self._f.close()
+        if exc_type is None:
+            os.replace(self.tmp_file, self.output_file)
+        else:
+            self.tmp_file.unlink(missing_ok=True)
+        return False
+
+
+class _NDJSONWriter:
+    """
+    Appends one compact JSON line per analyzed IP, flushed as each result lands, so a
+    crash loses at most the record in flight and a rerun resumes from what is on disk.
+    Failed analyses go to <name>_analyzed_failures.ndjson instead, so a rerun retries them.
+    The <name>_analyzed_meta.json sidecar (date, method, totals) is written when the run
+    starts and again on a clean exit. Resume only applies to output of the same scrape:
+    with `fresh`, a missing sidecar, or a different scraped_date, the file is started over.
+    """
+
+    def __init__(self, output_file: Path, analyzed_date, method: str, keep_samples: int = 3,
+                 fresh: bool = False):
+        self.output_file = output_file
+        self.meta_file = output_file.with_name(output_file.stem + "_meta.json")
+        self.failures_file = output_file.with_name(output_file.stem + "_failures.ndjson")
+        self.analyzed_date, self.method = analyzed_date, method
+        self.keep_samples = keep_samples
+        self.count, self.failed, self.samples = 0, 0, []
+        if self.output_file.exists():
+            reason = self._restart_reason(fresh)
+            if reason:
+                logger.info(f"🆕 Starting {output_file.name} over: {reason}")
+                self.output_file.unlink()
+        self.done = self._existing_ids()
+        self.resumed = sum(self.done.values())
+        self._f = self._failures = None
+
+    def _restart_reason(self, fresh: bool) -> Optional[str]:
+        """Why the existing output must not be resumed (None: it belongs to this scrape)."""
+        if fresh:
+            return "--fresh"
+        try:
+            stored = _json_loads(self.meta_file.read_bytes()).get('analyzed_date')
+        except (OSError, ValueError, AttributeError):
+            return f"no readable {self.meta_file.name} to match it to this scrape"
+        if stored != self.analyzed_date:
+            return f"scraped_date changed ({stored} -> {self.analyzed_date})"
+        return None
+
+    def _existing_ids(self) -> Counter:
+        """
+        ip_ids already written by an earlier run; a torn final line is cut off. Error
+        stubs left by older runs are dropped from the file so those IPs are analyzed again.
+        """
+        done = Counter()
+        if not self.output_file.exists():
+            return done
+        good, stale = 0, 0
+        with open(self.output_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    ip = _json_loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                if _analysis_failed(ip):
+                    stale += 1
+                else:
+                    done[ip.get('ip_id')] += 1
+        if stale:
+            logger.info(f"🔁 Retrying {stale} failed analyses from an earlier run")
+            self._drop_failed(good)
+        elif good != self.output_file.stat().st_size:
+            os.truncate(self.output_file, good)
+        return done
+
+    def _drop_failed(self, size: int):
+        """Rewrite the first `size` bytes of the output without its error stubs (tmp + os.replace)."""
+        tmp_file = self.output_file.with_name(self.output_file.name + ".tmp")
+        with open(self.output_file, 'rb') as src, open(tmp_file, 'wb') as f:
+            read = 0
+            for line in src:
+                read += len(line)
+                if read > size:
+                    break
+                if not _analysis_failed(_json_loads(line)):
+                    f.write(line)
+        os.replace(tmp_file, self.output_file)
+
+    def pending(self, ips: Iterable[Dict]) -> Iterable[Dict]:
+        """Skip IPs already on disk (counted per ip_id, so repeated ids resume correctly)."""
+        for ip in ips:
+            if self.done[ip.get('ip_id')] > 0:
+                self.done[ip.get('ip_id')] -= 1
+                continue
+            yield ip
+
+    def __enter__(self):
+        self._f = open(self.output_file, 'ab')
+        # Failures of the previous run are retried, so its list is replaced, not extended
+        self.failures_file.unlink(missing_ok=True)
+        # Stamp the scrape this file now belongs to before any line lands, so an
+        # interrupted run can be resumed (and a re-scrape detected)
+        self._write_meta()
+        return self
+
+    def _write_meta(self):
+        tmp_file = self.meta_file.with_name(self.meta_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps({
+                "analyzed_date": self.analyzed_date,
+                "analysis_method": self.method,
+                "results_file": self.output_file.name,
+                "total_count": self.resumed + self.count,
+                "failed_count": self.failed,
+            }, indent=True))
+        os.replace(tmp_file, self.meta_file)
+
+    def write(self, ip: Dict):
+        if _analysis_failed(ip):
+            if self._failures is None:
+                self._failures = open(self.failures_file, 'wb')
+            self._failures.write(_json_dumps(ip) + b'\n')
+            self._failures.flush()
+            self.failed += 1
+            return
+        self._f.write(_json_dumps(ip) + b'\n')
+        self._f.flush()
+        self.count += 1
+        if len(self.samples) < self.keep_samples:
+            self.samples.append(ip)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+        if self._failures is not None:
+            self._failures.close()
+        if exc_type is None:
+            self._write_meta()
+        return False
+
+
+def ndjson_to_json(ndjson_file: Path, output_file: Path, analyzed_date, method: str) -> _AnalyzedWriter:
+    """
+    Stream an analyzed NDJSON file into the single-document <name>_analyzed.json layout
+    (also accepted by step 4), one line at a time.
+    """
+    with open(ndjson_file, 'rb') as src, _AnalyzedWriter(output_file, analyzed_date, method) as writer:
+        for line in src:
+            if line.strip():
+                writer.write(_json_loads(line))
+    return writer
+
+
+class AGIAnalyzer:
+    """
+    Uses AGI API to analyze university IP
+    This is the agentic intelligence layer!
+    """
+    
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, concurrency: int = DEFAULT_CONCURRENCY):
+        if not AGI_API_KEY:
+            raise ValueError("AGI_API_KEY not found in environment!")
+        
+        self.api_key = AGI_API_KEY
+        self.api_url = AGI_API_URL
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.max_attempts = max(1, max_attempts)
+        self.concurrency = max(1, concurrency)
+        
+        logger.info(f"🤖 AGI API initialized: {self.api_key[:8]}****")
+    
+    @staticmethod
+    def _build_prompt(scraped_data: Dict) -> str:
+        """Analysis prompt for one scraped IP (shared by the AGI and Batch API paths)"""
+        return f"""Analyze this university technology for commercialization:
+
+Title: {scraped_data.get('title', 'Unknown')}
+Summary: {scraped_data.get('summary', 'N/A')}
+Applications: {scraped_data.get('applications', 'N/A')}
+Stage: {scraped_data.get('stage_of_development', 'Unknown')}
+
+Provide analysis in JSON format:
+{{
+    "commercial_score": 0-10,
+    "market_readiness": "early/mid/late",
+    "therapeutic_area": "specific area",
+    "ideal_licensee": "startup/pharma/device",
+    "deal_size_estimate": "$XM",
+    "key_risks": ["risk1", "risk2"],
+    "differentiation": "what makes this unique",
+    "commercialization_timeline": "X years",
+    "competitive_advantages": ["adv1", "adv2"]
+}}
+
+Respond with ONLY valid JSON, no markdown or explanations.
+"""
+
+    @staticmethod
+    def _parse_content(content: str, ip_id, analyzed_by: str) -> Dict:
+        """Parse a model reply into an analysis dict (raises json.JSONDecodeError)"""
+        # Clean markdown if present
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+        
+        analysis = json.loads(content)
+        analysis['ip_id'] = ip_id
+        analysis['analyzed_by'] = analyzed_by
+        return analysis
+
+    def _client(self) -> httpx.AsyncClient:
+        """Shared AsyncClient for a run: keep-alive (and HTTP/2 with h2) to the single AGI host."""
+        return httpx.AsyncClient(base_url=self.api_url, headers=self.headers, http2=HTTP2_AVAILABLE,
+                                 timeout=AGI_TIMEOUT, limits=AGI_LIMITS)
+
+    async def _post_agent(self, client: httpx.AsyncClient, payload: Dict) -> httpx.Response:
+        """
+        POST to /agents/complete, retrying 429/5xx responses and connection errors with
+        jittered exponential backoff. The last response is returned as-is once attempts run out.
+        """
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            delay = None
+            try:
+                response = await client.post("/agents/complete", json=payload)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRYABLE_STATUS or last:
+                    return response
+                reason = f"HTTP {response.status_code}"
+                delay = _retry_after(response)
+            if delay is None:
+                delay = min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** attempt) + random.random()
+            logger.warning(f"   ⏳ {reason}; retrying in {delay:.1f}s ({attempt + 1}/{self.max_attempts - 1})")
+            await asyncio.sleep(delay)
+
+    async def analyze_ip(self, client: httpx.AsyncClient, scraped_data: Dict) -> Dict:
+        """
+        Use AGI API to analyze commercial potential (over the run's shared client)
+        """
+        logger.info(f"🧠 Analyzing {scraped_data.get('ip_id')} with AGI...")
+        
+        # Build prompt for AGI agent
+        prompt = self._build_prompt(scraped_data)
+        
+        # Call AGI API (agent endpoint)
+        try:
+            response = await self._post_agent(client, {
+                "prompt": prompt,
+                "model": "agi-agent-v1",  # Adjust based on hackathon docs
+                "max_tokens": 1500,
+                "temperature": 0.3
+            })
+            
+            if response.status_code == 200:
+                result = response.json()
+                
+                # Parse AGI response
+                content = result.get("content", "{}")
+                analysis = self._parse_content(content, scraped_data.get('ip_id'), 'agi_api')
+                
+                logger.info(f"   ✅ Score: {analysis.get('commercial_score', 'N/A')}/10")
+                return analysis
+            else:
+                logger.error(f"   ❌ AGI API error: {response.status_code} - {response.text}")
+                return {
+                    "error": f"AGI API returned {response.status_code}",
+                    "ip_id": scraped_data.get('ip_id'),
+                    "commercial_score": 5,  # Default
+                    "market_readiness": "unknown"
+                }
+                
+        except json.JSONDecodeError as e:
+            logger.error(f"   ❌ JSON parse error: {e}")
+            return {
+                "error": "Failed to parse AGI response",
+                "ip_id": scraped_data.get('ip_id'),
+                "commercial_score": 5
+            }
+        except Exception as e:
+            logger.error(f"   ❌ AGI API exception: {e}")
+            return {
+                "error": str(e),
+                "ip_id": scraped_data.get('ip_id'),
+                "commercial_score": 5
+            }
+    
+    @staticmethod
+    def _load_scraped(scraped_file: Path):
+        """
+        (scraped_date, iterator over the 'ips' records). With ijson the records are
+        streamed one at a time instead of materializing the whole file first.
+        """
+        logger.info(f"\n{'='*60}")
+        logger.info(f"📊 Loading scraped data from {scraped_file}")
+        logger.info(f"{'='*60}\n")
+        
+        if not scraped_file.exists():
+            raise FileNotFoundError(f"Scraped file not found: {scraped_file}")
+        
+        if ijson is None:
+            data = _json_loads(scraped_file.read_bytes())
+            return data.get('scraped_date'), iter(data.get('ips', []))
+        
+        # scraped_date is written ahead of 'ips', so this first pass stops near the top
+        with open(scraped_file, 'rb') as f:
+            scraped_date = next(ijson.items(f, 'scraped_date'), None)
+        
+        def ips():
+            with open(scraped_file, 'rb') as f:
+                yield from ijson.items(f, 'ips.item', use_float=True)
+        
+        return scraped_date, ips()
+
+    async def _analyze_stream(self, ips: Iterable[Dict], emit: Callable[[Dict], None]):
+        """
+        Analyze records with up to `concurrency` AGI calls in flight, emitting each in
+        input order. At most 2x `concurrency` records are held at once, so a slow call
+        does not stall the others and the input is still consumed lazily.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def one(client, i, ip):
+            async with semaphore:
+                logger.info(f"[{i}] " + "-"*50)
+                ip['agi_analysis'] = await self.analyze_ip(client, ip)
+        
+        pending = deque()
+        async with self._client() as client:
+            try:
+                for i, ip in enumerate(ips, 1):
+                    pending.append((ip, asyncio.create_task(one(client, i, ip))))
+                    if len(pending) >= 2 * self.concurrency:
+                        ip, task = pending.popleft()
+                        await task
+                        emit(ip)
+                while pending:
+                    ip, task = pending.popleft()
+                    await task
+                    emit(ip)
+            finally:
+                for _, task in pending:
+                    task.cancel()
+
+    def analyze_batch(self, scraped_file: Path, pretty: bool = False, fresh: bool = False) -> Path:
+        """
+        Analyze all IPs in a scraped file into <name>_analyzed.ndjson, skipping IPs a
+        previous (interrupted) run of the same scrape already wrote; `fresh` re-analyzes
+        everything. With `pretty`, the NDJSON is then converted to <name>_analyzed.json as well.
+        """
+        scraped_date, ips = self._load_scraped(scraped_file)
+        output_file = self._analyzed_path(scraped_file).with_suffix('.ndjson')
+        
+        writer = _NDJSONWriter(output_file, scraped_date, 'agi_api', fresh=fresh)
+        if writer.resumed:
+            logger.info(f"⏭️  Resuming: {writer.resumed} IPs already in {output_file.name}")
+        with writer:
+            asyncio.run(self._analyze_stream(writer.pending(ips), writer.write))
+        
+        self._log_summary(writer)
+        if pretty:
+            json_file = ndjson_to_json(output_file, self._analyzed_path(scraped_file), scraped_date, 'agi_api').output_file
+            logger.info(f"📁 JSON: {json_file}")
+        return output_file
+
+    def analyze_batch_via_batchapi(self, scraped_file: Path, model: str = BATCH_MODEL) -> Path:
+        """
+        Analyze all IPs in one OpenAI Batch API job: write a JSONL of chat-completion
+        requests, upload it, poll with exponential backoff, then join the output lines
+        back to the IPs by custom_id. Same output file and analysis shape as analyze_batch.
+        """
+        if OpenAI is None:
+            raise ImportError("openai package is required for --batch-api")
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY not found in environment!")
+        client = OpenAI(api_key=OPENAI_API_KEY)
+        
+        scraped_date, ips = self._load_scraped(scraped_file)
+        
+        # custom_id must be unique per line; the index keeps duplicate/missing ip_ids apart
+        requests_file = scraped_file.parent / scraped_file.name.replace('.json', '_batch_requests.jsonl')
+        total = 0
+        with open(requests_file, 'w', encoding='utf-8') as f:
+            for i, ip in enumerate(ips):
+                line = {
+                    "custom_id": f"{i}:{ip.get('ip_id')}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "messages": [{"role": "user", "content": self._build_prompt(ip)}],
+                        "max_tokens": 1500,
+                        "temperature": 0.3,
+                    },
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                total += 1
+        logger.info(f"Found {total} IPs to analyze via Batch API ({model})\n")
+        
+        with open(requests_file, 'rb') as f:
+            batch_input = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(f"📤 Submitted batch {batch.id} ({total} requests)")
+        
+        delay = BATCH_POLL_INITIAL
+        while batch.status not in BATCH_TERMINAL_STATES:
+            time.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX)
+            batch = client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            done = f" ({counts.completed}/{counts.total} done)" if counts else ""
+            logger.info(f"   ⏳ Batch {batch.id}: {batch.status}{done}")
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+        
+        # Join results by custom_id
+        contents = {}
+        for raw in client.files.content(batch.output_file_id).text.splitlines():
+            if not raw.strip():
+                continue
+            line = json.loads(raw)
+            response = line.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[line["custom_id"]] = response["body"]["choices"][0]["message"]["content"] or "{}"
+            else:
+                contents[line["custom_id"]] = None
+        
+        def analyzed():
+            # Second pass over the input: records are re-streamed rather than kept since submission
+            for i, ip in enumerate(self._load_scraped(scraped_file)[1]):
+                ip_id = ip.get('ip_id')
+                content = contents.get(f"{i}:{ip_id}")
+                if content is None:
+                    logger.error(f"   ❌ Batch request failed for {ip_id}")
+                    analysis = {"error": "Batch request failed", "ip_id": ip_id, "commercial_score": 5}
+                else:
+                    try:
+                        analysis = self._parse_content(content, ip_id, 'openai_batch')
+                    except json.JSONDecodeError as e:
+                        logger.error(f"   ❌ JSON parse error for {ip_id}: {e}")
+                        analysis = {"error": "Failed to parse batch response", "ip_id": ip_id, "commercial_score": 5}
+                ip['agi_analysis'] = analysis
+                yield ip
+        
+        return self._save_analyzed(scraped_file, scraped_date, analyzed(), 'openai_batch')
+
+    @staticmethod
+    def _analyzed_path(scraped_file: Path) -> Path:
+        return scraped_file.parent / scraped_file.name.replace('.json', '_analyzed.json')
+
+    def _save_analyzed(self, scraped_file: Path, analyzed_date, analyzed_ips, method: str) -> Path:
+        """
+        Write the analyzed document while `analyzed_ips` (any iterable) is consumed, so
+        only the record in flight is held.
+        """
+        # Save analyzed data
+        output_file = self._analyzed_path(scraped_file)
+        with _AnalyzedWriter(output_file, analyzed_date, method) as writer:
+            for ip in analyzed_ips:
+                writer.write(ip)
+        
+        self._log_summary(writer)
+        return output_file
+
+    @staticmethod
+    def _log_summary(writer):
+        logger.info(f"\n{'='*60}")
+        logger.info(f"✅ ANALYSIS COMPLETE")
+        logger.info(f"{'='*60}")
+        logger.info(f"📁 Output: {writer.output_file}")
+        logger.info(f"📊 Analyzed: {writer.count} IPs")
+        if getattr(writer, 'failed', 0):
+            logger.info(f"❌ Failed: {writer.failed} IPs (in {writer.failures_file.name}; retried on the next run)")
+        
+        # Show sample
+        logger.info(f"\n📋 Sample results:")
+        for ip in writer.samples:
+            analysis = ip.get('agi_analysis', {})
+            logger.info(f"  • {ip.get('title', 'Unknown')[:50]}...")
+            logger.info(f"    Score: {analysis.get('commercial_score', 'N/A')}/10")
+            logger.info(f"    Area: {analysis.get('therapeutic_area', 'Unknown')}")
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) < 2:
+        logger.error("\n" + "="*60)
+        logger.error("STEP 3: AGI ANALYZER")
+        logger.error("="*60)
+        logger.error("\nUsage: python step3_agi_analyzer.py <scraped_file> [--pretty] [--fresh] [--batch-api [--batch-model MODEL]]")
+        logger.error("\nExample:")
+        logger.error("  python step3_agi_analyzer.py data/scraped/hybrid_ips_stanford.json")
+        logger.error("  python step3_agi_analyzer.py data/scraped/hybrid_ips_stanford.json --batch-api")
+        logger.error("  python step3_agi_analyzer.py data/scraped/hybrid_ips_stanford.json --pretty")
+        logger.error("\nThis will create:")
+        logger.error("  data/scraped/hybrid_ips_stanford_analyzed.ndjson (+ _analyzed_meta.json; read by step 4)")
+        logger.error("  data/scraped/hybrid_ips_stanford_analyzed.json (--batch-api, or --pretty)")
+        sys.exit(1)
+    
+    parser = argparse.ArgumentParser(description="Step 3: AGI analyzer")
+    parser.add_argument('scraped_file', type=Path, help='Scraped IPs JSON from step 2')
+    parser.add_argument('--batch-api', action='store_true',
+                        help='Submit all IPs as one OpenAI Batch API job instead of per-IP AGI calls')
+    parser.add_argument('--batch-model', default=BATCH_MODEL, help=f'Model for --batch-api (default: {BATCH_MODEL})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'AGI calls in flight at once (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--pretty', action='store_true',
+                        help='Also write the single-document _analyzed.json from the NDJSON')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Re-analyze every IP instead of resuming from an earlier run of the same scrape')
+    args = parser.parse_args()
+    scraped_file = args.scraped_file
+    
+    try:
+        analyzer = AGIAnalyzer(concurrency=args.concurrency)
+        if args.batch_api:
+            analyzer.analyze_batch_via_batchapi(scraped_file, model=args.batch_model)
+        else:
+            analyzer.analyze_batch(scraped_file, pretty=args.pretty, fresh=args.fresh)
+    except Exception as e:
+        logger.error(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
         sys.exit(1)
\ No newline at end of file
@@ -1,234 +1,992 @@
-# step4_agi_matcher.py
-"""
-STEP 4: Match analyzed IPs to companies using AGI API
-Multi-agent matching system
-"""
-import json
-import logging
-from pathlib import Path
-from typing import Dict, List
-import requests
-
-# Load config
-from config import AGI_API_KEY, AGI_API_URL
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-class AGIMatcher:
-    """
-    Uses AGI API multi-agent system for matching
-    """
-    
-    def __init__(self):
-        if not AGI_API_KEY:
-            raise ValueError("AGI_API_KEY not found!")
-        
-        self.api_key = AGI_API_KEY
-        self.api_url = AGI_API_URL
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Mock company database (expand with real data)
-        self.companies = [
-            {"name": "GeneTech Therapeutics", "focus": "gene_therapy", "stage": "Series A", "location": "Boston"},
-            {"name": "RareDisease Bio", "focus": "rare_disease", "stage": "Seed", "location": "SF"},
-            {"name": "DiagnosticAI", "focus": "diagnostics", "stage": "Series B", "location": "London"},
-            {"name": "Delivery Systems Inc", "focus": "drug_delivery", "stage": "Pre-seed", "location": "Singapore"},
-            {"name": "NeuroBiotech", "focus": "neuroscience", "stage": "Series A", "location": "Boston"},
-            {"name": "Cancer Therapeutics", "focus": "oncology", "stage": "Series B", "location": "SF"},
-        ]
-        
-        logger.info(f"🎯 AGI Matcher initialized with {len(self.companies)} companies")
-    
-    def find_matches(self, analyzed_ip: Dict) -> List[Dict]:
-        """Use AGI API to find company matches"""
-        ip_id = analyzed_ip.get('ip_id', 'unknown')
-        logger.info(f"🔍 Finding matches for {ip_id}...")
-        
-        analysis = analyzed_ip.get('agi_analysis', {})
-        therapeutic_area = analysis.get('therapeutic_area', 'biotech')
-        
-        # Filter relevant companies (simple keyword matching)
-        relevant = [c for c in self.companies 
-                   if any(term in therapeutic_area.lower() 
-                         for term in c['focus'].lower().split('_'))]
-        
-        if not relevant:
-            relevant = self.companies[:3]  # Fallback to top 3
-            logger.info(f"   No specific matches, using top {len(relevant)} companies")
-        else:
-            logger.info(f"   Found {len(relevant)} potentially relevant companies")
-        
-        matches = []
-        for company in relevant:
-            match = self._evaluate_match(analyzed_ip, company)
-            if match:
-                matches.append(match)
-        
-        return sorted(matches, key=lambda x: x.get('score', 0), reverse=True)[:5]
-    
-    def _evaluate_match(self, ip_data: Dict, company: Dict) -> Dict:
-        """Use AGI API to evaluate match quality"""
-        
-        analysis = ip_data.get('agi_analysis', {})
-        
-        prompt = f"""Evaluate this IP-Company match for licensing/partnership:
-
-UNIVERSITY IP:
-- Title: {ip_data.get('title', 'Unknown')}
-- Commercial Score: {analysis.get('commercial_score', 'N/A')}/10
-- Therapeutic Area: {analysis.get('therapeutic_area', 'Unknown')}
-- Stage: {analysis.get('market_readiness', 'Unknown')}
-- Differentiation: {analysis.get('differentiation', 'N/A')}
-
-COMPANY:
-- Name: {company['name']}
-- Focus: {company['focus']}
-- Stage: {company['stage']}
-- Location: {company['location']}
-
-Evaluate the match and return JSON:
-{{
-    "is_good_match": true/false,
-    "score": 0-10,
-    "reasoning": "why this is/isn't a good match",
-    "deal_structure": "license/co-development/acquisition",
-    "estimated_deal_value": "$XM",
-    "outreach_strategy": "how to approach them",
-    "synergies": ["synergy1", "synergy2"],
-    "potential_challenges": ["challenge1", "challenge2"]
-}}
-
-Respond with ONLY valid JSON.
-"""
-        
-        try:
-            response = requests.post(
-                f"{self.api_url}/agents/complete",
-                headers=self.headers,
-                json={
-                    "prompt": prompt,
-                    "model": "agi-agent-v1",
-                    "max_tokens": 1000,
-                    "temperature": 0.3
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result.get("content", "{}")
-                
-                # Clean markdown if present
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-                
-                match_data = json.loads(content)
-                
-                if match_data.get('is_good_match'):
-                    match_data['company_name'] = company['name']
-                    match_data['company_details'] = company
-                    match_data['ip_title'] = ip_data.get('title')
-                    match_data['ip_id'] = ip_data.get('ip_id')
-                    match_data['university'] = ip_data.get('ip_id', '').split('_')[0] if ip_data.get('ip_id') else 'Unknown'
-                    
-                    logger.info(f"   ✅ Match: {company['name']} - Score: {match_data.get('score')}/10")
-                    return match_data
-                else:
-                    logger.info(f"   ⚠️ Not a good match: {company['name']}")
-                    return None
-            else:
-                logger.warning(f"   ⚠️ AGI API error for {company['name']}: {response.status_code}")
-                return None
-            
-        except json.JSONDecodeError as e:
-            logger.warning(f"   ⚠️ JSON parse error for {company['name']}: {e}")
-            return None
-        except Exception as e:
-            logger.warning(f"   ⚠️ Match evaluation failed for {company['name']}: {e}")
-            return None
-    
-    def match_all(self, analyzed_file: Path) -> Path:
-        """Match all analyzed IPs"""
-        logger.info(f"\n{'='*60}")
-        logger.info(f"📊 Loading analyzed data from {analyzed_file}")
-        logger.info(f"{'='*60}\n")
-        
-        if not analyzed_file.exists():
-            raise FileNotFoundError(f"Analyzed file not found: {analyzed_file}")
-        
-        with open(analyzed_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        ips = data.get('ips', [])
-        logger.info(f"Found {len(ips)} IPs to match\n")
-        
-        all_matches = []
-        for i, ip in enumerate(ips, 1):
-            logger.info(f"[{i}/{len(ips)}] " + "-"*50)
-            matches = self.find_matches(ip)
-            all_matches.extend(matches)
-        
-        # Save matches
-        output_file = analyzed_file.parent / analyzed_file.name.replace('_analyzed.json', '_matches.json')
-        output = {
-            'match_date': data.get('analyzed_date'),
-            'total_ips': len(ips),
-            'total_matches': len(all_matches),
-            'matches': all_matches
-        }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"✅ MATCHING COMPLETE")
-        logger.info(f"{'='*60}")
-        logger.info(f"📁 Output: {output_file}")
-        logger.info(f"📊 Total Matches: {len(all_matches)}")
-        
-        # Show top matches
-        if all_matches:
-            logger.info(f"\n🏆 TOP 3 MATCHES:")
-            logger.info("-"*60)
-            top_matches = sorted(all_matches, key=lambda x: x.get('score', 0), reverse=True)[:3]
-            for i, match in enumerate(top_matches, 1):
-                logger.info(f"\n{i}. {match.get('company_name')} ← {match.get('university', 'Unknown')}")
-                logger.info(f"   IP: {match.get('ip_title', 'Unknown')[:50]}...")
-                logger.info(f"   Score: {match.get('score')}/10")
-                logger.info(f"   Deal: {match.get('deal_structure', 'Unknown')}")
-                logger.info(f"   Value: {match.get('estimated_deal_value', 'Unknown')}")
-        
-        return output_file
-
-
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        logger.error("\n" + "="*60)
-        logger.error("STEP 4: AGI MATCHER")
-        logger.error("="*60)
-        logger.error("\nUsage: python step4_agi_matcher.py <analyzed_file>")
-        logger.error("\nExample:")
-        logger.error("  python step4_agi_matcher.py data/scraped/hybrid_ips_stanford_analyzed.json")
-        logger.error("\nThis will create:")
-        logger.error("  data/scraped/hybrid_ips_stanford_matches.json")
-        sys.exit(1)
-    
-    analyzed_file = Path(sys.argv[1])
-    
-    try:
-        matcher = AGIMatcher()
-        matcher.match_all(analyzed_file)
-    except Exception as e:
-        logger.error(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+# step4_agi_matcher.py
+"""
+STEP 4: Match analyzed IPs to companies using AGI API
+Multi-agent matching system
+"""
+import os
+import re
+import mmap
+import json
+import time
+import random
+import heapq
+import hashlib
+import logging
+import asyncio
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+import httpx
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# ---- orjson for file/response load and dump (tolerant) ----
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ---- h2 (tolerant): HTTP/2 multiplexing of AGI calls over one connection when installed ----
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Load config
+from config import AGI_API_KEY, AGI_API_URL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes via orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(raw):
+    """Parse str/bytes JSON via orjson when available, stdlib json otherwise."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+# IPs being matched, and AGI calls in flight, at once across the run (one shared AsyncClient
+# whose connection pool is sized to match)
+DEFAULT_CONCURRENCY = 32
+AGI_TIMEOUT = httpx.Timeout(25.0, connect=5.0)
+MAX_RESPONSE_BYTES = 256 * 1024  # a batch of verdicts is a few KB; anything far larger is runaway output
+KEEPALIVE_EXPIRY = 60.0
+CONNECT_RETRIES = 3  # transport-level retries of failed connection attempts
+MAX_REQUESTS_PER_MINUTE = int(os.getenv("AGI_MAX_RPM", "60"))  # 0 = unlimited
+
+DEFAULT_MAX_ATTEMPTS = 4
+RETRY_INITIAL_DELAY = 0.5  # seconds; doubles per attempt, plus up to 1 s of jitter
+RETRY_MAX_DELAY = 60.0  # cap on the exponential delay (a Retry-After header is honored as sent)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# After BREAKER_FAIL_MAX failed attempts in a row (transport errors / RETRYABLE_STATUS), AGI calls
+# fail fast for BREAKER_RESET_SECONDS, then one trial call decides whether to close again
+BREAKER_FAIL_MAX = 10
+BREAKER_RESET_SECONDS = 60.0
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After, in seconds), if any."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+# Per-(IP inputs, company) verdict cache: reruns and IPs with identical analyses skip the AGI call.
+# Bump PROMPT_VERSION whenever the match prompt changes, so stale verdicts stop matching.
+PROMPT_VERSION = 4
+MATCH_CACHE_DIR = Path('data/.match_cache')
+MATCH_CACHE_TTL_DAYS = 7
+
+
+# Static instructions + schema first, so every match prompt shares one byte-identical prefix
+# (what provider-side prompt caches key on); company fields follow, IP fields come last.
+# One call evaluates all of an IP's candidate companies and returns one verdict per company.
+MATCH_PROMPT_PREFIX = """Evaluate the university IP below against each numbered company for licensing/partnership.
+
+Return a JSON array with one object per company:
+[{
+    "company_index": 0,
+    "is_good_match": true/false,
+    "score": 0-10,
+    "reasoning": "one sentence",
+    "deal_structure": "license/co-development/acquisition",
+    "estimated_deal_value": "$XM",
+    "outreach_strategy": "20 words max",
+    "synergies": ["at most 2"],
+    "potential_challenges": ["at most 2"]
+}]
+
+Respond with ONLY valid JSON, no markdown.
+"""
+# Appended to the prompt for the single re-ask when a response does not fit MatchVerdict
+MATCH_STRICT_SUFFIX = """
+Your previous answer did not match the schema. Return ONLY the JSON array: one object per
+numbered company, each with an integer "company_index", a boolean "is_good_match" and a
+numeric "score" from 0 to 10.
+"""
+# A verdict in the schema above is ~200 tokens; the budget only needs headroom, since
+# decode time grows with every token the model is allowed to ramble on
+MATCH_MAX_TOKENS_PER_COMPANY = 350
+
+# Pairs decided in Python without an AGI call (on unless --no-prefilter):
+# reject below PREFILTER_REJECT_SCORE, or off-focus below PREFILTER_OFF_FOCUS_SCORE;
+# accept an exact focus match at PREFILTER_ACCEPT_SCORE or above
+PREFILTER_REJECT_SCORE = 4
+PREFILTER_OFF_FOCUS_SCORE = 7
+PREFILTER_ACCEPT_SCORE = 9
+_FOCUS_SEP_RE = re.compile(r'[\s-]+')  # "gene therapy" / "gene-therapy" -> gene_therapy focus
+
+TOP_MATCHES_PER_IP = 5
+
+
+class MatchVerdict(BaseModel):
+    """One company's verdict in a match response (the prompt's schema)"""
+    company_index: Optional[int] = None
+    is_good_match: bool
+    score: float = Field(..., ge=0, le=10)
+    reasoning: str = ""
+    deal_structure: str = "Unknown"
+    estimated_deal_value: str = "Unknown"
+    outreach_strategy: str = ""
+    synergies: List[str] = Field(default_factory=list)
+    potential_challenges: List[str] = Field(default_factory=list)
+
+    @field_validator('reasoning', 'deal_structure', 'estimated_deal_value', 'outreach_strategy', mode='before')
+    @classmethod
+    def _as_text(cls, value):
+        # Free text only has to be present-ish: 5000000 or null is not worth a re-ask
+        return "" if value is None else value if isinstance(value, str) else str(value)
+
+    @field_validator('synergies', 'potential_challenges', mode='before')
+    @classmethod
+    def _as_text_list(cls, value):
+        if value is None:
+            return []
+        return [str(v) for v in value] if isinstance(value, list) else [str(value)]
+
+
+def _score_key(match: Dict) -> float:
+    """Sort key for a match's score; model output may give it as a string or omit it."""
+    try:
+        return float(match.get('score', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Optional in-run reuse of verdicts across near-duplicate IPs (off unless --near-dup-threshold is given):
+# same company, same score/readiness, and token Jaccard of the text fields at or above the threshold
+NEAR_DUP_TEXT_FIELDS = ('title', 'therapeutic_area', 'differentiation')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+async def _read_json_body(response: httpx.Response) -> Tuple[bytes, bool]:
+    """
+    Read a streamed 200 body, giving up as soon as it cannot be the JSON the AGI API
+    sends (first byte not '{' / '[', or past MAX_RESPONSE_BYTES) instead of waiting
+    out the whole download. Returns the bytes read and whether the body looked valid.
+    """
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        if not body.strip():
+            head = (bytes(body) + chunk).lstrip()
+            if head and head[:1] not in (b'{', b'['):
+                return bytes(body + chunk), False
+        body += chunk
+        if len(body) > MAX_RESPONSE_BYTES:
+            return bytes(body), False
+    return bytes(body), True
+
+
+def _load_json_file(path: Path):
+    """
+    Parse a JSON file. With orjson the file is memory-mapped and parsed in place, so
+    a large analyzed file is never copied into a bytes object first.
+    """
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file: let orjson report it
+            return orjson.loads(b"")
+        try:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+        finally:
+            mm.close()
+
+
+def _iter_ndjson(path: Path) -> Iterator[Dict]:
+    """Records of an NDJSON file, parsed one line at a time; a torn final line is skipped."""
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield _json_loads(line)
+            except ValueError:
+                if line.endswith(b'\n'):
+                    raise
+                logger.warning(f"⚠️ Skipping torn last line of {path.name}")
+
+
+def jsonl_to_json(jsonl_file: Path, output_file: Path, header: Dict) -> Path:
+    """
+    Stream a matches JSONL file into the single-document layout
+    ({**header, "matches": [...]}), one line at a time, via a temp file + os.replace.
+    """
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    with open(jsonl_file, 'rb') as src, open(tmp_file, 'wb') as f:
+        f.write(_json_dumps(header, indent=True)[:-2] + b',\n  "matches": [')
+        count = 0
+        for line in src:
+            if line.strip():
+                f.write((b',\n    ' if count else b'\n    ')
+                        + _json_dumps(_json_loads(line), indent=True).replace(b'\n', b'\n    '))
+                count += 1
+        f.write((b'\n  ' if count else b'') + b']\n}')
+    os.replace(tmp_file, output_file)
+    return output_file
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the AGI API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for the AGI endpoint. Closed: calls go through. Open
+    (after `fail_max` failures in a row): calls are refused until `reset_timeout` has
+    passed. Half-open: a single trial call is let through; success closes the breaker,
+    failure re-opens it, and release() (attempt abandoned) lets the next call try again.
+    Only touched from the event loop, so no lock is needed.
+    """
+
+    def __init__(self, fail_max: int = BREAKER_FAIL_MAX, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.refused = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+            self.refused += 1
+            return False
+        self._trial = True
+        return True
+
+    def success(self):
+        if self._opened_at is not None:
+            logger.info("   🔌 AGI endpoint answering again; circuit closed")
+        self.failures, self._opened_at, self._trial = 0, None, False
+
+    def failure(self):
+        self.failures += 1
+        self._trial = False
+        if self._opened_at is not None or self.failures >= self.fail_max:
+            if self._opened_at is None:
+                logger.warning(f"   🔌 {self.failures} AGI failures in a row; failing fast for {self.reset_timeout:.0f}s")
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """An allowed attempt ended with no verdict on the endpoint (e.g. cancelled): free the trial slot."""
+        self._trial = False
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket for requests/minute, refilled continuously; acquire() waits for one
+    request's worth. pause() holds every caller back until a 429's Retry-After has
+    passed, so one rate-limit answer slows the whole run instead of each call
+    discovering it separately. A limit <= 0 disables the bucket (pause still applies).
+    """
+
+    def __init__(self, max_requests_per_minute: int):
+        self.max_requests_per_minute = max_requests_per_minute
+        self._requests = float(max(max_requests_per_minute, 0))
+        self._last = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self._last = now - self._last, now
+        if self.max_requests_per_minute > 0:
+            self._requests = min(self.max_requests_per_minute,
+                                 self._requests + elapsed * self.max_requests_per_minute / 60.0)
+
+    def pause(self, seconds: float):
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def acquire(self):
+        rpm = self.max_requests_per_minute
+        # Waiters queue on the lock, so capacity is handed out in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                need_req = (1 - self._requests) * 60.0 / rpm if rpm > 0 else 0.0
+                wait = max(need_req, self._resume_at - time.monotonic())
+                if wait <= 0:
+                    if rpm > 0:
+                        self._requests -= 1
+                    return
+                await asyncio.sleep(wait)
+
+
+class MatchCache:
+    """
+    Directory of AGI match verdicts: <dir>/<key[:2]>/<key>.json with key = blake2b of
+    the canonical prompt inputs (PROMPT_VERSION, IP fields, company). Non-matches are
+    stored too. Entries older than the TTL are ignored; writes go through a temp file
+    + os.replace, so a crash never leaves a torn entry.
+    """
+
+    def __init__(self, cache_dir: Path = MATCH_CACHE_DIR, ttl_days: float = MATCH_CACHE_TTL_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_days * 86400
+
+    @staticmethod
+    def key(ip_inputs: Dict, company: Dict) -> str:
+        canonical = json.dumps({"v": PROMPT_VERSION, "a": ip_inputs, "c": company},
+                               sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            entry = _json_loads(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('cached_at', 0) > self.ttl_seconds:
+            return None
+        return entry.get('result')
+
+    def set(self, key: str, result: Dict):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(_json_dumps({"cached_at": time.time(), "result": result}))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug(f"Match cache write failed for {key}: {e}")
+
+
+class NearDuplicateIndex:
+    """
+    Per-company registry of IP inputs already sent (or being sent) to the AGI API in
+    this run. Each entry holds a future for its verdict, so an IP that arrives while
+    its near-duplicate is still in flight waits for that answer instead of asking again.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._entries = defaultdict(list)  # (company name, exact fields) -> [(tokens, future)]
+
+    @staticmethod
+    def signature(ip_inputs: Dict) -> Tuple[Tuple, FrozenSet[str]]:
+        exact = tuple(str(v) for k, v in sorted(ip_inputs.items()) if k not in NEAR_DUP_TEXT_FIELDS)
+        text = " ".join(str(ip_inputs.get(k, "")) for k in NEAR_DUP_TEXT_FIELDS)
+        return exact, frozenset(_TOKEN_RE.findall(text.lower()))
+
+    def lookup(self, company_name: str, signature) -> Optional[asyncio.Future]:
+        exact, tokens = signature
+        best, best_score = None, self.threshold
+        for other, future in self._entries[(company_name, exact)]:
+            union = len(tokens | other)
+            score = len(tokens & other) / union if union else 0.0
+            if score >= best_score:
+                best, best_score = future, score
+        return best
+
+    def add(self, company_name: str, signature, future: asyncio.Future):
+        exact, tokens = signature
+        self._entries[(company_name, exact)].append((tokens, future))
+
+
+class AGIMatcher:
+    """
+    Uses AGI API multi-agent system for matching
+    """
+    
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, cache: Optional[MatchCache] = None,
+                 near_dup_threshold: Optional[float] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 prefilter: bool = True, max_requests_per_minute: int = MAX_REQUESTS_PER_MINUTE):
+        if not AGI_API_KEY:
+            raise ValueError("AGI_API_KEY not found!")
+        
+        self.api_key = AGI_API_KEY
+        self.api_url = AGI_API_URL
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.max_requests_per_minute = max_requests_per_minute
+        self.cache = cache  # None disables the match verdict cache
+        self.cache_hits = 0
+        self.near_dup_threshold = near_dup_threshold  # None disables near-duplicate verdict reuse
+        self.near_dup_hits = 0
+        self.prefilter = prefilter
+        self.prefiltered = 0
+        
+        # Mock company database (expand with real data)
+        self.companies = [
+            {"name": "GeneTech Therapeutics", "focus": "gene_therapy", "stage": "Series A", "location": "Boston"},
+            {"name": "RareDisease Bio", "focus": "rare_disease", "stage": "Seed", "location": "SF"},
+            {"name": "DiagnosticAI", "focus": "diagnostics", "stage": "Series B", "location": "London"},
+            {"name": "Delivery Systems Inc", "focus": "drug_delivery", "stage": "Pre-seed", "location": "Singapore"},
+            {"name": "NeuroBiotech", "focus": "neuroscience", "stage": "Series A", "location": "Boston"},
+            {"name": "Cancer Therapeutics", "focus": "oncology", "stage": "Series B", "location": "SF"},
+        ]
+        
+        # Focus terms split/lowered once, not per IP x company (kept beside the dicts, which
+        # go into the output and the match cache key unchanged)
+        self._company_terms = [(c, tuple(c['focus'].lower().split('_'))) for c in self.companies]
+        self._focus_terms = {c['name']: terms for c, terms in self._company_terms}
+        # Distinct focus term -> positions of the companies carrying it: relevance costs one
+        # substring test per distinct term instead of one per (company, term) as the DB grows
+        self._term_postings: Dict[str, List[int]] = defaultdict(list)
+        for pos, (_, terms) in enumerate(self._company_terms):
+            for term in dict.fromkeys(terms):
+                self._term_postings[term].append(pos)
+        self._relevant_by_area: Dict[str, List[Dict]] = {}
+        self._company_lines = {c['name']: f"{c['name']} | Focus: {c['focus']} | Stage: {c['stage']} | Location: {c['location']}"
+                               for c in self.companies}
+        self._prompt_heads: Dict[Tuple[str, ...], str] = {}
+        
+        logger.info(f"🎯 AGI Matcher initialized with {len(self.companies)} companies")
+    
+    def _relevant_companies(self, area: str) -> List[Dict]:
+        """
+        Companies with a focus term inside `area` (lowered), in DB order. Memoized per
+        area: IPs mostly repeat a handful of areas, so most lookups skip the term scan.
+        """
+        relevant = self._relevant_by_area.get(area)
+        if relevant is None:
+            hits = {pos for term, positions in self._term_postings.items() if term in area for pos in positions}
+            relevant = self._relevant_by_area[area] = [self.companies[pos] for pos in sorted(hits)]
+        return relevant
+
+    def _client(self) -> httpx.AsyncClient:
+        """Shared AsyncClient for a run: keep-alive (and HTTP/2 with h2) to the single AGI host."""
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency,
+                              keepalive_expiry=KEEPALIVE_EXPIRY)
+        transport = httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits, retries=CONNECT_RETRIES)
+        return httpx.AsyncClient(base_url=self.api_url, headers=self.headers, timeout=AGI_TIMEOUT,
+                                 transport=transport)
+    
+    async def _post_agent(self, client: httpx.AsyncClient, payload: Dict) -> httpx.Response:
+        """
+        POST to /agents/complete, retrying 429/5xx responses, timeouts and malformed
+        (non-JSON or runaway) 200 bodies, which are dropped mid-stream, with jittered
+        exponential backoff. Every attempt is reported to the circuit breaker, and none is
+        made while it is open (CircuitOpenError). Each attempt first takes a rate-limiter token; a 429's
+        Retry-After pauses the limiter for every caller. A semaphore slot is held per
+        attempt, not across the waits. The last response is returned as-is once attempts run out.
+        """
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            delay = None
+            if not self._breaker.allow():
+                raise CircuitOpenError("AGI endpoint circuit open")
+            try:
+                await self._limiter.acquire()
+                async with self._semaphore:
+                    async with client.stream("POST", "/agents/complete", json=payload) as response:
+                        if response.status_code == 200:
+                            body, ok = await _read_json_body(response)
+                        else:
+                            body, ok = await response.aread(), True
+            except httpx.TransportError as e:
+                self._breaker.failure()
+                if last:
+                    raise
+                reason = type(e).__name__
+            except Exception:
+                # Anything else (httpx.DecodingError, limiter errors) still counts, so a
+                # half-open trial is always settled
+                self._breaker.failure()
+                raise
+            except BaseException:
+                self._breaker.release()
+                raise
+            else:
+                if response.status_code in RETRYABLE_STATUS:
+                    self._breaker.failure()
+                else:
+                    self._breaker.success()
+                if not ok and not last:
+                    reason = "malformed response body"
+                elif response.status_code not in RETRYABLE_STATUS or last:
+                    return httpx.Response(response.status_code, content=body, request=response.request)
+                else:
+                    reason = f"HTTP {response.status_code}"
+                    delay = _retry_after(response)
+                if response.status_code == 429 and delay is not None:
+                    self._limiter.pause(delay)
+            if delay is None:
+                delay = min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** attempt) + random.random()
+            logger.warning(f"   ⏳ {reason}; retrying in {delay:.1f}s ({attempt + 1}/{self.max_attempts - 1})")
+            await asyncio.sleep(delay)
+
+    async def find_matches(self, client: httpx.AsyncClient, analyzed_ip: Dict) -> List[Dict]:
+        """Use AGI API to find company matches (all relevant companies evaluated in one call)"""
+        ip_id = analyzed_ip.get('ip_id', 'unknown')
+        logger.info(f"🔍 Finding matches for {ip_id}...")
+        
+        ip_inputs = self._ip_inputs(analyzed_ip)
+        
+        # Filter relevant companies (simple keyword matching), on the same area the prompt shows
+        relevant = self._relevant_companies(str(ip_inputs['therapeutic_area']).lower())
+        
+        if not relevant:
+            relevant = self.companies[:3]  # Fallback to top 3
+            logger.info(f"   No specific matches, using top {len(relevant)} companies")
+        else:
+            logger.info(f"   Found {len(relevant)} potentially relevant companies")
+        
+        verdicts = await self._verdicts(client, ip_inputs, relevant)
+        matches = [m for m in (self._decorate(analyzed_ip, c, v) for c, v in zip(relevant, verdicts)) if m]
+        
+        return heapq.nlargest(TOP_MATCHES_PER_IP, matches, key=_score_key)
+    
+    @staticmethod
+    def _ip_inputs(ip_data: Dict) -> Dict:
+        """The IP fields the match prompt uses (and the match cache keys on)"""
+        analysis = ip_data.get('agi_analysis', {})
+        return {
+            'title': ip_data.get('title', 'Unknown'),
+            'commercial_score': analysis.get('commercial_score', 'N/A'),
+            'therapeutic_area': analysis.get('therapeutic_area', 'Unknown'),
+            'market_readiness': analysis.get('market_readiness', 'Unknown'),
+            'differentiation': analysis.get('differentiation', 'N/A'),
+        }
+    
+    @staticmethod
+    def _decorate(ip_data: Dict, company: Dict, verdict: Optional[Dict]) -> Optional[Dict]:
+        """Match record for a good-match verdict (None otherwise)"""
+        if verdict is None:
+            return None
+        if not verdict.get('is_good_match'):
+            logger.info(f"   ⚠️ Not a good match: {company['name']}")
+            return None
+        
+        match_data = dict(verdict)
+        match_data['company_name'] = company['name']
+        match_data['company_details'] = company
+        match_data['ip_title'] = ip_data.get('title')
+        match_data['ip_id'] = ip_data.get('ip_id')
+        match_data['university'] = ip_data.get('ip_id', '').split('_')[0] if ip_data.get('ip_id') else 'Unknown'
+        
+        logger.info(f"   ✅ Match: {company['name']} - Score: {match_data.get('score')}/10")
+        return match_data
+    
+    def _prefilter(self, ip_inputs: Dict, company: Dict) -> Optional[str]:
+        """
+        The rule that decides the pair without the AGI API, else None: 'low_score' and
+        'off_focus' reject, 'exact_focus' accepts.
+        """
+        try:
+            score = float(ip_inputs['commercial_score'])
+        except (TypeError, ValueError):
+            return None
+        if score < PREFILTER_REJECT_SCORE:
+            return 'low_score'
+        area = str(ip_inputs['therapeutic_area']).lower()
+        if not any(term in area for term in self._focus_terms[company['name']]):
+            return 'off_focus' if score < PREFILTER_OFF_FOCUS_SCORE else None
+        if score >= PREFILTER_ACCEPT_SCORE and _FOCUS_SEP_RE.sub('_', area.strip()) == company['focus'].lower():
+            return 'exact_focus'
+        return None
+
+    @staticmethod
+    def _prefilter_verdict(rule: str, ip_inputs: Dict, company: Dict) -> Dict:
+        """Verdict for the pre-filter rule that fired, in the same shape as a validated AGI verdict (plus 'prefiltered')"""
+        if rule == 'low_score':
+            verdict = MatchVerdict(is_good_match=False, score=0,
+                                   reasoning=f"Pre-filtered: commercial score {ip_inputs['commercial_score']}/10 "
+                                             f"is below {PREFILTER_REJECT_SCORE}, too low for any partner")
+        elif rule == 'off_focus':
+            verdict = MatchVerdict(is_good_match=False, score=0,
+                                   reasoning=f"Pre-filtered: {ip_inputs['therapeutic_area']} is outside "
+                                             f"{company['name']}'s {company['focus']} focus and the IP's commercial "
+                                             f"score {ip_inputs['commercial_score']}/10 is below "
+                                             f"{PREFILTER_OFF_FOCUS_SCORE}")
+        else:
+            # _prefilter only accepts a commercial_score that parses as a float
+            verdict = MatchVerdict(is_good_match=True, score=min(10.0, float(ip_inputs['commercial_score'])),
+                                   reasoning=f"Pre-filtered: {ip_inputs['therapeutic_area']} is {company['name']}'s "
+                                             f"exact focus and the IP scores {ip_inputs['commercial_score']}/10",
+                                   deal_structure="license",
+                                   outreach_strategy=f"Lead with the {company['focus']} fit")
+        return {**verdict.model_dump(exclude={'company_index'}), "prefiltered": True}
+
+    async def _verdicts(self, client: httpx.AsyncClient, ip_inputs: Dict, companies: List[Dict]) -> List[Optional[Dict]]:
+        """
+        One verdict per company (None on failure). Pre-filter decisions, exact-cache hits, then near-duplicate
+        verdicts (when enabled; never written to the exact cache) are used first; the
+        remaining companies go to the AGI API together in one batched call.
+        """
+        verdicts: List[Optional[Dict]] = [None] * len(companies)
+        keys = [MatchCache.key(ip_inputs, c) if self.cache is not None else None for c in companies]
+        signature = self._near_dups.signature(ip_inputs) if self._near_dups is not None else None
+        pending, todo = {}, []
+        
+        for idx, company in enumerate(companies):
+            rule = self._prefilter(ip_inputs, company) if self.prefilter else None
+            if rule:
+                self.prefiltered += 1
+                verdicts[idx] = self._prefilter_verdict(rule, ip_inputs, company)
+                continue
+            cached = self.cache.get(keys[idx]) if keys[idx] else None
+            if cached is not None:
+                self.cache_hits += 1
+                verdicts[idx] = cached
+            elif signature is not None and (future := self._near_dups.lookup(company['name'], signature)) is not None:
+                pending[idx] = future
+            else:
+                todo.append(idx)
+        
+        ip_block = self._ip_block(ip_inputs)  # formatted once, shared by every call for this IP
+        
+        async def query(indexes):
+            futures = []
+            if signature is not None:
+                for idx in indexes:
+                    futures.append(asyncio.get_running_loop().create_future())
+                    self._near_dups.add(companies[idx]['name'], signature, futures[-1])
+            results = [None] * len(indexes)
+            try:
+                results = await self._query_matches(client, ip_block, [companies[idx] for idx in indexes])
+            finally:
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            for idx, result in zip(indexes, results):
+                verdicts[idx] = result
+                # API/parse failures are not cached: the next run should try again
+                if result is not None and keys[idx]:
+                    self.cache.set(keys[idx], result)
+        
+        if todo:
+            await query(todo)
+        
+        retry = []
+        for idx, future in pending.items():
+            verdict = await future
+            if verdict is None:
+                retry.append(idx)  # the near-duplicate's own call failed: ask for this one directly
+            else:
+                self.near_dup_hits += 1
+                logger.info(f"   ♻️  Near-duplicate verdict reused for {companies[idx]['name']}")
+                verdicts[idx] = verdict
+        if retry:
+            await query(retry)
+        
+        return verdicts
+    
+    def _prompt_head(self, companies: List[Dict]) -> str:
+        """
+        Everything in a match prompt before the IP fields: static prefix + numbered company
+        list. Built once per distinct company list (IPs in the same area share one).
+        """
+        names = tuple(c['name'] for c in companies)
+        head = self._prompt_heads.get(names)
+        if head is None:
+            company_lines = "\n".join(f"[{i}] {self._company_lines[name]}" for i, name in enumerate(names))
+            head = self._prompt_heads[names] = f"{MATCH_PROMPT_PREFIX}\nCOMPANIES:\n{company_lines}\n\nUNIVERSITY IP:\n"
+        return head
+
+    @staticmethod
+    def _ip_block(ip_inputs: Dict) -> str:
+        """The IP fields that end every match prompt"""
+        return f"""- Title: {ip_inputs['title']}
+- Commercial Score: {ip_inputs['commercial_score']}/10
+- Therapeutic Area: {ip_inputs['therapeutic_area']}
+- Stage: {ip_inputs['market_readiness']}
+- Differentiation: {ip_inputs['differentiation']}
+"""
+
+    async def _query_matches(self, client: httpx.AsyncClient, ip_block: str, companies: List[Dict],
+                             strict: bool = False) -> List[Optional[Dict]]:
+        """
+        One AGI call for an IP and all its candidate companies; returns the verdicts,
+        validated against MatchVerdict, aligned with `companies` (None for any the
+        response did not cover). Companies whose verdict came back unparseable or
+        off-schema are re-asked once with MATCH_STRICT_SUFFIX.
+        """
+        
+        prompt = self._prompt_head(companies) + ip_block + (MATCH_STRICT_SUFFIX if strict else "")
+        names = ", ".join(c['name'] for c in companies)
+        off_schema = False
+        verdicts: List[Optional[Dict]] = [None] * len(companies)
+        
+        try:
+            response = await self._post_agent(client, {
+                "prompt": prompt,
+                "model": "agi-agent-v1",
+                "max_tokens": MATCH_MAX_TOKENS_PER_COMPANY * len(companies),
+                "temperature": 0.3
+            })
+            
+            if response.status_code == 200:
+                result = _json_loads(response.content)
+                content = result.get("content", "{}")
+                
+                # Clean markdown if present
+                if "```json" in content:
+                    content = content.split("```json")[1].split("```")[0].strip()
+                elif "```" in content:
+                    content = content.split("```")[1].split("```")[0].strip()
+                
+                items = _json_loads(content)
+                if isinstance(items, dict):  # a lone verdict, or the array wrapped in an object
+                    items = next((v for v in items.values() if isinstance(v, list)), [items])
+                for item in items if isinstance(items, list) else []:
+                    try:
+                        verdict = MatchVerdict.model_validate(item)
+                    except ValidationError as e:
+                        logger.debug(f"   Off-schema verdict for {names}: {e}")
+                        continue
+                    idx = verdict.company_index
+                    if idx is None and len(companies) == 1:
+                        idx = 0
+                    if idx is not None and 0 <= idx < len(companies):
+                        verdicts[idx] = verdict.model_dump(exclude={'company_index'})
+                off_schema = any(v is None for v in verdicts)
+                if off_schema:
+                    missing = [c['name'] for c, v in zip(companies, verdicts) if v is None]
+                    logger.warning(f"   ⚠️ No valid verdict returned for: {', '.join(missing)}")
+            else:
+                logger.warning(f"   ⚠️ AGI API error for {names}: {response.status_code}")
+            
+        except json.JSONDecodeError as e:
+            off_schema = True
+            logger.warning(f"   ⚠️ JSON parse error for {names}: {e}")
+        except Exception as e:
+            logger.warning(f"   ⚠️ Match evaluation failed for {names}: {e}")
+        
+        if off_schema and not strict:
+            retry = [i for i, v in enumerate(verdicts) if v is None]
+            logger.info(f"   🔁 Re-asking with the strict schema for {len(retry)} companies")
+            for i, verdict in zip(retry, await self._query_matches(client, ip_block, [companies[i] for i in retry], strict=True)):
+                verdicts[i] = verdict
+        return verdicts
+    
+    async def _match_all_async(self, ips: Iterable[Dict], emit: Callable[[List[Dict]], None],
+                               total: Optional[int] = None) -> int:
+        """
+        Match IPs concurrently over one client: up to `concurrency` IPs are worked on at
+        once, and a second semaphore caps AGI calls in flight (retries included).
+        Each IP's matches are handed to `emit` as soon as it finishes (completion order).
+        `ips` is consumed lazily (the next record is read once a slot frees up); returns
+        how many were matched. `total` only labels the progress lines.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = AsyncRateLimiter(self.max_requests_per_minute)
+        self._breaker = CircuitBreaker()
+        self._near_dups = NearDuplicateIndex(self.near_dup_threshold) if self.near_dup_threshold is not None else None
+        if total is None and isinstance(ips, list):
+            total = len(ips)
+        of = f"/{total}" if total is not None else ""
+        workers = asyncio.Semaphore(self.concurrency)
+        done, read = 0, 0
+        
+        async def one(client, i, ip):
+            nonlocal done
+            try:
+                logger.info(f"[{i}{of}] " + "-"*50)
+                matches = await self.find_matches(client, ip)
+            finally:
+                workers.release()
+            emit(matches)
+            done += 1
+            logger.info(f"   📈 {done}{of} IPs done ({ip.get('ip_id', 'unknown')}: {len(matches)} matches)")
+        
+        # Finished tasks are dropped as they go (only in-flight IPs are held); the first
+        # error stops the run, as it did when every IP was gathered at once
+        tasks, errors = set(), []
+        
+        def reap(task: asyncio.Task):
+            tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+        
+        async with self._client() as client:
+            try:
+                for read, ip in enumerate(ips, 1):
+                    await workers.acquire()
+                    if errors:
+                        raise errors[0]
+                    task = asyncio.create_task(one(client, read, ip))
+                    tasks.add(task)
+                    task.add_done_callback(reap)
+                await asyncio.gather(*tasks)
+                if errors:
+                    raise errors[0]
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return read
+
+    @staticmethod
+    def _load_analyzed(analyzed_file: Path) -> Tuple[Any, Optional[int], Iterable[Dict]]:
+        """
+        (analyzed_date, IP count if known, IPs) from step 3's output. A <name>_analyzed.ndjson
+        is streamed line by line, with the date and count from its _meta.json sidecar;
+        a single-document <name>_analyzed.json is loaded whole.
+        """
+        if analyzed_file.suffix != '.ndjson':
+            data = _load_json_file(analyzed_file)
+            ips = data.get('ips', [])
+            return data.get('analyzed_date'), len(ips), ips
+        meta_file = analyzed_file.with_name(analyzed_file.stem + "_meta.json")
+        try:
+            meta = _load_json_file(meta_file)
+        except (OSError, ValueError):
+            logger.warning(f"⚠️ No readable {meta_file.name}; match_date and IP total are unknown")
+            meta = {}
+        return meta.get('analyzed_date'), meta.get('total_count'), _iter_ndjson(analyzed_file)
+
+    @staticmethod
+    def _matches_path(analyzed_file: Path) -> Path:
+        """<name>_analyzed.ndjson / <name>_analyzed.json -> <name>_matches.json."""
+        name = analyzed_file.name
+        for suffix in ('_analyzed.ndjson', '_analyzed.json'):
+            if name.endswith(suffix):
+                return analyzed_file.with_name(name[:-len(suffix)] + '_matches.json')
+        return analyzed_file.with_name(analyzed_file.stem + '_matches.json')
+
+    def match_all(self, analyzed_file: Path, pretty: bool = False) -> Path:
+        """
+        Match all analyzed IPs into <name>_matches.jsonl, one line per match written as
+        each IP finishes, so memory holds only the running top 3. A <name>_matches_meta.json
+        sidecar carries the totals; with `pretty`, <name>_matches.json is also written.
+        IPs whose step 3 analysis failed (error stubs) are skipped, not matched.
+        """
+        logger.info(f"\n{'='*60}")
+        logger.info(f"📊 Loading analyzed data from {analyzed_file}")
+        logger.info(f"{'='*60}\n")
+        
+        if not analyzed_file.exists():
+            raise FileNotFoundError(f"Analyzed file not found: {analyzed_file}")
+        
+        analyzed_date, total, records = self._load_analyzed(analyzed_file)
+        if total is not None:
+            logger.info(f"Found {total} IPs to match\n")
+        skipped = 0
+        
+        def analyzed_ips():
+            nonlocal skipped
+            for ip in records:
+                analysis = ip.get('agi_analysis')
+                if isinstance(analysis, dict) and 'error' in analysis:
+                    skipped += 1
+                    continue
+                yield ip
+        
+        # Save matches
+        json_file = self._matches_path(analyzed_file)
+        output_file = json_file.with_suffix('.jsonl')
+        meta_file = output_file.with_name(output_file.stem + "_meta.json")
+        total_matches, top, seq = 0, [], 0  # top: min-heap of (score, -seq, match), size <= 3
+        
+        with open(output_file, 'wb') as f:
+            def emit(matches: List[Dict]):
+                nonlocal total_matches, seq
+                for match in matches:
+                    f.write(_json_dumps(match) + b'\n')
+                    seq += 1
+                    entry = (_score_key(match), -seq, match)
+                    if len(top) < 3:
+                        heapq.heappush(top, entry)
+                    elif entry[:2] > top[0][:2]:
+                        heapq.heapreplace(top, entry)
+                total_matches += len(matches)
+                f.flush()
+            
+            matched = asyncio.run(self._match_all_async(analyzed_ips(), emit, total))
+        
+        header = {
+            'match_date': analyzed_date,
+            'total_ips': matched,
+            'total_matches': total_matches,
+        }
+        tmp_file = meta_file.with_name(meta_file.name + ".tmp")
+        tmp_file.write_bytes(_json_dumps({**header, 'results_file': output_file.name}, indent=True))
+        os.replace(tmp_file, meta_file)
+        if pretty:
+            jsonl_to_json(output_file, json_file, header)
+        
+        logger.info(f"\n{'='*60}")
+        logger.info(f"✅ MATCHING COMPLETE")
+        logger.info(f"{'='*60}")
+        logger.info(f"📁 Output: {output_file}")
+        if pretty:
+            logger.info(f"📁 JSON: {json_file}")
+        logger.info(f"📊 Total Matches: {total_matches}")
+        if skipped:
+            logger.info(f"⏭️  IPs skipped (failed step 3 analysis): {skipped}")
+        if self._breaker.refused:
+            logger.info(f"🔌 AGI calls refused while the circuit was open: {self._breaker.refused}")
+        if self.cache is not None:
+            logger.info(f"💾 Cached verdicts reused: {self.cache_hits}")
+        if self.near_dup_threshold is not None:
+            logger.info(f"♻️  Near-duplicate verdicts reused: {self.near_dup_hits}")
+        if self.prefilter:
+            logger.info(f"⚡ Pairs decided by the pre-filter: {self.prefiltered}")
+        
+        # Show top matches
+        if top:
+            logger.info(f"\n🏆 TOP 3 MATCHES:")
+            logger.info("-"*60)
+            for i, (_, _, match) in enumerate(sorted(top, key=lambda e: e[:2], reverse=True), 1):
+                logger.info(f"\n{i}. {match.get('company_name')} ← {match.get('university', 'Unknown')}")
+                logger.info(f"   IP: {match.get('ip_title', 'Unknown')[:50]}...")
+                logger.info(f"   Score: {match.get('score')}/10")
+                logger.info(f"   Deal: {match.get('deal_structure', 'Unknown')}")
+                logger.info(f"   Value: {match.get('estimated_deal_value', 'Unknown')}")
+        
+        return output_file
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) < 2:
+        logger.error("\n" + "="*60)
+        logger.error("STEP 4: AGI MATCHER")
+        logger.error("="*60)
+        logger.error("\nUsage: python step4_agi_matcher.py <analyzed_file> [--pretty] [--workers N] [--rpm N] [--no-cache] [--cache-ttl-days N] [--near-dup-threshold J] [--no-prefilter]")
+        logger.error("\nExample:")
+        logger.error("  python step4_agi_matcher.py data/scraped/hybrid_ips_stanford_analyzed.ndjson")
+        logger.error("\nThis will create:")
+        logger.error("  data/scraped/hybrid_ips_stanford_matches.jsonl (+ _matches_meta.json)")
+        logger.error("  data/scraped/hybrid_ips_stanford_matches.json (with --pretty)")
+        sys.exit(1)
+    
+    parser = argparse.ArgumentParser(description="Step 4: AGI matcher")
+    parser.add_argument('analyzed_file', type=Path,
+                        help='Analyzed IPs from step 3 (_analyzed.ndjson, or _analyzed.json)')
+    parser.add_argument('--pretty', action='store_true',
+                        help='Also write the single-document _matches.json from the JSONL')
+    parser.add_argument('--workers', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'IPs matched / AGI calls in flight at once (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rpm', type=int, default=MAX_REQUESTS_PER_MINUTE,
+                        help=f'Max AGI requests per minute, 0 = unlimited (default: {MAX_REQUESTS_PER_MINUTE}, env AGI_MAX_RPM)')
+    parser.add_argument('--no-cache', action='store_true', help=f'Re-query every pair, ignoring {MATCH_CACHE_DIR}')
+    parser.add_argument('--cache-ttl-days', type=float, default=MATCH_CACHE_TTL_DAYS,
+                        help=f'Reuse cached match verdicts newer than this (default: {MATCH_CACHE_TTL_DAYS})')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='Send every pair to the AGI API, even ones the score/focus rules already decide')
+    parser.add_argument('--near-dup-threshold', type=float, default=None,
+                        help='Reuse a verdict for IPs whose title/area/differentiation tokens overlap at least '
+                             'this much (Jaccard, e.g. 0.9) with an IP already sent for the same company (default: off)')
+    args = parser.parse_args()
+    analyzed_file = args.analyzed_file
+    
+    try:
+        cache = None if args.no_cache else MatchCache(ttl_days=args.cache_ttl_days)
+        matcher = AGIMatcher(concurrency=args.workers, max_requests_per_minute=args.rpm, cache=cache, near_dup_threshold=args.near_dup_threshold,
+                             prefilter=not args.no_prefilter)
+        matcher.match_all(analyzed_file, pretty=args.pretty)
+    except Exception as e:
+        logger.error(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
         sys.exit(1)
\ No newline at end of file